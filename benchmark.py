@@ -0,0 +1,134 @@
+import argparse
+import itertools
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any
+import pandas as pd
+from src.data_loader import DataLoader
+from src.validator import Validator
+from src.exporter import Exporter
+from src.generator import InstanceSpec, write_instance
+from src.instrumentation import peak_rss_kb
+from src.utils import sub_config
+from schedule_generator import SOLVER_STRATEGIES
+
+# groups/teachers/rooms of each preset; "target" is the §6.1 size
+SIZES = {
+    'tiny': (3, 6, 4),
+    'small': (10, 20, 10),
+    'medium': (25, 50, 25),
+    'target': (50, 100, 50),
+}
+
+def soft_config(config: Dict[str, Any], combo: str) -> Dict[str, Any]:
+    """Soft constraints of `config` with only the families of `combo` enabled.
+
+    combo is "all" (as configured), "none", or family names joined by "+".
+    """
+    soft = config.get('soft_constraints', {})
+    if combo == 'all':
+        return soft
+    enabled = set() if combo == 'none' else set(combo.split('+'))
+    unknown = enabled - set(soft)
+    if unknown:
+        raise ValueError(f"Unknown soft constraints: {', '.join(sorted(unknown))}")
+    return {name: dict(cfg, enabled=name in enabled) for name, cfg in soft.items()}
+
+def run_case(case: Dict[str, Any], config: Dict[str, Any]) -> Dict[str, Any]:
+    """Generate, load, validate, solve and export one instance; stage times in seconds."""
+    result = dict(case, status='ERROR', objective_value=None, error='')
+    started = time.perf_counter()
+    try:
+        spec = InstanceSpec(groups=case['groups'], teachers=case['teachers'], rooms=case['rooms'],
+                            weeks=case['weeks'], seed=case['seed'])
+        write_instance(spec, config['input_directory'])
+
+        stage = time.perf_counter()
+        data = DataLoader(config['input_directory']).load_all()
+        result['load_seconds'] = time.perf_counter() - stage
+        result['lessons'] = len(data['lessons'])
+
+        stage = time.perf_counter()
+        valid, errors, _ = Validator(data).validate()
+        result['validate_seconds'] = time.perf_counter() - stage
+        if not valid:
+            raise ValueError("; ".join(errors))
+
+        stage = time.perf_counter()
+        solver = SOLVER_STRATEGIES[config.get('strategy', 'monolithic')](data, config)
+        assignments = solver.solve()
+        result['solve_seconds'] = time.perf_counter() - stage
+        data['valid_global_slots'] = solver.valid_global_slots
+        stats = config['stats']
+        model_stats = stats.get('model', {})
+        result.update(status=stats['status'], objective_value=stats.get('objective_value'),
+                      assigned=len(assignments), build_seconds=model_stats.get('build_seconds'),
+                      variables=model_stats.get('variables'), constraints=model_stats.get('constraints'))
+
+        if assignments:
+            stage = time.perf_counter()
+            os.makedirs(config['output_directory'], exist_ok=True)
+            Exporter(assignments, data, config, os.path.join(config['output_directory'], 'schedule_result.xlsx')).export()
+            result['export_seconds'] = time.perf_counter() - stage
+    except Exception as e:
+        result['error'] = str(e)
+    result['total_seconds'] = time.perf_counter() - started
+    for key in ('load_seconds', 'validate_seconds', 'solve_seconds', 'export_seconds', 'total_seconds'):
+        if key in result: result[key] = round(result[key], 4)
+    result['peak_rss_mb'] = round(peak_rss_kb() / 1024, 1) if peak_rss_kb() is not None else None
+    return result
+
+def benchmark_cases(sizes: List[str], combos: List[str], weeks: int, seeds: List[int]) -> List[Dict[str, Any]]:
+    cases = []
+    for size, combo, seed in itertools.product(sizes, combos, seeds):
+        groups, teachers, rooms = SIZES[size]
+        cases.append({'size': size, 'groups': groups, 'teachers': teachers, 'rooms': rooms,
+                      'weeks': weeks, 'seed': seed, 'soft_constraints': combo})
+    return cases
+
+def main():
+    parser = argparse.ArgumentParser(description="Scaling benchmark on synthetic instances")
+    parser.add_argument("--config", default="config.json", help="Base config (strategy, solver, weights)")
+    parser.add_argument("--sizes", nargs="+", choices=sorted(SIZES), default=['tiny', 'small'])
+    parser.add_argument("--soft", nargs="+", default=['none', 'all'], metavar="COMBO",
+                        help='"all", "none" or soft constraint names joined by "+"')
+    parser.add_argument("--weeks", type=int, default=2, help="Semester length of the instances, in weeks")
+    parser.add_argument("--seeds", type=int, nargs="+", default=[0])
+    parser.add_argument("--time-limit", type=float, help="Solver time limit per case (overrides config)")
+    parser.add_argument("--work-dir", default="benchmark", help="Directory for instances and exports")
+    parser.add_argument("--output", default="benchmark_results.csv", help="Results CSV")
+    args = parser.parse_args()
+
+    with open(args.config, 'r', encoding='utf-8') as f:
+        base_config = json.load(f)
+    logging.basicConfig(level=getattr(logging, base_config.get('logging_level', 'INFO').upper(), logging.INFO),
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    logger = logging.getLogger(__name__)
+
+    for combo in args.soft:
+        soft_config(base_config, combo)
+    results = []
+    for k, case in enumerate(benchmark_cases(args.sizes, args.soft, args.weeks, args.seeds), 1):
+        case_dir = os.path.join(args.work_dir, f"case_{k:03d}")
+        config = sub_config(base_config, args.time_limit)
+        config.update(input_directory=os.path.join(case_dir, 'input'), output_directory=os.path.join(case_dir, 'output'),
+                      soft_constraints=soft_config(base_config, case['soft_constraints']))
+        logger.info(f"Benchmark case {k}: {case}")
+        # A fresh process per case keeps the peak memory figures separate
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            result = pool.submit(run_case, case, config).result()
+        logger.info(f"Benchmark case {k}: {result['status']} in {result['total_seconds']:.1f}s"
+                     + (f" ({result['error']})" if result['error'] else ""))
+        results.append(result)
+        pd.DataFrame(results).to_csv(args.output, index=False, encoding='utf-8')
+
+    logger.info(f"Benchmark results: {args.output}")
+    if any(r['error'] for r in results):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,31 @@
 import argparse
+import contextlib
 import json
 import os
 import sys
 import logging
+from datetime import date
 from src.data_loader import DataLoader
 from src.validator import Validator
 from src.solver import ScheduleSolver
-from src.exporter import Exporter
+from src.template import TemplateSolver
+from src.rolling_horizon import RollingHorizonSolver
+from src.lns import LNSSolver
+from src.portfolio import PortfolioSolver
+from src.components import ComponentSolver
+from src.exporter import Exporter, write_solutions_summary
+from src.snapshot import diff_inputs, input_fingerprint, load_snapshot
+from src.repair import DisruptionEvent, ScheduleRepairer
+from src.instrumentation import MODEL_STATS_FILE, StageProfiler, write_model_stats
+
+SOLVER_STRATEGIES = {
+    'monolithic': ScheduleSolver,
+    'template': TemplateSolver,
+    'rolling_horizon': RollingHorizonSolver,
+    'lns': LNSSolver,
+    'portfolio': PortfolioSolver,
+    'components': ComponentSolver,
+}
 
 def setup_logging(level_name):
     level = getattr(logging, level_name.upper(), logging.INFO)
@@ -19,10 +38,46 @@ def setup_logging(level_name):
         ]
     )
 
+def save_model_stats(config, logger):
+    """model_stats.json for every solve, including infeasible and timed-out ones."""
+    stats = config.get('stats')
+    if not stats: return
+    os.makedirs(config['output_directory'], exist_ok=True)
+    path = os.path.join(config['output_directory'], MODEL_STATS_FILE)
+    write_model_stats(path, stats)
+    logger.info(f"Model statistics: {path}")
+
+def report_profile(profiler, config, logger):
+    """Stage timing table to the log, and to warnings.txt when the run got that far."""
+    lines = profiler.table()
+    logger.info("Stage timings:\n" + "\n".join(lines))
+    for r in profiler.stages:
+        for site in r['top_allocations']:
+            logger.info(f"Allocations in {r['stage']}: {site}")
+    warnings_path = os.path.join(config['output_directory'], 'warnings.txt')
+    if not os.path.exists(warnings_path): return
+    with open(warnings_path, "a", encoding="utf-8") as f:
+        f.write("\n[ПРОФИЛЬ ЭТАПОВ]\n")
+        for line in lines:
+            f.write(f"{line}\n")
+
 def main():
     parser = argparse.ArgumentParser(description="Schedule Generator")
     parser.add_argument("--config", default="config.json", help="Path to config file")
     parser.add_argument("--validate-only", action="store_true", help="Only validate input data")
+    parser.add_argument("--warm-start", metavar="SNAPSHOT", help="Previous result (snapshot JSON or output directory) to start from")
+    parser.add_argument("--find-multiple", type=int, metavar="N", help="Find N different solutions (overrides number_of_solutions)")
+    parser.add_argument("--strategy", choices=sorted(SOLVER_STRATEGIES), help="Override the solving strategy from config")
+    parser.add_argument("--profile", action="store_true", help="Time every stage (cProfile/tracemalloc per instrumentation.profile)")
+    subparsers = parser.add_subparsers(dest="command")
+    repair_parser = subparsers.add_parser("repair", help="Re-place only the lessons hit by a disruption in a previous result")
+    repair_parser.add_argument("snapshot", help="Previous result (snapshot JSON or output directory)")
+    target = repair_parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--teacher", type=int, metavar="TEACHER_ID", help="Teacher who becomes unavailable")
+    target.add_argument("--room", type=int, metavar="ROOM_ID", help="Room that is closed")
+    repair_parser.add_argument("--from", dest="start_date", type=date.fromisoformat, help="First affected date (YYYY-MM-DD)")
+    repair_parser.add_argument("--to", dest="end_date", type=date.fromisoformat, help="Last affected date (YYYY-MM-DD)")
+    repair_parser.add_argument("--reason", default="", help="Reason recorded with the event")
     args = parser.parse_args()
 
     # Load config
@@ -32,15 +87,38 @@ def main():
         
     with open(args.config, 'r', encoding='utf-8') as f:
         config = json.load(f)
+    if args.strategy:
+        config['strategy'] = args.strategy
+    if args.find_multiple:
+        config['number_of_solutions'] = args.find_multiple
 
     setup_logging(config.get('logging_level', 'INFO'))
     logger = logging.getLogger(__name__)
 
+    profiler = None
+    if args.profile:
+        profile_cfg = config.get('instrumentation', {}).get('profile', {})
+        profiler = StageProfiler(os.path.join(config['output_directory'], 'profile'),
+                                 cprofile=profile_cfg.get('cprofile', False),
+                                 tracemalloc_top=profile_cfg.get('tracemalloc_top', 0))
+    # The table is most needed for runs that fail or time out, so it is
+    # reported on every exit
+    try:
+        run(args, config, logger, profiler)
+    finally:
+        if profiler:
+            report_profile(profiler, config, logger)
+
+def run(args, config, logger, profiler=None):
+    def stage(name):
+        return profiler.stage(name) if profiler else contextlib.nullcontext()
+
     # Load data
     logger.info("Loading data...")
     loader = DataLoader(config['input_directory'])
     try:
-        data = loader.load_all()
+        with stage('load'):
+            data = loader.load_all()
     except Exception as e:
         logger.error(f"Error loading data: {e}")
         sys.exit(1)
@@ -48,7 +126,9 @@ def main():
     # Validate
     logger.info("Validating data...")
     validator = Validator(data)
-    if not validator.validate_all():
+    with stage('validate'):
+        valid = validator.validate_all()
+    if not valid:
         logger.error("Validation failed! Check logs for details.")
         sys.exit(1)
 
@@ -56,31 +136,99 @@ def main():
         logger.info("Validation successful. Exiting as requested.")
         return
 
-    # Solve
-    logger.info("Solving schedule...")
-    solver = ScheduleSolver(data, config)
-    try:
-        assignments = solver.solve()
-        # Add solver-computed slots back to data for exporter
-        data['valid_global_slots'] = solver.valid_global_slots
-    except Exception as e:
-        logger.error(f"Error during solving: {e}")
-        sys.exit(1)
+    if args.warm_start:
+        try:
+            snapshot = load_snapshot(args.warm_start)
+        except Exception as e:
+            logger.error(f"Error loading warm start snapshot: {e}")
+            sys.exit(1)
+        diff = diff_inputs(snapshot.get('inputs', {}), input_fingerprint(data))
+        logger.info(f"Warm start from {len(snapshot['assignments'])} assignments: "
+                    f"{len(diff['added'])} added, {len(diff['removed'])} removed, {len(diff['changed'])} changed lessons, "
+                    f"{len(diff['working_days_removed'])} working days removed, "
+                    f"{diff['unavailability_added']} new unavailability records")
+        data['warm_start'] = {'assignments': snapshot['assignments'], 'changed': diff['added'] + diff['changed']}
+
+    solutions = []
+    if args.command == "repair":
+        try:
+            previous = load_snapshot(args.snapshot)['assignments']
+        except Exception as e:
+            logger.error(f"Error loading snapshot: {e}")
+            sys.exit(1)
+        event = DisruptionEvent(
+            kind='teacher_unavailable' if args.teacher is not None else 'room_closed',
+            teacher_id=args.teacher, room_id=args.room,
+            start_date=args.start_date, end_date=args.end_date, reason=args.reason
+        )
+        logger.info(f"Repairing schedule ({event.kind})...")
+        solver = ScheduleRepairer(data, config, previous)
+        try:
+            with stage('repair'):
+                assignments = solver.repair(event)
+            data['valid_global_slots'] = solver.valid_global_slots
+        except Exception as e:
+            logger.error(f"Error during repair: {e}")
+            save_model_stats(config, logger)
+            sys.exit(1)
+    else:
+        # Solve
+        strategy = config.get('strategy', 'monolithic')
+        logger.info(f"Solving schedule ({strategy})...")
+        solver = SOLVER_STRATEGIES[strategy](data, config)
+        if profiler:
+            # Model construction happens inside solve(); time it as its own stage
+            for target in (solver, getattr(solver, 'base', None)):
+                if hasattr(target, 'build_model'):
+                    profiler.wrap(target, 'build_model')
+        num_solutions = config.get('number_of_solutions', 1)
+        try:
+            with stage('solve'):
+                if num_solutions > 1 and hasattr(solver, 'solve_multiple'):
+                    solutions = solver.solve_multiple(num_solutions)
+                    assignments = solutions[0] if solutions else []
+                else:
+                    if num_solutions > 1:
+                        logger.warning(f"Strategy '{strategy}' finds a single solution; number_of_solutions ignored.")
+                    assignments = solver.solve()
+            # Add solver-computed slots back to data for exporter
+            data['valid_global_slots'] = solver.valid_global_slots
+        except Exception as e:
+            logger.error(f"Error during solving: {e}")
+            save_model_stats(config, logger)
+            sys.exit(1)
 
+    save_model_stats(config, logger)
     if not assignments:
         logger.error("No valid schedule found!")
         sys.exit(1)
 
     # Export
     logger.info("Exporting results...")
+    solutions = solutions or [assignments]
     if not os.path.exists(config['output_directory']):
         os.makedirs(config['output_directory'])
         
     output_path = os.path.join(config['output_directory'], 'schedule_result.xlsx')
     exporter = Exporter(assignments, data, config, output_path)
     try:
-        exporter.export()
-        logger.info(f"Schedule generated successfully: {output_path}")
+        with stage('export'):
+            exporter.export()
+            logger.info(f"Schedule generated successfully: {output_path}")
+            summaries = config['stats'].get('solutions', [])
+            for k, solution in enumerate(solutions[1:], 2):
+                summary = summaries[k - 1]
+                solution_config = dict(config, stats={
+                    'status': summary['status'], 'objective_value': summary['objective_value'],
+                    'solve_time': summary['solve_time'], 'warnings': []
+                })
+                output_path = os.path.join(config['output_directory'], f'schedule_result_{k}.xlsx')
+                Exporter(solution, data, solution_config, output_path, suffix=f'_{k}').export()
+                logger.info(f"Alternative schedule {k} generated: {output_path}")
+            if summaries:
+                summary_path = os.path.join(config['output_directory'], 'solutions_summary.csv')
+                write_solutions_summary(summary_path, summaries)
+                logger.info(f"Solutions comparison: {summary_path}")
     except Exception as e:
         logger.error(f"Error during export: {e}")
         sys.exit(1)
@@ -0,0 +1,72 @@
+import json
+import logging
+import os
+import time
+from typing import List, Dict, Any, Optional, Tuple
+from ortools.sat.python import cp_model
+from .snapshot import assignment_to_dict, input_fingerprint
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_FILE = 'schedule_checkpoint.json'
+
+class SolutionCheckpointer(cp_model.CpSolverSolutionCallback):
+    """Writes every improving solution of a ScheduleSolver to output_directory.
+
+    The checkpoint is replaced atomically, so a killed process leaves the last
+    complete best-so-far schedule on disk. It has the snapshot layout and can
+    be passed to --warm-start. Objective, bound and wall time of each
+    improvement are kept in `improvements` and in the file. Only the raw
+    lesson values are read per improvement; assignments (and room matching
+    in the aggregate mode) are built when a checkpoint is written.
+    """
+
+    def __init__(self, schedule_solver, path: str, min_interval: float = 0.0):
+        super().__init__()
+        self.schedule_solver = schedule_solver
+        self.path = path
+        self.min_interval = min_interval
+        self.inputs = input_fingerprint(schedule_solver.data)
+        self.improvements: List[Dict[str, Any]] = []
+        self.started = time.time()
+        self._last_write = float('-inf')
+        self._pending: Optional[Dict[int, Tuple[int, Optional[int], int]]] = None
+
+    @classmethod
+    def from_config(cls, schedule_solver, config: Dict[str, Any]) -> Optional['SolutionCheckpointer']:
+        checkpoint_cfg = config.get('checkpoint', {})
+        if not checkpoint_cfg.get('enabled') or not config.get('output_directory'):
+            return None
+        os.makedirs(config['output_directory'], exist_ok=True)
+        return cls(schedule_solver, os.path.join(config['output_directory'], CHECKPOINT_FILE),
+                   checkpoint_cfg.get('min_interval_seconds', 0.0))
+
+    def on_solution_callback(self):
+        self.record(self, self.ObjectiveValue(), self.BestObjectiveBound())
+
+    def record(self, values: Any, objective: float, bound: float):
+        """Store a solution read from `values` (a callback or CpSolver over the model)."""
+        self.improvements.append({
+            'solution': len(self.improvements) + 1, 'objective': objective,
+            'bound': bound, 'wall_time': round(time.time() - self.started, 3)
+        })
+        self._pending = self.schedule_solver.lesson_values(values)
+        if time.time() - self._last_write >= self.min_interval:
+            self.flush()
+
+    def flush(self):
+        """Write the latest recorded solution if it is not on disk yet."""
+        if self._pending is None: return
+        checkpoint = {
+            'stats': {'objective_value': self.improvements[-1]['objective'], 'status': 'FEASIBLE'},
+            'improvements': self.improvements,
+            'inputs': self.inputs,
+            'assignments': [assignment_to_dict(a) for a in self.schedule_solver.assignments_from_values(self._pending)],
+        }
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(checkpoint, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+        self._pending = None
+        self._last_write = time.time()
+        logger.debug(f"Checkpoint {len(self.improvements)} written: objective {checkpoint['stats']['objective_value']}")
@@ -0,0 +1,128 @@
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Tuple
+from .model import Lesson, ScheduleAssignment
+from .solver import ScheduleSolver
+from .utils import sub_config
+
+logger = logging.getLogger(__name__)
+
+def find_components(solver: ScheduleSolver, rooms: bool = True) -> List[List[Lesson]]:
+    """Lessons split into groups that share no group, candidate teacher or candidate room.
+
+    Largest component first. Lessons without a known discipline are left out,
+    as build_model skips them. With rooms=False, rooms are not considered.
+    """
+    parent: Dict[Any, Any] = {}
+
+    def find(node):
+        parent.setdefault(node, node)
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    lesson_roots = []
+    for lesson in solver.lessons:
+        discipline = solver.disciplines.get(lesson.discipline_id)
+        if not discipline: continue
+        nodes = [('group', discipline.group_name)]
+        nodes += [('teacher', t) for t in solver.compatible_teachers(lesson, discipline)]
+        if rooms:
+            nodes += [('room', r) for r in solver.compatible_rooms(lesson, discipline)]
+        root = find(nodes[0])
+        for node in nodes[1:]:
+            other = find(node)
+            if other != root: parent[other] = root
+        lesson_roots.append((lesson, nodes[0]))
+
+    components: Dict[Any, List[Lesson]] = {}
+    for lesson, node in lesson_roots:
+        components.setdefault(find(node), []).append(lesson)
+    return sorted(components.values(), key=len, reverse=True)
+
+def _solve_component(data: Dict[str, Any], config: Dict[str, Any]) -> Tuple[List[ScheduleAssignment], Dict[str, Any]]:
+    solver = ScheduleSolver(data, config)
+    assignments = solver.solve()
+    return assignments, config['stats']
+
+class ComponentSolver:
+    """Solves independent parts of the instance in separate processes.
+
+    Lessons are connected through their group and every candidate teacher and
+    room; each connected component gets its own ScheduleSolver (same config,
+    full time limit) in a ProcessPoolExecutor of components.processes
+    workers, and the assignments are merged. Teachers and rooms stay in every
+    component's data so resource indices and fallbacks match the full model.
+    """
+
+    def __init__(self, data: Dict[str, Any], config: Dict[str, Any]):
+        self.data = data
+        self.config = config
+        self.base = ScheduleSolver(data, config)
+        self.valid_global_slots = self.base.build_global_slots()
+        self.components = find_components(self.base)
+        self.processes = config.get('components', {}).get('processes') or os.cpu_count() or 1
+
+    def _component_config(self) -> Dict[str, Any]:
+        component_config = sub_config(self.config)
+        solver_cfg = component_config.setdefault('solver', {})
+        if not solver_cfg.get('num_workers'):
+            solver_cfg['num_workers'] = max(1, (os.cpu_count() or 1) // min(self.processes, len(self.components)))
+        return component_config
+
+    def solve(self) -> List[ScheduleAssignment]:
+        started = time.time()
+        if len(self.components) <= 1:
+            logger.info("Components: the instance is connected; solving it as a whole.")
+            parts = len(find_components(self.base, rooms=False))
+            if parts > 1:
+                logger.info(f"Components: {parts} parts share no groups or teachers but are joined by compatible rooms.")
+            assignments = self.base.solve()
+            self.config['stats']['components'] = [self._component_stats(1, self.data['lessons'], self.config['stats'])]
+            return assignments
+
+        logger.info(f"Components: {len(self.components)} independent parts, "
+                    f"largest {len(self.components[0])} of {len(self.data['lessons'])} lessons")
+        component_config = self._component_config()
+        with ProcessPoolExecutor(max_workers=min(self.processes, len(self.components))) as pool:
+            futures = [
+                pool.submit(_solve_component, dict(self.data, lessons=lessons), component_config)
+                for lessons in self.components
+            ]
+            results = [future.result() for future in futures]
+
+        assignments: List[ScheduleAssignment] = []
+        stats = {'status': 'OPTIMAL', 'objective_value': 0, 'solve_time': 0.0, 'warnings': [],
+                 'components': [], 'objective_components': {}}
+        for k, (lessons, (component_assignments, component_stats)) in enumerate(zip(self.components, results), 1):
+            stats['components'].append(self._component_stats(k, lessons, component_stats))
+            stats['warnings'] += [f"Component {k}: {w}" for w in component_stats.get('warnings', [])]
+            if not component_assignments:
+                stats['status'] = component_stats['status']
+                stats['warnings'].append(f"Component {k} ({len(lessons)} lessons) has no solution "
+                                         f"({component_stats['status']}).")
+                continue
+            if component_stats['status'] != 'OPTIMAL' and stats['status'] == 'OPTIMAL':
+                stats['status'] = component_stats['status']
+            stats['objective_value'] += component_stats['objective_value']
+            for name, value in component_stats.get('objective_components', {}).items():
+                stats['objective_components'][name] = stats['objective_components'].get(name, 0) + value
+            assignments.extend(component_assignments)
+
+        stats['solve_time'] = time.time() - started
+        self.config['stats'] = stats
+        if any(not c['solved'] for c in stats['components']):
+            logger.warning("Components: some parts have no solution; no schedule returned.")
+            return []
+        return assignments
+
+    @staticmethod
+    def _component_stats(k: int, lessons: List[Lesson], stats: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            'component': k, 'lessons': len(lessons), 'status': stats['status'],
+            'solved': stats['status'] in ('OPTIMAL', 'FEASIBLE'),
+            'objective_value': stats['objective_value'], 'solve_time': stats['solve_time'],
+        }
@@ -1,13 +1,22 @@
+import bisect
 import collections
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Optional, Tuple
 from ortools.sat.python import cp_model
+from .literals import LiteralAlgebra
+from .instrumentation import BuildRecorder
 
 class ConstraintManager:
-    def __init__(self, model: cp_model.CpModel, variables: Dict[str, Any], data: Dict[str, Any]):
+    def __init__(self, model: cp_model.CpModel, variables: Dict[str, Any], data: Dict[str, Any],
+                 config: Optional[Dict[str, Any]] = None, recorder: Optional[BuildRecorder] = None):
         self.model = model
+        self.recorder = recorder or BuildRecorder(model)
         self.variables = variables
         self.data = data
+        self.config = config or {}
+        self.model_cfg = self.config.get("model", {})
         self.objective_terms = []
+        self.objective_components: Dict[str, List[Any]] = {}
+        self.lits = LiteralAlgebra(model)
         
         # Precompute day and week mappings
         self.valid_slots = self.data['valid_global_slots']
@@ -16,6 +25,7 @@ class ConstraintManager:
         self.slot_to_day = {}
         self.slot_to_week = {}
         self.day_to_week = {}
+        self.day_dates = []
         
         curr_day_idx = -1
         curr_date = None
@@ -25,6 +35,7 @@ class ConstraintManager:
                 curr_date = date_obj
                 week_key = date_obj.isocalendar()[:2]
                 self.day_to_week[curr_day_idx] = week_key
+                self.day_dates.append(date_obj)
                 
             self.day_to_slots[curr_day_idx].append(i)
             self.slot_to_day[i] = curr_day_idx
@@ -36,56 +47,83 @@ class ConstraintManager:
         self.num_days = curr_day_idx + 1
         self.weeks = sorted(self.week_to_slots.keys())
 
+        # Element tables for the "element" day-integrity mode
+        self.week_to_idx = {w_key: i for i, w_key in enumerate(self.weeks)}
+        self.slot_to_day_table = [self.slot_to_day[i] for i in range(len(self.valid_slots))]
+        self.day_to_week_table = [self.week_to_idx[self.day_to_week[d]] for d in range(self.num_days)]
+        self._fit_intervals: Dict[int, List[List[int]]] = {}
+
+    @property
+    def uses_day_index(self) -> bool:
+        return self.model_cfg.get("day_integrity", "bools") == "element"
+
     def add_hard_constraints(self):
-        self._add_resource_no_overlap_constraints()
-        self._add_day_integrity_constraints()
-        self._add_teacher_availability_constraints()
-        self._add_teacher_load_constraints()
+        passes = [
+            ("no_overlap", self._add_resource_no_overlap_constraints),
+            ("day_integrity", self._add_day_integrity_constraints),
+            ("teacher_availability", self._add_teacher_availability_constraints),
+            ("teacher_load", self._add_teacher_load_constraints),
+        ]
+        redundant = self.model_cfg.get("redundant_constraints", {})
+        if redundant.get("group_daily_slots"):
+            passes.append(("redundant_group_daily_slots", self._add_group_daily_slot_caps))
+        if redundant.get("teacher_load"):
+            passes.append(("redundant_teacher_load", self._add_teacher_load_bounds))
+        if self.model_cfg.get("order_lessons_by_number") or self.model_cfg.get("lecture_before_practice"):
+            passes.append(("lesson_order", self._add_lesson_order_constraints))
+        for name, add_pass in passes:
+            with self.recorder.measure(name, "hard"):
+                add_pass()
+
+    def _soft_constraint_families(self):
+        """(config key, builder) of every soft-constraint family, in objective order."""
+        return [
+            ("avoid_late_slots", self._add_late_slot_penalties),
+            ("minimize_student_gaps", lambda weight: self._add_minimize_gaps_constraints("group", weight)),
+            ("minimize_teacher_gaps", lambda weight: self._add_minimize_gaps_constraints("teacher", weight)),
+            ("balance_workload", self._add_balance_workload_constraints),
+            ("group_consecutive_lessons", self._add_consecutive_lessons_constraints),
+            ("minimize_building_transitions", self._add_building_transition_constraints),
+            ("teacher_seniority_priority", self._add_seniority_priority_constraints),
+        ]
 
     def add_soft_constraints(self, config: Dict[str, Any]):
         soft_cfg = config.get("soft_constraints", {})
         
-        if soft_cfg.get("avoid_late_slots", {}).get("enabled"):
-            weight = soft_cfg["avoid_late_slots"]["weight"]
-            for l_idx, vars in self.variables['lessons'].items():
-                # Prefer earlier slots: minimize global start
-                self.objective_terms.append(vars['start'] * (-weight))
-
-        if soft_cfg.get("minimize_student_gaps", {}).get("enabled"):
-            self._add_minimize_gaps_constraints(
-                "group", 
-                soft_cfg["minimize_student_gaps"]["weight"]
-            )
-
-        if soft_cfg.get("minimize_teacher_gaps", {}).get("enabled"):
-            self._add_minimize_gaps_constraints(
-                "teacher", 
-                soft_cfg["minimize_teacher_gaps"]["weight"]
-            )
-
-        if soft_cfg.get("balance_workload", {}).get("enabled"):
-            self._add_balance_workload_constraints(
-                soft_cfg["balance_workload"]["weight"]
-            )
-
-        if soft_cfg.get("group_consecutive_lessons", {}).get("enabled"):
-            self._add_consecutive_lessons_constraints(
-                soft_cfg["group_consecutive_lessons"]["weight"]
-            )
-
-        if soft_cfg.get("minimize_building_transitions", {}).get("enabled"):
-            self._add_building_transition_constraints(
-                soft_cfg["minimize_building_transitions"]["weight"]
-            )
-
-        if soft_cfg.get("teacher_seniority_priority", {}).get("enabled"):
-            self._add_seniority_priority_constraints(
-                soft_cfg["teacher_seniority_priority"]["weight"]
-            )
+        for name, add_family in self._soft_constraint_families():
+            family_cfg = soft_cfg.get(name, {})
+            if not family_cfg.get("enabled"): continue
+            # Without room variables, building changes are minimized by the room matching
+            if name == "minimize_building_transitions" and self.model_cfg.get("room_capacity") == "aggregate": continue
+            first = len(self.objective_terms)
+            with self.recorder.measure(name, "soft", self.objective_terms):
+                add_family(family_cfg["weight"])
+            # Terms per family, to report the objective broken down by component
+            self.objective_components[name] = self.objective_terms[first:]
         
         if self.objective_terms:
             self.model.Maximize(sum(self.objective_terms))
 
+    def _add_room_class_capacity_constraints(self, fixed_room_intervals: Dict[int, List[Any]]):
+        """Concurrent lessons per room class never exceed its free rooms.
+
+        Used instead of per-room NoOverlap when rooms are matched after
+        solving. A class is a distinct set of compatible rooms: lessons whose
+        rooms all lie within it and fixed bookings of its rooms share a
+        cumulative of capacity |class|. Classes nest by capacity within a room
+        type, so at every slot this is Hall's condition for the room matching.
+        """
+        lessons = list(self.variables['lessons'].values())
+        for rooms in {frozenset(v['compatible_rooms']) for v in lessons}:
+            intervals = [v['interval'] for v in lessons if rooms.issuperset(v['compatible_rooms'])]
+            intervals += [i for r_idx in rooms for i in fixed_room_intervals.get(r_idx, [])]
+            self.model.AddCumulative(intervals, [1] * len(intervals), len(rooms))
+
+    def _add_late_slot_penalties(self, weight: int):
+        for l_idx, vars in self.variables['lessons'].items():
+            # Prefer earlier slots: minimize global start
+            self.objective_terms.append(vars['start'] * (-weight))
+
     def _add_resource_no_overlap_constraints(self):
         room_intervals = collections.defaultdict(list)
         teacher_intervals = collections.defaultdict(list)
@@ -95,29 +133,54 @@ class ConstraintManager:
             start, duration, end = vars['start'], vars['duration'], vars['end']
             discipline = vars['discipline']
             
-            vars['room_bools'] = {}
-            for r_idx in vars['compatible_rooms']:
-                presence = self.model.NewBoolVar(f'l{l_idx}_r{r_idx}')
-                self.model.Add(vars['room'] == r_idx).OnlyEnforceIf(presence)
-                self.model.Add(vars['room'] != r_idx).OnlyEnforceIf(presence.Not())
-                vars['room_bools'][r_idx] = presence
+            # In "literals" mode the presence literals already exist and carry
+            # the assignment themselves; otherwise channel them to the IntVars.
+            if 'room_bools' not in vars:
+                vars['room_bools'] = {}
+                for r_idx in vars['compatible_rooms']:
+                    presence = self.model.NewBoolVar(f'l{l_idx}_r{r_idx}')
+                    self.model.Add(vars['room'] == r_idx).OnlyEnforceIf(presence)
+                    self.model.Add(vars['room'] != r_idx).OnlyEnforceIf(presence.Not())
+                    vars['room_bools'][r_idx] = presence
+            for r_idx, presence in vars['room_bools'].items():
                 room_intervals[r_idx].append(self.model.NewOptionalIntervalVar(start, duration, end, presence, f'l{l_idx}_r{r_idx}_int'))
                 
-            vars['teacher_bools'] = {}
-            for t_idx in vars['compatible_teachers']:
-                presence = self.model.NewBoolVar(f'l{l_idx}_t{t_idx}')
-                self.model.Add(vars['teacher'] == t_idx).OnlyEnforceIf(presence)
-                self.model.Add(vars['teacher'] != t_idx).OnlyEnforceIf(presence.Not())
-                vars['teacher_bools'][t_idx] = presence
+            if 'teacher_bools' not in vars:
+                vars['teacher_bools'] = {}
+                for t_idx in vars['compatible_teachers']:
+                    presence = self.model.NewBoolVar(f'l{l_idx}_t{t_idx}')
+                    self.model.Add(vars['teacher'] == t_idx).OnlyEnforceIf(presence)
+                    self.model.Add(vars['teacher'] != t_idx).OnlyEnforceIf(presence.Not())
+                    vars['teacher_bools'][t_idx] = presence
+            for t_idx, presence in vars['teacher_bools'].items():
                 teacher_intervals[t_idx].append(self.model.NewOptionalIntervalVar(start, duration, end, presence, f'l{l_idx}_t{t_idx}_int'))
                 
             group_intervals[discipline.group_name].append(vars['interval'])
 
-        for intervals in room_intervals.values(): self.model.AddNoOverlap(intervals)
+        fixed_room_intervals = collections.defaultdict(list)
+        for b_idx, booking in enumerate(self.data.get('fixed_bookings', [])):
+            interval = self.model.NewFixedSizeIntervalVar(booking['start'], booking['duration'], f'fixed_{b_idx}')
+            if booking['room'] is not None:
+                room_intervals[booking['room']].append(interval)
+                fixed_room_intervals[booking['room']].append(interval)
+            if booking['teacher'] is not None: teacher_intervals[booking['teacher']].append(interval)
+            if booking['group'] is not None: group_intervals[booking['group']].append(interval)
+
+        if self.model_cfg.get("room_capacity") == "aggregate":
+            self._add_room_class_capacity_constraints(fixed_room_intervals)
+        else:
+            for intervals in room_intervals.values(): self.model.AddNoOverlap(intervals)
+            # Redundant global view of room scarcity on top of the per-room NoOverlap
+            if self.model_cfg.get("redundant_constraints", {}).get("room_classes"):
+                self._add_room_class_capacity_constraints(fixed_room_intervals)
         for intervals in teacher_intervals.values(): self.model.AddNoOverlap(intervals)
         for intervals in group_intervals.values(): self.model.AddNoOverlap(intervals)
 
     def _add_day_integrity_constraints(self):
+        if self.uses_day_index:
+            self._add_day_index_constraints()
+            return
+
         for l_idx, vars in self.variables['lessons'].items():
             start, end = vars['start'], vars['end']
             day_bools = []
@@ -130,7 +193,43 @@ class ConstraintManager:
             self.model.AddExactlyOne(day_bools)
             vars['day_bools'] = day_bools
 
+    def _fits_day(self, d_idx: int, duration: int) -> bool:
+        d_slots = self.day_to_slots[d_idx]
+        return max(d_slots) - min(d_slots) + 1 >= duration
+
+    def _start_intervals(self, duration: int) -> List[List[int]]:
+        """Start slots from which a lesson of `duration` slots stays within one day."""
+        if duration not in self._fit_intervals:
+            intervals = []
+            for d_idx in range(self.num_days):
+                if self._fits_day(d_idx, duration):
+                    d_slots = self.day_to_slots[d_idx]
+                    intervals.append([min(d_slots), max(d_slots) - duration + 1])
+            self._fit_intervals[duration] = intervals
+        return self._fit_intervals[duration]
+
+    def _fit_domain(self, duration: int) -> cp_model.Domain:
+        return cp_model.Domain.FromIntervals(self._start_intervals(duration))
+
+    def _add_day_index_constraints(self):
+        # Day integrity is a pure domain restriction on start; day and week
+        # are read from precomputed tables instead of one bool per day.
+        for l_idx, vars in self.variables['lessons'].items():
+            start = vars['start']
+            self.model.AddLinearExpressionInDomain(start, self._fit_domain(vars['duration']))
+
+            day = self.model.NewIntVar(0, self.num_days - 1, f'l{l_idx}_day')
+            self.model.AddElement(start, self.slot_to_day_table, day)
+            week = self.model.NewIntVar(0, len(self.weeks) - 1, f'l{l_idx}_week')
+            self.model.AddElement(day, self.day_to_week_table, week)
+            vars['day'] = day
+            vars['week'] = week
+
     def _add_teacher_availability_constraints(self):
+        if self.model_cfg.get("teacher_availability", "reified") == "domain":
+            self._add_teacher_availability_domains()
+            return
+
         valid_slots = self.data['valid_global_slots']
         for unav in self.data['teacher_unavailability']:
             t_idx = self.data['teacher_to_idx'].get(unav.teacher_id)
@@ -155,7 +254,116 @@ class ConstraintManager:
                             self.model.Add(i >= vars['end']).OnlyEnforceIf(b2)
                             self.model.Add(b1 + b2 >= 1).OnlyEnforceIf(presence)
 
+    def _teacher_blocked_ranges(self) -> Dict[int, List[Tuple[int, int]]]:
+        """Merged [first, last] global slot ranges each teacher is unavailable in.
+
+        Date ranges are located by bisection over the working days and weekday
+        exclusions by the days they name, so the work grows with the number of
+        unavailability records and days, not with slots x lessons.
+        """
+        weekday_to_days = collections.defaultdict(list)
+        for d_idx, date_obj in enumerate(self.day_dates):
+            weekday_to_days[date_obj.strftime('%A')].append(d_idx)
+
+        blocked_days = collections.defaultdict(set)
+        for unav in self.data['teacher_unavailability']:
+            t_idx = self.data['teacher_to_idx'].get(unav.teacher_id)
+            if t_idx is None: continue
+
+            if unav.start_date and unav.end_date:
+                lo = bisect.bisect_left(self.day_dates, unav.start_date)
+                hi = bisect.bisect_right(self.day_dates, unav.end_date)
+                blocked_days[t_idx].update(range(lo, hi))
+            for day_name in unav.unavailable_days:
+                blocked_days[t_idx].update(weekday_to_days.get(day_name, []))
+
+        blocked = {}
+        for t_idx, days in blocked_days.items():
+            ranges = []
+            for d_idx in sorted(days):
+                first, last = min(self.day_to_slots[d_idx]), max(self.day_to_slots[d_idx])
+                if ranges and ranges[-1][1] + 1 >= first:
+                    ranges[-1] = (ranges[-1][0], last)
+                else:
+                    ranges.append((first, last))
+            blocked[t_idx] = ranges
+        return blocked
+
+    def _allowed_start_intervals(self, duration: int, blocked: List[Tuple[int, int]]) -> List[List[int]]:
+        """Start intervals of a lesson that never overlaps a blocked range."""
+        if self.uses_day_index:
+            base = self._start_intervals(duration)
+        else:
+            base = [[0, len(self.valid_slots) - duration]]
+
+        # A start s is forbidden by [lo, hi] if [s, s + duration - 1] meets it
+        forbidden = [(lo - duration + 1, hi) for lo, hi in blocked]
+        allowed = []
+        f_idx = 0
+        for lo, hi in base:
+            cur = lo
+            while f_idx < len(forbidden) and forbidden[f_idx][1] < cur:
+                f_idx += 1
+            j = f_idx
+            while j < len(forbidden) and forbidden[j][0] <= hi:
+                if forbidden[j][0] > cur:
+                    allowed.append([cur, forbidden[j][0] - 1])
+                cur = max(cur, forbidden[j][1] + 1)
+                j += 1
+            if cur <= hi:
+                allowed.append([cur, hi])
+        return allowed
+
+    def _add_teacher_availability_domains(self):
+        # Precomputed sparse domain of allowed starts per (lesson, teacher),
+        # enforced on the teacher's presence literal.
+        blocked = self._teacher_blocked_ranges()
+        cache = {}
+        for l_idx, vars in self.variables['lessons'].items():
+            for t_idx, presence in vars['teacher_bools'].items():
+                if t_idx not in blocked: continue
+                key = (vars['duration'], t_idx)
+                if key not in cache:
+                    cache[key] = self._allowed_start_intervals(vars['duration'], blocked[t_idx])
+                allowed = cache[key]
+                if not allowed:
+                    self.model.Add(presence == 0)
+                    continue
+                domain = cp_model.Domain.FromIntervals(allowed)
+                if len(vars['teacher_bools']) == 1:
+                    self.model.AddLinearExpressionInDomain(vars['start'], domain)
+                else:
+                    self.model.AddLinearExpressionInDomain(vars['start'], domain).OnlyEnforceIf(presence)
+
+    def _fixed_weekly_load(self) -> Dict[int, Dict[Tuple[int, int], int]]:
+        """Slots already booked by fixed assignments, per teacher and week."""
+        load = collections.defaultdict(collections.Counter)
+        for booking in self.data.get('fixed_bookings', []):
+            if booking['teacher'] is not None:
+                load[booking['teacher']][self.slot_to_week[booking['start']]] += booking['duration']
+        return load
+
     def _add_teacher_load_constraints(self):
+        fixed_load = self._fixed_weekly_load()
+        if self.uses_day_index:
+            # Weekly load as a cumulative over the week axis: one optional
+            # unit-length interval per (lesson, teacher) at the lesson's week.
+            for t_idx, teacher in enumerate(self.data['teachers']):
+                max_slots = (teacher.max_hours_per_week * 60) // 90
+                intervals, demands = [], []
+                for l_idx, vars in self.variables['lessons'].items():
+                    if t_idx in vars['teacher_bools']:
+                        intervals.append(self.model.NewOptionalFixedSizeIntervalVar(
+                            vars['week'], 1, vars['teacher_bools'][t_idx], f'l{l_idx}_t{t_idx}_week_int'))
+                        demands.append(vars['duration'])
+                if not intervals: continue
+                for w_key, booked in fixed_load[t_idx].items():
+                    intervals.append(self.model.NewFixedSizeIntervalVar(
+                        self.week_to_idx[w_key], 1, f't{t_idx}_w{w_key}_fixed_load'))
+                    demands.append(booked)
+                self.model.AddCumulative(intervals, demands, max_slots)
+            return
+
         for t_idx, teacher in enumerate(self.data['teachers']):
             max_slots = (teacher.max_hours_per_week * 60) // 90
             for w_key in self.weeks:
@@ -166,12 +374,92 @@ class ConstraintManager:
                         in_week = self.model.NewBoolVar(f'l{l_idx}_w{w_key}')
                         self.model.Add(in_week == sum(vars['day_bools'][d] for d in days_in_week))
                         
-                        presence_in_week = self.model.NewBoolVar(f'l{l_idx}_t{t_idx}_w{w_key}')
-                        self.model.AddMultiplicationEquality(presence_in_week, [in_week, vars['teacher_bools'][t_idx]])
+                        presence_in_week = self.lits.conjunction(in_week, vars['teacher_bools'][t_idx])
                         weekly_lessons.append(presence_in_week * vars['duration'])
                 
                 if weekly_lessons:
-                    self.model.Add(sum(weekly_lessons) <= max_slots)
+                    self.model.Add(sum(weekly_lessons) <= max_slots - fixed_load[t_idx][w_key])
+
+    def _add_group_daily_slot_caps(self):
+        """Redundant: a group's lessons fill at most the free slots of each day."""
+        day_slots = [len(self.day_to_slots[d_idx]) for d_idx in range(self.num_days)]
+        fixed = collections.Counter()
+        for booking in self.data.get('fixed_bookings', []):
+            if booking['group'] is not None:
+                fixed[(booking['group'], self.slot_to_day[booking['start']])] += booking['duration']
+        by_group = collections.defaultdict(list)
+        for l_idx, vars in self.variables['lessons'].items():
+            by_group[vars['discipline'].group_name].append((l_idx, vars))
+
+        for group, lessons in by_group.items():
+            if self.uses_day_index:
+                # Cumulative over the day axis; shorter days and fixed lessons
+                # are blocked by constant intervals.
+                capacity = max(day_slots)
+                intervals = [self.model.NewFixedSizeIntervalVar(vars['day'], 1, f'l{l_idx}_day_cap_int')
+                             for l_idx, vars in lessons]
+                demands = [vars['duration'] for _, vars in lessons]
+                for d_idx in range(self.num_days):
+                    blocked = capacity - day_slots[d_idx] + fixed[(group, d_idx)]
+                    if blocked > 0:
+                        intervals.append(self.model.NewFixedSizeIntervalVar(d_idx, 1, f'{group}_d{d_idx}_blocked'))
+                        demands.append(blocked)
+                self.model.AddCumulative(intervals, demands, capacity)
+            else:
+                for d_idx in range(self.num_days):
+                    self.model.Add(sum(vars['duration'] * vars['day_bools'][d_idx] for _, vars in lessons)
+                                   <= day_slots[d_idx] - fixed[(group, d_idx)])
+
+    def _add_teacher_load_bounds(self):
+        """Redundant bounds on each teacher's total load over the horizon.
+
+        A teacher never exceeds the sum of their remaining weekly capacities.
+        For each distinct pool of candidate teachers, the lessons restricted
+        to that pool need some number of slots; each pool member must take
+        at least that demand minus what the other members can still take.
+        """
+        fixed_load = self._fixed_weekly_load()
+        capacity = [
+            sum(max(0, (teacher.max_hours_per_week * 60) // 90 - fixed_load[t_idx][w_key]) for w_key in self.weeks)
+            for t_idx, teacher in enumerate(self.data['teachers'])
+        ]
+        lessons = list(self.variables['lessons'].values())
+        for t_idx in range(len(capacity)):
+            load = [v['duration'] * v['teacher_bools'][t_idx] for v in lessons if t_idx in v['teacher_bools']]
+            if load: self.model.Add(sum(load) <= capacity[t_idx])
+
+        for pool in {frozenset(v['teacher_bools']) for v in lessons if len(v['teacher_bools']) > 1}:
+            covered = [v for v in lessons if pool.issuperset(v['teacher_bools'])]
+            demand = sum(v['duration'] for v in covered)
+            for t_idx in pool:
+                lower = demand - sum(capacity[other] for other in pool if other != t_idx)
+                if lower > 0:
+                    self.model.Add(sum(v['duration'] * v['teacher_bools'][t_idx]
+                                       for v in covered if t_idx in v['teacher_bools']) >= lower)
+
+    def _add_lesson_order_constraints(self):
+        # Lessons of one discipline and type are interchangeable for the solver;
+        # chaining them by lesson_number breaks that symmetry and keeps topics in order.
+        by_type = collections.defaultdict(list)
+        for l_idx, vars in self.variables['lessons'].items():
+            by_type[(vars['discipline'].discipline_id, vars['lesson'].lesson_type)].append(vars)
+        for key in by_type:
+            by_type[key].sort(key=lambda v: v['lesson'].lesson_number)
+
+        if self.model_cfg.get("order_lessons_by_number"):
+            for lessons in by_type.values():
+                for prev, nxt in zip(lessons, lessons[1:]):
+                    self.model.Add(prev['end'] <= nxt['start'])
+
+        if self.model_cfg.get("lecture_before_practice"):
+            # Practice/lab number k starts after lecture k (or the last lecture
+            # if there are fewer lectures).
+            for (disc_id, lesson_type), lessons in by_type.items():
+                lectures = by_type.get((disc_id, 'lecture'))
+                if lesson_type == 'lecture' or not lectures: continue
+                for pos, vars in enumerate(lessons):
+                    lecture = lectures[min(pos, len(lectures) - 1)]
+                    self.model.Add(lecture['end'] <= vars['start'])
 
     def _add_minimize_gaps_constraints(self, entity_type: str, weight: int):
         entities = []
@@ -181,24 +469,26 @@ class ConstraintManager:
             entities = range(len(self.data['teachers']))
 
         for entity in entities:
+            entity_lessons = []
+            for l_idx, vars in self.variables['lessons'].items():
+                if entity_type == "group":
+                    if vars['discipline'].group_name == entity:
+                        entity_lessons.append((l_idx, vars))
+                else:
+                    if entity in vars['teacher_bools']:
+                        entity_lessons.append((l_idx, vars))
+
+            if self.uses_day_index:
+                self._add_day_index_gaps(entity_type, entity, entity_lessons, weight)
+                continue
+
             for d_idx in range(self.num_days):
                 relevant_lessons = []
-                for l_idx, vars in self.variables['lessons'].items():
-                    is_relevant = False
-                    if entity_type == "group":
-                        if vars['discipline'].group_name == entity:
-                            is_relevant = True
-                    else:
-                        if entity in vars['teacher_bools']:
-                            is_relevant = True
-                    
-                    if is_relevant:
-                        presence = vars['day_bools'][d_idx]
-                        if entity_type == "teacher":
-                            p2 = self.model.NewBoolVar(f'l{l_idx}_t{entity}_d{d_idx}')
-                            self.model.AddMultiplicationEquality(p2, [presence, vars['teacher_bools'][entity]])
-                            presence = p2
-                        relevant_lessons.append((l_idx, vars, presence))
+                for l_idx, vars in entity_lessons:
+                    presence = vars['day_bools'][d_idx]
+                    if entity_type == "teacher":
+                        presence = self.lits.conjunction(presence, vars['teacher_bools'][entity])
+                    relevant_lessons.append((l_idx, vars, presence))
                 
                 if not relevant_lessons: continue
                 
@@ -209,14 +499,13 @@ class ConstraintManager:
                 first = self.model.NewIntVar(day_start, day_end, f'{entity_type}_{entity}_d{d_idx}_first')
                 last = self.model.NewIntVar(day_start, day_end, f'{entity_type}_{entity}_d{d_idx}_last')
                 
+                # start/end are global slot indices, so bound first/last only
+                # for lessons actually placed on this day.
                 for l_idx, vars, presence in relevant_lessons:
-                    self.model.Add(first <= vars['start'] + M * (1 - presence))
-                    self.model.Add(last >= vars['end'] - M * (1 - presence))
+                    self.model.Add(first <= vars['start']).OnlyEnforceIf(presence)
+                    self.model.Add(last >= vars['end']).OnlyEnforceIf(presence)
                 
-                any_lesson = self.model.NewBoolVar(f'{entity_type}_{entity}_d{d_idx}_any')
-                sum_p = sum(p for _, _, p in relevant_lessons)
-                self.model.Add(sum_p >= 1).OnlyEnforceIf(any_lesson)
-                self.model.Add(sum_p == 0).OnlyEnforceIf(any_lesson.Not())
+                any_lesson = self.lits.disjunction(*(p for _, _, p in relevant_lessons))
                 
                 total_duration = self.model.NewIntVar(0, M, f'{entity_type}_{entity}_d{d_idx}_dur')
                 self.model.Add(total_duration == sum(p * v['duration'] for _, v, p in relevant_lessons))
@@ -231,8 +520,61 @@ class ConstraintManager:
                 
                 self.objective_terms.append(gap * (-weight))
 
+    def _add_day_index_gaps(self, entity_type: str, entity: Any, entity_lessons: List[Tuple[int, Any]], weight: int):
+        """Gaps of one group or teacher from its first and last slot of each day.
+
+        Each lesson reads the bounds of its own day with AddElement on its day
+        index, so nothing is created per lesson and day. Summed over the days,
+        the gaps are the spans minus the entity's lesson slots; the span of a
+        day without lessons is free and driven to 0 by the objective.
+        """
+        if not entity_lessons: return
+        firsts, lasts = [], []
+        for d_idx in range(self.num_days):
+            day_start = min(self.day_to_slots[d_idx])
+            day_end = max(self.day_to_slots[d_idx]) + 1
+            first = self.model.NewIntVar(day_start, day_end, f'{entity_type}_{entity}_d{d_idx}_first')
+            last = self.model.NewIntVar(day_start, day_end, f'{entity_type}_{entity}_d{d_idx}_last')
+            self.model.Add(last >= first)
+            firsts.append(first)
+            lasts.append(last)
+
+        busy = []
+        for l_idx, vars in entity_lessons:
+            first = self.model.NewIntVar(0, len(self.valid_slots), f'l{l_idx}_{entity_type}_{entity}_first')
+            last = self.model.NewIntVar(0, len(self.valid_slots), f'l{l_idx}_{entity_type}_{entity}_last')
+            self.model.AddElement(vars['day'], firsts, first)
+            self.model.AddElement(vars['day'], lasts, last)
+            if entity_type == "teacher":
+                presence = vars['teacher_bools'][entity]
+                self.model.Add(first <= vars['start']).OnlyEnforceIf(presence)
+                self.model.Add(last >= vars['end']).OnlyEnforceIf(presence)
+                busy.append(presence * vars['duration'])
+            else:
+                self.model.Add(first <= vars['start'])
+                self.model.Add(last >= vars['end'])
+                busy.append(vars['duration'])
+        # The entity's lessons never overlap, so the spans cover its lesson slots
+        gap = self.model.NewIntVar(0, len(self.valid_slots), f'{entity_type}_{entity}_gap')
+        self.model.Add(gap == sum(lasts) - sum(firsts) - sum(busy))
+        self.objective_terms.append(gap * (-weight))
+
     def _add_balance_workload_constraints(self, weight: int):
         groups = sorted(list(set(v['discipline'].group_name for v in self.variables['lessons'].values())))
+        if self.uses_day_index:
+            # Daily load as a cumulative over the day axis whose capacity is
+            # the group's maximum daily load.
+            for group in groups:
+                max_daily_slots = self.model.NewIntVar(0, 10, f'max_daily_slots_{group}')
+                intervals, demands = [], []
+                for l_idx, v in self.variables['lessons'].items():
+                    if v['discipline'].group_name == group:
+                        intervals.append(self.model.NewFixedSizeIntervalVar(v['day'], 1, f'l{l_idx}_day_int'))
+                        demands.append(v['duration'])
+                self.model.AddCumulative(intervals, demands, max_daily_slots)
+                self.objective_terms.append(max_daily_slots * (-weight))
+            return
+
         for group in groups:
             max_daily_slots = self.model.NewIntVar(0, 10, f'max_daily_slots_{group}')
             for d_idx in range(self.num_days):
@@ -245,36 +587,36 @@ class ConstraintManager:
     def _add_consecutive_lessons_constraints(self, weight: int):
         # If two lessons of the same discipline for the same group are on the same day,
         # we reward them being consecutive.
+        # Each lesson gets a "successor" index: another lesson of the same
+        # (group, discipline) starting exactly at its end on the same day, or
+        # the sentinel n for none. A group's lessons never overlap, so each
+        # adjacent pair is counted exactly once, by its earlier lesson.
         group_disc_lessons = collections.defaultdict(list)
         for l_idx, vars in self.variables['lessons'].items():
             key = (vars['discipline'].group_name, vars['discipline'].discipline_id)
             group_disc_lessons[key].append(vars)
-            
+
+        # Ends after which a successor still starts on the same day
+        same_day_ends = cp_model.Domain.FromIntervals([
+            [min(self.day_to_slots[d]) + 1, max(self.day_to_slots[d])]
+            for d in range(self.num_days) if len(self.day_to_slots[d]) > 1
+        ])
+
         for key, lessons in group_disc_lessons.items():
             if len(lessons) < 2: continue
-            for d_idx in range(self.num_days):
-                for i in range(len(lessons)):
-                    for j in range(i + 1, len(lessons)):
-                        v1, v2 = lessons[i], lessons[j]
-                        both_on_day = self.model.NewBoolVar(f'cons_{key}_{d_idx}_{i}_{j}_both')
-                        self.model.AddMultiplicationEquality(both_on_day, [v1['day_bools'][d_idx], v2['day_bools'][d_idx]])
-                        
-                        # Are they consecutive? 
-                        # v1.end == v2.start OR v2.end == v1.start
-                        is_cons = self.model.NewBoolVar(f'cons_{key}_{d_idx}_{i}_{j}_is')
-                        c1 = self.model.NewBoolVar(f'cons_{key}_{d_idx}_{i}_{j}_c1')
-                        c2 = self.model.NewBoolVar(f'cons_{key}_{d_idx}_{i}_{j}_c2')
-                        self.model.Add(v1['end'] == v2['start']).OnlyEnforceIf(c1)
-                        self.model.Add(v1['end'] != v2['start']).OnlyEnforceIf(c1.Not())
-                        self.model.Add(v2['end'] == v1['start']).OnlyEnforceIf(c2)
-                        self.model.Add(v2['end'] != v1['start']).OnlyEnforceIf(c2.Not())
-                        
-                        self.model.Add(c1 + c2 >= 1).OnlyEnforceIf(is_cons)
-                        self.model.Add(c1 + c2 == 0).OnlyEnforceIf(is_cons.Not())
-                        
-                        reward = self.model.NewBoolVar(f'cons_{key}_{d_idx}_{i}_{j}_reward')
-                        self.model.AddMultiplicationEquality(reward, [both_on_day, is_cons])
-                        self.objective_terms.append(reward * weight)
+            n = len(lessons)
+            starts = [v['start'] for v in lessons]
+            for i, vars in enumerate(lessons):
+                succ = self.model.NewIntVarFromDomain(
+                    cp_model.Domain.FromValues([j for j in range(n + 1) if j != i]),
+                    f'cons_{key}_{i}_succ')
+                self.model.AddElement(succ, starts + [vars['end']], vars['end'])
+
+                has_succ = self.model.NewBoolVar(f'cons_{key}_{i}_has_succ')
+                self.model.Add(succ != n).OnlyEnforceIf(has_succ)
+                self.model.Add(succ == n).OnlyEnforceIf(has_succ.Not())
+                self.model.AddLinearExpressionInDomain(vars['end'], same_day_ends).OnlyEnforceIf(has_succ)
+                self.objective_terms.append(has_succ * weight)
 
     def _add_building_transition_constraints(self, weight: int):
         buildings = sorted(list(set(r.building for r in self.data['rooms'])))
@@ -283,47 +625,112 @@ class ConstraintManager:
         for r_idx, room in enumerate(self.data['rooms']):
             room_to_building[r_idx] = building_to_idx[room.building]
             
+        if self.model_cfg.get("building_transitions", "pairwise") == "sequence":
+            self._add_building_sequence_constraints(weight, room_to_building)
+            return
+
         for l_idx, vars in self.variables['lessons'].items():
             b_var = self.model.NewIntVar(0, len(buildings) - 1, f'l{l_idx}_building')
-            self.model.AddElement(vars['room'], room_to_building, b_var)
+            if vars['room'] is not None:
+                self.model.AddElement(vars['room'], room_to_building, b_var)
+            else:
+                self.model.Add(b_var == sum(room_to_building[r_idx] * presence
+                                            for r_idx, presence in vars['room_bools'].items()))
             vars['building_var'] = b_var
 
+        diff_buildings, same_days = {}, {}
         for t_idx in range(len(self.data['teachers'])):
-            for d_idx in range(self.num_days):
-                teacher_day_lessons = []
-                for l_idx, vars in self.variables['lessons'].items():
-                    if t_idx in vars['teacher_bools']:
-                        p = self.model.NewBoolVar(f'l{l_idx}_t{t_idx}_d{d_idx}_b')
-                        self.model.AddMultiplicationEquality(p, [vars['day_bools'][d_idx], vars['teacher_bools'][t_idx]])
-                        teacher_day_lessons.append((vars['building_var'], p))
-                
-                if len(teacher_day_lessons) < 2: continue
-                
-                for i in range(len(teacher_day_lessons)):
-                    for j in range(i + 1, len(teacher_day_lessons)):
-                        b1, p1 = teacher_day_lessons[i]
-                        b2, p2 = teacher_day_lessons[j]
-                        both_present = self.model.NewBoolVar(f't{t_idx}_d{d_idx}_l{i}_l{j}_both')
-                        self.model.AddMultiplicationEquality(both_present, [p1, p2])
-                        
-                        diff_building = self.model.NewBoolVar(f't{t_idx}_d{d_idx}_l{i}_l{j}_diff')
-                        self.model.Add(b1 != b2).OnlyEnforceIf(diff_building)
-                        self.model.Add(b1 == b2).OnlyEnforceIf(diff_building.Not())
-                        
-                        penalty = self.model.NewBoolVar(f't{t_idx}_d{d_idx}_l{i}_l{j}_penalty')
-                        self.model.AddMultiplicationEquality(penalty, [both_present, diff_building])
-                        self.objective_terms.append(penalty * (-weight))
+            # (l1, l2, literals that hold when t_idx teaches both on one day)
+            pairs = []
+            if self.uses_day_index:
+                # One same-day literal per pair, from the day indices
+                teacher_lessons = [(l_idx, vars['teacher_bools'][t_idx])
+                                   for l_idx, vars in self.variables['lessons'].items()
+                                   if t_idx in vars['teacher_bools']]
+                for i in range(len(teacher_lessons)):
+                    for j in range(i + 1, len(teacher_lessons)):
+                        l1, p1 = teacher_lessons[i]
+                        l2, p2 = teacher_lessons[j]
+                        if (l1, l2) not in same_days:
+                            d1 = self.variables['lessons'][l1]['day']
+                            d2 = self.variables['lessons'][l2]['day']
+                            same_day = self.model.NewBoolVar(f'l{l1}_l{l2}_same_day')
+                            self.model.Add(d1 == d2).OnlyEnforceIf(same_day)
+                            self.model.Add(d1 != d2).OnlyEnforceIf(same_day.Not())
+                            same_days[(l1, l2)] = same_day
+                        pairs.append((l1, l2, [p1, p2, same_days[(l1, l2)]]))
+            else:
+                for d_idx in range(self.num_days):
+                    teacher_day_lessons = []
+                    for l_idx, vars in self.variables['lessons'].items():
+                        if t_idx in vars['teacher_bools']:
+                            p = self.lits.conjunction(vars['day_bools'][d_idx], vars['teacher_bools'][t_idx])
+                            teacher_day_lessons.append((l_idx, p))
+
+                    for i in range(len(teacher_day_lessons)):
+                        for j in range(i + 1, len(teacher_day_lessons)):
+                            l1, p1 = teacher_day_lessons[i]
+                            l2, p2 = teacher_day_lessons[j]
+                            pairs.append((l1, l2, [p1, p2]))
+
+            for l1, l2, together in pairs:
+                if (l1, l2) not in diff_buildings:
+                    b1 = self.variables['lessons'][l1]['building_var']
+                    b2 = self.variables['lessons'][l2]['building_var']
+                    diff_building = self.model.NewBoolVar(f'l{l1}_l{l2}_diff')
+                    self.model.Add(b1 != b2).OnlyEnforceIf(diff_building)
+                    self.model.Add(b1 == b2).OnlyEnforceIf(diff_building.Not())
+                    diff_buildings[(l1, l2)] = diff_building
+
+                penalty = self.lits.conjunction(*together, diff_buildings[(l1, l2)])
+                self.objective_terms.append(penalty * (-weight))
+
+    def _add_building_sequence_constraints(self, weight: int, room_to_building: List[int]):
+        # Each teacher is in one building at every slot. A lesson pins the
+        # slots it covers to its building: per building, its interval shares a
+        # NoOverlap with unit intervals of the slots where the teacher is
+        # elsewhere. Free slots are unconstrained, so a change of building
+        # between adjacent slots of a day is paid once per transition between
+        # successive lessons, and nothing grows with pairs of lessons.
+        for t_idx in range(len(self.data['teachers'])):
+            lessons = [(l_idx, vars) for l_idx, vars in self.variables['lessons'].items()
+                       if t_idx in vars['teacher_bools']]
+            buildings = sorted({room_to_building[r_idx] for _, vars in lessons for r_idx in vars['compatible_rooms']})
+            if len(lessons) < 2 or len(buildings) < 2: continue
+
+            at = []
+            for s_idx in range(len(self.valid_slots)):
+                at.append({b: self.model.NewBoolVar(f't{t_idx}_s{s_idx}_b{b}') for b in buildings})
+                self.model.AddExactlyOne(at[-1].values())
+
+            for b in buildings:
+                intervals = [self.model.NewOptionalFixedSizeIntervalVar(s_idx, 1, at[s_idx][b].Not(),
+                                                                        f't{t_idx}_s{s_idx}_not_b{b}')
+                             for s_idx in range(len(self.valid_slots))]
+                for l_idx, vars in lessons:
+                    rooms = [p for r_idx, p in vars['room_bools'].items() if room_to_building[r_idx] == b]
+                    if not rooms: continue
+                    presence = self.lits.conjunction(vars['teacher_bools'][t_idx], self.lits.disjunction(*rooms))
+                    intervals.append(self.model.NewOptionalIntervalVar(
+                        vars['start'], vars['duration'], vars['end'], presence, f'l{l_idx}_t{t_idx}_b{b}_int'))
+                self.model.AddNoOverlap(intervals)
+
+            for s_idx in range(1, len(self.valid_slots)):
+                if self.slot_to_day[s_idx] != self.slot_to_day[s_idx - 1]: continue
+                change = self.model.NewBoolVar(f't{t_idx}_s{s_idx}_change')
+                for b in buildings:
+                    self.model.AddBoolOr([at[s_idx][b].Not(), at[s_idx - 1][b], change])
+                self.objective_terms.append(change * (-weight))
 
     def _add_seniority_priority_constraints(self, weight: int):
         for l_idx, vars in self.variables['lessons'].items():
             for t_idx, t_bool in vars['teacher_bools'].items():
                 teacher = self.data['teachers'][t_idx]
                 seniority = teacher.seniority
-                # Reward earlier slots for senior teachers. 
-                # Use a bool product to only apply when teacher is assigned.
-                # seniority * weight * (max_slots - start)
-                # But start is global. 
-                # simpler: penalty = seniority * weight * start
-                term = self.model.NewIntVar(0, 1000000, f'l{l_idx}_t{t_idx}_seniority')
-                self.model.AddMultiplicationEquality(term, [t_bool, vars['start']])
+                # Reward earlier slots for senior teachers:
+                # penalty = seniority * weight * start, only when the teacher is assigned.
+                # Indicator encoding: term equals start under t_bool, 0 otherwise.
+                term = self.model.NewIntVar(0, len(self.valid_slots) - 1, f'l{l_idx}_t{t_idx}_seniority')
+                self.model.Add(term == vars['start']).OnlyEnforceIf(t_bool)
+                self.model.Add(term == 0).OnlyEnforceIf(t_bool.Not())
                 self.objective_terms.append(term * (-weight * seniority))
\ No newline at end of file
@@ -1,13 +1,22 @@
+import numpy as np
 import pandas as pd
 import os
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Callable
 from .model import (
     Teacher, TeacherUnavailability, Discipline, Lesson,
     Room, TimeSlot, CalendarEntry
 )
 
 class DataLoader:
+    """Reads the input CSV files into model objects.
+
+    Objects are built from whole columns rather than row by row: integer
+    columns are converted in one numpy pass, and list, date and time fields
+    are parsed once per distinct value. Values and errors are the same as
+    with per-row conversion (_to_int, strptime).
+    """
+
     def __init__(self, input_dir: str):
         self.input_dir = input_dir
 
@@ -29,18 +38,48 @@ class DataLoader:
         except (ValueError, TypeError):
             return None
 
+    def _int_column(self, values: pd.Series) -> List[int]:
+        """_to_int over a whole column."""
+        if pd.api.types.is_integer_dtype(values) and not pd.api.types.is_extension_array_dtype(values):
+            return values.tolist()
+        if pd.api.types.is_float_dtype(values):
+            filled = values.fillna(0)
+            # inf and values beyond int64 keep the per-value conversion
+            if (filled.abs() < 2 ** 63).all():
+                return filled.astype('int64').tolist()
+        return [self._to_int(v) for v in values.tolist()]
+
+    @staticmethod
+    def _map_column(values: pd.Series, parse: Callable[[Any], Any]) -> List[Any]:
+        """parse() applied once per distinct value of a column (missing values included)."""
+        codes, uniques = pd.factorize(values)
+        parsed = [parse(v) for v in uniques]
+        if (codes < 0).any():
+            parsed.append(parse(np.nan))
+        # Lists are copied so rows do not share them
+        return [list(parsed[c]) if isinstance(parsed[c], list) else parsed[c] for c in codes.tolist()]
+
+    @staticmethod
+    def _optional_column(df: pd.DataFrame, column: str, default: Any) -> pd.Series:
+        return df[column] if column in df else pd.Series([default] * len(df), index=df.index, dtype=object)
+
+    @staticmethod
+    def _split_list(val: Any) -> List[str]:
+        if pd.isna(val) or val == '':
+            return []
+        return [x.strip() for x in str(val).split(';') if x.strip()]
+
     def load_teachers(self) -> List[Teacher]:
         df = pd.read_csv(os.path.join(self.input_dir, 'teachers.csv'))
+        if df.empty: return []
         return [
             Teacher(
-                teacher_id=self._to_int(row['teacher_id']),
-                last_name=row['last_name'],
-                first_name=row['first_name'],
-                middle_name=row['middle_name'],
-                position=row['position'],
-                max_hours_per_week=self._to_int(row['max_hours_per_week']),
-                seniority=self._to_int(row['seniority'])
-            ) for _, row in df.iterrows()
+                teacher_id=teacher_id, last_name=last_name, first_name=first_name, middle_name=middle_name,
+                position=position, max_hours_per_week=max_hours, seniority=seniority
+            ) for teacher_id, last_name, first_name, middle_name, position, max_hours, seniority in zip(
+                self._int_column(df['teacher_id']), df['last_name'].tolist(), df['first_name'].tolist(),
+                df['middle_name'].tolist(), df['position'].tolist(),
+                self._int_column(df['max_hours_per_week']), self._int_column(df['seniority']))
         ]
 
     def load_teacher_unavailability(self) -> List[TeacherUnavailability]:
@@ -48,7 +87,8 @@ class DataLoader:
         if not os.path.exists(file_path):
             return []
         df = pd.read_csv(file_path)
-        
+        if df.empty: return []
+
         def parse_date(val):
             if pd.isna(val) or val == '':
                 return None
@@ -57,24 +97,21 @@ class DataLoader:
             except ValueError:
                 return None
 
-        def parse_days(val):
-            if pd.isna(val) or val == '':
-                return []
-            return [d.strip() for d in str(val).split(';') if d.strip()]
-
         return [
             TeacherUnavailability(
-                teacher_id=self._to_int(row['teacher_id']),
-                start_date=parse_date(row['start_date']),
-                end_date=parse_date(row['end_date']),
-                reason=row['reason'],
-                unavailable_days=parse_days(row.get('unavailable_days', ''))
-            ) for _, row in df.iterrows()
+                teacher_id=teacher_id, start_date=start_date, end_date=end_date,
+                reason=reason, unavailable_days=unavailable_days
+            ) for teacher_id, start_date, end_date, reason, unavailable_days in zip(
+                self._int_column(df['teacher_id']),
+                self._map_column(df['start_date'], parse_date), self._map_column(df['end_date'], parse_date),
+                df['reason'].tolist(),
+                self._map_column(self._optional_column(df, 'unavailable_days', ''), self._split_list))
         ]
 
     def load_disciplines(self) -> List[Discipline]:
         df = pd.read_csv(os.path.join(self.input_dir, 'disciplines.csv'))
-        
+        if df.empty: return []
+
         def parse_ids(val):
             if pd.isna(val) or str(val).strip() == '':
                 return []
@@ -84,77 +121,79 @@ class DataLoader:
             except (ValueError, TypeError):
                 return []
 
+        columns = zip(
+            self._int_column(df['discipline_id']), df['discipline_name'].tolist(), df['group_name'].tolist(),
+            self._int_column(df['group_size']), self._int_column(df['semester']),
+            self._int_column(df['lecture_hours']), self._int_column(df['practice_hours']),
+            self._int_column(df['lab_hours']), self._int_column(df['lecturer_id']),
+            self._map_column(df['practice_teacher_ids'], parse_ids), self._map_column(df['lab_teacher_ids'], parse_ids))
         return [
             Discipline(
-                discipline_id=self._to_int(row['discipline_id']),
-                discipline_name=row['discipline_name'],
-                group_name=row['group_name'],
-                group_size=self._to_int(row['group_size']),
-                semester=self._to_int(row['semester']),
-                lecture_hours=self._to_int(row['lecture_hours']),
-                practice_hours=self._to_int(row['practice_hours']),
-                lab_hours=self._to_int(row['lab_hours']),
-                lecturer_id=self._to_int(row['lecturer_id']),
-                practice_teacher_ids=parse_ids(row['practice_teacher_ids']),
-                lab_teacher_ids=parse_ids(row['lab_teacher_ids'])
-            ) for _, row in df.iterrows()
+                discipline_id=discipline_id, discipline_name=name, group_name=group_name,
+                group_size=group_size, semester=semester, lecture_hours=lecture_hours,
+                practice_hours=practice_hours, lab_hours=lab_hours, lecturer_id=lecturer_id,
+                practice_teacher_ids=practice_ids, lab_teacher_ids=lab_ids
+            ) for (discipline_id, name, group_name, group_size, semester, lecture_hours, practice_hours,
+                   lab_hours, lecturer_id, practice_ids, lab_ids) in columns
         ]
 
     def load_thematic_plans(self) -> List[Lesson]:
         df = pd.read_csv(os.path.join(self.input_dir, 'thematic_plans.csv'))
+        if df.empty: return []
         return [
             Lesson(
-                discipline_id=self._to_int(row['discipline_id']),
-                lesson_type=row['lesson_type'],
-                lesson_number=self._to_int(row['lesson_number']),
-                topic=row['topic'],
-                duration_minutes=self._to_int(row['duration_minutes']),
-                required_room_type=row['required_room_type'],
-                min_capacity=self._to_int(row['min_capacity'])
-            ) for _, row in df.iterrows()
+                discipline_id=discipline_id, lesson_type=lesson_type, lesson_number=lesson_number,
+                topic=topic, duration_minutes=duration, required_room_type=room_type, min_capacity=min_capacity
+            ) for discipline_id, lesson_type, lesson_number, topic, duration, room_type, min_capacity in zip(
+                self._int_column(df['discipline_id']), df['lesson_type'].tolist(),
+                self._int_column(df['lesson_number']), df['topic'].tolist(),
+                self._int_column(df['duration_minutes']), df['required_room_type'].tolist(),
+                self._int_column(df['min_capacity']))
         ]
 
     def load_rooms(self) -> List[Room]:
         df = pd.read_csv(os.path.join(self.input_dir, 'rooms.csv'))
-        
-        def parse_equipment(val):
-            if pd.isna(val) or val == '':
-                return []
-            return [e.strip() for e in str(val).split(';') if e.strip()]
-
+        if df.empty: return []
         return [
             Room(
-                room_id=self._to_int(row['room_id']),
-                room_name=row['room_name'],
-                building=row['building'],
-                room_type=row['room_type'],
-                capacity=self._to_int(row['capacity']),
-                equipment=parse_equipment(row.get('equipment', ''))
-            ) for _, row in df.iterrows()
+                room_id=room_id, room_name=room_name, building=building,
+                room_type=room_type, capacity=capacity, equipment=equipment
+            ) for room_id, room_name, building, room_type, capacity, equipment in zip(
+                self._int_column(df['room_id']), df['room_name'].tolist(), df['building'].tolist(),
+                df['room_type'].tolist(), self._int_column(df['capacity']),
+                self._map_column(self._optional_column(df, 'equipment', ''), self._split_list))
         ]
 
     def load_timeslots(self) -> List[TimeSlot]:
         df = pd.read_csv(os.path.join(self.input_dir, 'timeslots.csv'))
+        if df.empty: return []
+
+        def parse_time(val):
+            return datetime.strptime(str(val), '%H:%M').time()
+
         return [
             TimeSlot(
-                slot_id=self._to_int(row['slot_id']),
-                day_of_week=row['day_of_week'],
-                start_time=datetime.strptime(str(row['start_time']), '%H:%M').time(),
-                end_time=datetime.strptime(str(row['end_time']), '%H:%M').time(),
-                duration_minutes=self._to_int(row['duration_minutes']),
-                slot_number=self._to_int(row['slot_number'])
-            ) for _, row in df.iterrows()
+                slot_id=slot_id, day_of_week=day_of_week, start_time=start_time, end_time=end_time,
+                duration_minutes=duration, slot_number=slot_number
+            ) for slot_id, day_of_week, start_time, end_time, duration, slot_number in zip(
+                self._int_column(df['slot_id']), df['day_of_week'].tolist(),
+                self._map_column(df['start_time'], parse_time), self._map_column(df['end_time'], parse_time),
+                self._int_column(df['duration_minutes']), self._int_column(df['slot_number']))
         ]
 
     def load_calendar(self) -> List[CalendarEntry]:
         df = pd.read_csv(os.path.join(self.input_dir, 'calendar.csv'))
+        if df.empty: return []
+
+        def parse_date(val):
+            return datetime.strptime(str(val), '%Y-%m-%d').date()
+
         return [
             CalendarEntry(
-                date=datetime.strptime(str(row['date']), '%Y-%m-%d').date(),
-                is_holiday=bool(row['is_holiday']),
-                is_working_day=bool(row['is_working_day']),
-                description=row['description']
-            ) for _, row in df.iterrows()
+                date=day, is_holiday=bool(is_holiday), is_working_day=bool(is_working_day), description=description
+            ) for day, is_holiday, is_working_day, description in zip(
+                self._map_column(df['date'], parse_date), df['is_holiday'].tolist(),
+                df['is_working_day'].tolist(), df['description'].tolist())
         ]
 
     def load_all(self) -> Dict[str, Any]:
@@ -166,4 +205,4 @@ class DataLoader:
             'rooms': self.load_rooms(),
             'timeslots': self.load_timeslots(),
             'calendar': self.load_calendar()
-        }
\ No newline at end of file
+        }
@@ -7,13 +7,18 @@ from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
 from openpyxl.utils import get_column_letter
 from typing import List, Dict, Any
 from .model import ScheduleAssignment
+from .snapshot import SNAPSHOT_FILE, save_snapshot
+from .instrumentation import TRAJECTORY_FILE, write_trajectory
 
 class Exporter:
-    def __init__(self, assignments: List[ScheduleAssignment], data: Dict[str, Any], config: Dict[str, Any], output_path: str):
+    def __init__(self, assignments: List[ScheduleAssignment], data: Dict[str, Any], config: Dict[str, Any], output_path: str,
+                 suffix: str = ""):
         self.assignments = sorted(assignments, key=lambda x: (x.assignment_date, x.start_time, x.group_name))
         self.data = data
         self.config = config
         self.output_path = output_path
+        # Appended to warnings/snapshot file names when several solutions are exported
+        self.suffix = suffix
 
     def export(self):
         wb = Workbook()
@@ -36,6 +41,8 @@ class Exporter:
         
         wb.save(self.output_path)
         self._create_warnings_file()
+        self._create_snapshot()
+        self._create_trajectory_files()
 
     def _create_general_schedule(self, ws):
         headers = [
@@ -246,6 +253,9 @@ class Exporter:
         
         for k, v in metadata:
             ws.append([k, v])
+
+        if stats.get("model"):
+            self._append_model_stats(ws, stats["model"], stats.get("solver_response", {}))
             
         if stats.get("warnings"):
             ws.append([])
@@ -253,9 +263,38 @@ class Exporter:
             for w in stats["warnings"]:
                 ws.append([w])
 
+    def _append_model_stats(self, ws, model: Dict[str, Any], response: Dict[str, Any]):
+        ws.append([])
+        ws.append(["Размер модели и решатель"])
+        rows = [
+            ("Переменных в модели", model.get("variables")),
+            ("Ограничений в модели", model.get("constraints")),
+            ("Время построения модели (сек)", model.get("build_seconds")),
+            ("Пиковая память (МБ)", round(model["peak_rss_kb"] / 1024, 1) if model.get("peak_rss_kb") else "N/A"),
+            ("Конфликтов CP-SAT", response.get("conflicts", "N/A")),
+            ("Ветвлений CP-SAT", response.get("branches", "N/A")),
+            ("Presolve (сек)", response.get("presolve_seconds") if response.get("presolve_seconds") is not None else "N/A"),
+            ("Первое решение (сек)", response.get("first_solution_seconds") if response.get("first_solution_seconds") is not None else "N/A"),
+        ]
+        for k, v in rows:
+            ws.append([k, v])
+
+        ws.append([])
+        ws.append(["Этап построения", "Тип", "Время (сек)", "Переменные", "Ограничения", "Слагаемые цели", "Прирост памяти (КБ)"])
+        for p in model.get("passes", []):
+            ws.append([p["name"], p["kind"], p["seconds"], p["variables"], p["constraints"], p["objective_terms"],
+                       p["peak_rss_delta_kb"] if p["peak_rss_delta_kb"] is not None else "N/A"])
+
+    def _create_trajectory_files(self):
+        stats = self.config.get("stats", {})
+        if "search_trajectory" not in stats: return
+        name, ext = os.path.splitext(TRAJECTORY_FILE)
+        write_trajectory(os.path.join(self.config['output_directory'], f'{name}{self.suffix}{ext}'),
+                         stats["search_trajectory"], stats["search_summary"])
+
     def _create_warnings_file(self):
         stats = self.config.get("stats", {})
-        warnings_path = os.path.join(self.config['output_directory'], 'warnings.txt')
+        warnings_path = os.path.join(self.config['output_directory'], f'warnings{self.suffix}.txt')
         with open(warnings_path, "w", encoding="utf-8") as f:
             f.write("=== ОТЧЕТ О СОСТАВЛЕНИИ РАСПИСАНИЯ ===\n")
             f.write(f"Дата: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
@@ -268,4 +307,14 @@ class Exporter:
             if stats.get("warnings"):
                 f.write("\n[ПРЕДУПРЕЖДЕНИЯ]\n")
                 for w in stats["warnings"]:
-                    f.write(f"- {w}\n")
\ No newline at end of file
+                    f.write(f"- {w}\n")
+
+    def _create_snapshot(self):
+        # Machine-readable result for --warm-start of the next run
+        name, ext = os.path.splitext(SNAPSHOT_FILE)
+        snapshot_path = os.path.join(self.config['output_directory'], f'{name}{self.suffix}{ext}')
+        save_snapshot(snapshot_path, self.assignments, self.data, self.config)
+
+def write_solutions_summary(path: str, summaries: List[Dict[str, Any]]):
+    """CSV comparing solutions: status, objective, distances and objective components."""
+    pd.DataFrame(summaries).to_csv(path, index=False, encoding='utf-8')
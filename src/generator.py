@@ -0,0 +1,165 @@
+import argparse
+import math
+import os
+import random
+from dataclasses import dataclass, field, asdict
+from datetime import date, time, timedelta, datetime
+from typing import List, Dict, Optional
+import pandas as pd
+
+WEEKDAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+ROOM_TYPE_BY_LESSON = {'lecture': 'lecture_hall', 'practice': 'classroom', 'lab': 'computer_lab'}
+POSITIONS = ['Профессор', 'Доцент', 'Старший преподаватель', 'Ассистент']
+
+@dataclass
+class InstanceSpec:
+    """Size and shape of a synthetic instance.
+
+    Every discipline gets `lessons_per_week` lectures and practices a week
+    (and labs when computer labs are in the room mix), so the thematic plans
+    match the discipline hours. unavailability_density is the share of
+    teachers with an unavailability record.
+    """
+    groups: int = 10
+    teachers: int = 20
+    rooms: int = 10
+    disciplines_per_group: int = 4
+    weeks: int = 4
+    slots_per_day: int = 6
+    working_days_per_week: int = 5
+    lessons_per_week: int = 1
+    lab_share: float = 0.5
+    unavailability_density: float = 0.1
+    room_type_mix: Dict[str, float] = field(default_factory=lambda: {
+        'lecture_hall': 0.3, 'classroom': 0.5, 'computer_lab': 0.2})
+    buildings: int = 2
+    start_date: date = date(2026, 9, 7)
+    seed: int = 0
+
+def _room_types(spec: InstanceSpec) -> List[str]:
+    """Room type of every room, in proportion to room_type_mix (at least one of each type)."""
+    mix = {t: share for t, share in spec.room_type_mix.items() if share > 0}
+    total = sum(mix.values())
+    counts = {t: max(1, math.floor(spec.rooms * share / total)) for t, share in mix.items()}
+    # Hand out the rounding remainder to the largest shares
+    for t in sorted(mix, key=mix.get, reverse=True):
+        if sum(counts.values()) >= spec.rooms: break
+        counts[t] += 1
+    return [t for t, n in counts.items() for _ in range(n)]
+
+def generate_instance(spec: InstanceSpec) -> Dict[str, pd.DataFrame]:
+    """The seven input tables of DataLoader.load_all, keyed by file name."""
+    rng = random.Random(spec.seed)
+    tables: Dict[str, pd.DataFrame] = {}
+
+    tables['teachers.csv'] = pd.DataFrame([{
+        'teacher_id': t, 'last_name': f'Фамилия{t}', 'first_name': f'Имя{t}', 'middle_name': f'Отчество{t}',
+        'position': rng.choice(POSITIONS), 'max_hours_per_week': rng.choice([18, 20, 24, 30, 36]),
+        'seniority': rng.randint(1, 40),
+    } for t in range(1, spec.teachers + 1)])
+
+    room_types = _room_types(spec)
+    capacity_by_type = {'lecture_hall': (60, 150), 'classroom': (30, 40), 'computer_lab': (30, 35)}
+    tables['rooms.csv'] = pd.DataFrame([{
+        'room_id': r, 'room_name': f'Ауд. {r}', 'building': f'Корпус {rng.randint(1, max(1, spec.buildings))}',
+        'room_type': room_type, 'capacity': rng.randint(*capacity_by_type.get(room_type, (30, 60))),
+        'equipment': 'Компьютеры;Проектор' if room_type == 'computer_lab' else 'Доска',
+    } for r, room_type in enumerate(room_types, 1)])
+
+    has_labs = 'computer_lab' in room_types
+    hours = 2 * spec.lessons_per_week * spec.weeks  # academic hours: 2 per 90-minute lesson
+    teacher_ids = list(range(1, spec.teachers + 1))
+    disciplines, plans = [], []
+    discipline_id = 100
+    for g in range(1, spec.groups + 1):
+        group_name, group_size = f'ГР-{g:03d}', rng.randint(15, 30)
+        for _ in range(spec.disciplines_per_group):
+            discipline_id += 1
+            lab = has_labs and rng.random() < spec.lab_share
+            disciplines.append({
+                'discipline_id': discipline_id, 'discipline_name': f'Дисциплина {discipline_id}',
+                'group_name': group_name, 'group_size': group_size, 'semester': 1,
+                'lecture_hours': hours, 'practice_hours': hours, 'lab_hours': hours if lab else 0,
+                # Lecturers round-robin so the load is spread evenly
+                'lecturer_id': teacher_ids[discipline_id % len(teacher_ids)],
+                'practice_teacher_ids': ';'.join(map(str, sorted(rng.sample(teacher_ids, min(2, len(teacher_ids)))))),
+                'lab_teacher_ids': ';'.join(map(str, sorted(rng.sample(teacher_ids, min(2, len(teacher_ids)))))) if lab else '',
+            })
+            for lesson_type in ['lecture', 'practice'] + (['lab'] if lab else []):
+                for n in range(1, spec.lessons_per_week * spec.weeks + 1):
+                    plans.append({
+                        'discipline_id': discipline_id, 'lesson_type': lesson_type, 'lesson_number': n,
+                        'topic': f'Тема {n}', 'duration_minutes': 90,
+                        'required_room_type': ROOM_TYPE_BY_LESSON[lesson_type], 'min_capacity': group_size,
+                    })
+    tables['disciplines.csv'] = pd.DataFrame(disciplines)
+    tables['thematic_plans.csv'] = pd.DataFrame(plans)
+
+    days = WEEKDAYS[:spec.working_days_per_week]
+    slots = []
+    for day in days:
+        start = datetime.combine(date.min, time(8, 30))
+        for n in range(1, spec.slots_per_day + 1):
+            end = start + timedelta(minutes=90)
+            slots.append({'slot_id': len(slots) + 1, 'day_of_week': day, 'start_time': start.strftime('%H:%M'),
+                          'end_time': end.strftime('%H:%M'), 'duration_minutes': 90, 'slot_number': n})
+            start = end + timedelta(minutes=10)
+    tables['timeslots.csv'] = pd.DataFrame(slots)
+
+    first_day = spec.start_date - timedelta(days=spec.start_date.weekday())
+    calendar = []
+    for offset in range(7 * spec.weeks):
+        day = first_day + timedelta(days=offset)
+        weekday = WEEKDAYS[day.weekday()]
+        calendar.append({'date': day.isoformat(), 'is_holiday': 0,
+                         'is_working_day': int(weekday in days), 'description': weekday})
+    tables['calendar.csv'] = pd.DataFrame(calendar)
+
+    unavailability = []
+    # A date range spans at most half of the calendar, so on short horizons
+    # the teacher keeps free working days for their lessons
+    max_extra_days = min(7, 7 * spec.weeks // 2 - 1)
+    for t in rng.sample(teacher_ids, round(spec.teachers * spec.unavailability_density)):
+        if rng.random() < 0.5:
+            start = first_day + timedelta(days=rng.randrange(7 * spec.weeks))
+            extra_days = min(rng.randint(1, 7), max_extra_days)
+            unavailability.append({'teacher_id': t, 'start_date': start.isoformat(),
+                                   'end_date': (start + timedelta(days=extra_days)).isoformat(),
+                                   'reason': 'Командировка', 'unavailable_days': ''})
+        else:
+            unavailability.append({'teacher_id': t, 'start_date': '', 'end_date': '',
+                                   'reason': 'Методический день', 'unavailable_days': rng.choice(days)})
+    tables['teacher_unavailability.csv'] = pd.DataFrame(
+        unavailability, columns=['teacher_id', 'start_date', 'end_date', 'reason', 'unavailable_days'])
+    return tables
+
+def write_instance(spec: InstanceSpec, output_dir: str) -> List[str]:
+    """Generate an instance into `output_dir`; returns the written paths."""
+    os.makedirs(output_dir, exist_ok=True)
+    paths = []
+    for name, df in generate_instance(spec).items():
+        path = os.path.join(output_dir, name)
+        df.to_csv(path, index=False, encoding='utf-8')
+        paths.append(path)
+    return paths
+
+def main(argv: Optional[List[str]] = None):
+    defaults = InstanceSpec()
+    parser = argparse.ArgumentParser(description="Synthetic schedule instance generator")
+    parser.add_argument("output_dir", help="Directory for the seven input CSV files")
+    for name, value in asdict(defaults).items():
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            parser.add_argument(f"--{name.replace('_', '-')}", type=type(value), default=value)
+    parser.add_argument("--room-type-mix", default=None, metavar="TYPE=SHARE,...",
+                        help="Room type shares, e.g. lecture_hall=0.3,classroom=0.5,computer_lab=0.2")
+    parser.add_argument("--start-date", type=date.fromisoformat, default=defaults.start_date)
+    args = vars(parser.parse_args(argv))
+    output_dir = args.pop('output_dir')
+    mix = args.pop('room_type_mix')
+    if mix:
+        args['room_type_mix'] = {t: float(s) for t, s in (item.split('=') for item in mix.split(','))}
+    paths = write_instance(InstanceSpec(**args), output_dir)
+    print(f"Wrote {len(paths)} files to {output_dir}")
+
+if __name__ == "__main__":
+    main()
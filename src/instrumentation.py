@@ -0,0 +1,296 @@
+import contextlib
+import cProfile
+import csv
+import functools
+import json
+import math
+import os
+import re
+import sys
+import time
+import tracemalloc
+from typing import List, Dict, Any, Optional
+from ortools.sat.python import cp_model
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+MODEL_STATS_FILE = 'model_stats.json'
+TRAJECTORY_FILE = 'search_trajectory.csv'
+
+def peak_rss_kb() -> Optional[int]:
+    """Peak resident set size of this process in KiB, or None where unavailable."""
+    if resource is None: return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+class BuildRecorder:
+    """Wall time and model growth of each model-building pass."""
+
+    def __init__(self, model: cp_model.CpModel):
+        self.model = model
+        self.passes: List[Dict[str, Any]] = []
+
+    @contextlib.contextmanager
+    def measure(self, name: str, kind: str, objective_terms: Optional[list] = None):
+        proto = self.model.Proto()
+        variables, constraints = len(proto.variables), len(proto.constraints)
+        terms = len(objective_terms) if objective_terms is not None else 0
+        rss = peak_rss_kb()
+        started = time.perf_counter()
+        yield
+        proto = self.model.Proto()
+        self.passes.append({
+            'name': name, 'kind': kind,
+            'seconds': round(time.perf_counter() - started, 4),
+            'variables': len(proto.variables) - variables,
+            'constraints': len(proto.constraints) - constraints,
+            'objective_terms': (len(objective_terms) - terms) if objective_terms is not None else 0,
+            'peak_rss_delta_kb': (peak_rss_kb() - rss) if rss is not None else None,
+        })
+
+    def summary(self) -> Dict[str, Any]:
+        proto = self.model.Proto()
+        return {
+            'variables': len(proto.variables),
+            'constraints': len(proto.constraints),
+            'build_seconds': round(sum(p['seconds'] for p in self.passes), 4),
+            'peak_rss_kb': peak_rss_kb(),
+            'passes': self.passes,
+        }
+
+class SearchLog:
+    """Collects the CP-SAT search log through log_callback and reads timings from it."""
+
+    PRESOLVE_START = re.compile(r'^Starting presolve at ([\d.]+)s')
+    SEARCH_START = re.compile(r'^Starting search at ([\d.]+)s')
+    SOLUTION = re.compile(r'^#(\d+)\s+([\d.]+)s\s+best:(\S+)')
+    PROGRESS = re.compile(r'^#(\d+|Bound)\s+([\d.]+)s\s+best:(\S+)\s+next:\[(\S*?),(\S*?)\]')
+
+    def __init__(self):
+        self.lines: List[str] = []
+
+    def __call__(self, line: str):
+        self.lines.append(line)
+
+    def timings(self) -> Dict[str, Optional[float]]:
+        presolve_start = search_start = first_solution = None
+        for line in self.lines:
+            if presolve_start is None and (m := self.PRESOLVE_START.match(line)):
+                presolve_start = float(m.group(1))
+            elif search_start is None and (m := self.SEARCH_START.match(line)):
+                search_start = float(m.group(1))
+            elif first_solution is None and (m := self.SOLUTION.match(line)):
+                first_solution = float(m.group(2))
+        return {
+            'presolve_seconds': (search_start - presolve_start)
+            if presolve_start is not None and search_start is not None else None,
+            'first_solution_seconds': first_solution,
+        }
+
+    def progress(self, maximize: bool) -> List[Dict[str, Any]]:
+        """(time, objective, bound) of every solution and bound line of the log."""
+        points = []
+        for line in self.lines:
+            m = self.PROGRESS.match(line)
+            if not m: continue
+            best = float(m.group(3))
+            bound = (m.group(5) if maximize else m.group(4)) or None
+            points.append({
+                'time': float(m.group(2)),
+                'objective': best if math.isfinite(best) else None,
+                'bound': float(bound) if bound is not None else None,
+                'source': 'log_bound' if m.group(1) == 'Bound' else 'log_solution',
+            })
+        return points
+
+def attach_search_log(solver: cp_model.CpSolver) -> SearchLog:
+    """Route the search log of `solver` into a SearchLog (also kept on solver.search_log)."""
+    search_log = SearchLog()
+    if not solver.parameters.log_search_progress:
+        solver.parameters.log_search_progress = True
+        solver.parameters.log_to_stdout = False
+    solver.log_callback = search_log
+    solver.search_log = search_log
+    return search_log
+
+def response_stats(solver: Any) -> Dict[str, Any]:
+    """CP-SAT response counters of a finished solve, with log timings when available."""
+    response = solver.ResponseProto()
+    stats = {
+        'conflicts': response.num_conflicts, 'branches': response.num_branches,
+        'booleans': response.num_booleans, 'restarts': response.num_restarts,
+        'lp_iterations': response.num_lp_iterations,
+        'wall_time': response.wall_time, 'user_time': response.user_time,
+        'deterministic_time': response.deterministic_time,
+    }
+    search_log = getattr(solver, 'search_log', None)
+    if search_log is not None:
+        stats.update(search_log.timings())
+    return stats
+
+class SearchTrajectory(cp_model.CpSolverSolutionCallback):
+    """Objective and bound of every solution `solver` finds, forwarded to an optional SolutionCheckpointer."""
+
+    def __init__(self, solver: cp_model.CpSolver, checkpointer: Any = None):
+        super().__init__()
+        self.solver = solver
+        self.checkpointer = checkpointer
+        self.search_log: Optional[SearchLog] = getattr(solver, 'search_log', None)
+        self.solutions: List[Dict[str, Any]] = []
+
+    def on_solution_callback(self):
+        objective, bound = self.ObjectiveValue(), self.BestObjectiveBound()
+        self.solutions.append({'time': self.WallTime(), 'objective': objective, 'bound': bound, 'source': 'solution'})
+        if self.checkpointer:
+            self.checkpointer.record(self, objective, bound)
+
+    def points(self, maximize: bool) -> List[Dict[str, Any]]:
+        """Callback solutions merged with the log's bound updates and the final response, in time order.
+
+        Objective and bound are carried forward, so every point holds the best
+        solution and bound known at that time, with their relative gap.
+        """
+        points = list(self.solutions)
+        if self.search_log is not None:
+            points += [p for p in self.search_log.progress(maximize) if p['source'] == 'log_bound']
+        response = self.solver.ResponseProto()
+        if response.status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            points.append({'time': response.wall_time, 'objective': response.objective_value,
+                           'bound': response.best_objective_bound, 'source': 'final'})
+        points.sort(key=lambda p: (p['time'], p['source'] == 'final'))
+        better, tighter = (max, min) if maximize else (min, max)
+        objective = bound = None
+        trajectory = []
+        for p in points:
+            if p['objective'] is not None:
+                objective = p['objective'] if objective is None else better(objective, p['objective'])
+            if p['bound'] is not None:
+                bound = p['bound'] if bound is None else tighter(bound, p['bound'])
+            gap = abs(bound - objective) / max(1.0, abs(objective)) if objective is not None and bound is not None else None
+            trajectory.append({'time': round(p['time'], 3), 'source': p['source'], 'objective': objective,
+                               'bound': bound, 'gap': round(gap, 6) if gap is not None else None})
+        return trajectory
+
+def trajectory_summary(trajectory: List[Dict[str, Any]], within_percent: List[float]) -> Dict[str, Any]:
+    """Time to the first solution, and to within X% of the final objective and of the bound."""
+    solutions = [p for p in trajectory if p['objective'] is not None]
+    summary = {
+        'time_to_first_feasible': solutions[0]['time'] if solutions else None,
+        'time_to_best': None, 'final_objective': None, 'final_gap': None,
+        'time_to_within': {}, 'time_to_gap': {},
+    }
+    if not solutions:
+        return summary
+    final = solutions[-1]['objective']
+    summary.update(final_objective=final, final_gap=trajectory[-1]['gap'],
+                   time_to_best=next(p['time'] for p in solutions if p['objective'] == final))
+    for percent in within_percent:
+        key = f'{percent:g}%'
+        summary['time_to_within'][key] = next(
+            (p['time'] for p in solutions if abs(final - p['objective']) <= abs(final) * percent / 100), None)
+        summary['time_to_gap'][key] = next(
+            (p['time'] for p in solutions if p['gap'] is not None and p['gap'] <= percent / 100), None)
+    return summary
+
+def write_trajectory(path: str, trajectory: List[Dict[str, Any]], summary: Dict[str, Any]):
+    """Search trajectory as CSV at `path` and, with its summary, as JSON next to it."""
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=['time', 'source', 'objective', 'bound', 'gap'])
+        writer.writeheader()
+        writer.writerows(trajectory)
+    with open(os.path.splitext(path)[0] + '.json', 'w', encoding='utf-8') as f:
+        json.dump({'summary': summary, 'trajectory': trajectory}, f, ensure_ascii=False, indent=2)
+
+def write_model_stats(path: str, stats: Dict[str, Any]):
+    """Model build and solver statistics of a run as JSON."""
+    keys = ('status', 'objective_value', 'solve_time', 'model', 'solver_response', 'search_summary')
+    report = {key: stats[key] for key in keys if key in stats}
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2, default=str)
+
+class StageProfiler:
+    """Wall time of the pipeline stages, optionally with cProfile and tracemalloc.
+
+    Stages may nest (build_model runs inside solve); each stage's time and
+    .pstats profile exclude its nested stages, so the times add up to the run.
+    Top allocation sites are taken over the whole stage, nested ones included.
+    """
+
+    def __init__(self, output_dir: str, cprofile: bool = False, tracemalloc_top: int = 0):
+        self.output_dir = output_dir
+        self.cprofile = cprofile
+        self.tracemalloc_top = tracemalloc_top
+        self.stages: List[Dict[str, Any]] = []
+        self._stack: List[Dict[str, Any]] = []
+        if tracemalloc_top and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def _pause(self, frame: Dict[str, Any]):
+        frame['record']['seconds'] += time.perf_counter() - frame['resumed']
+        if frame['profile']: frame['profile'].disable()
+        if self.tracemalloc_top:
+            frame['record']['peak_traced_kb'] = max(frame['record']['peak_traced_kb'],
+                                                    tracemalloc.get_traced_memory()[1] // 1024)
+
+    def _resume(self, frame: Dict[str, Any]):
+        if self.tracemalloc_top: tracemalloc.reset_peak()
+        if frame['profile']: frame['profile'].enable()
+        frame['resumed'] = time.perf_counter()
+
+    @staticmethod
+    def _snapshot() -> tracemalloc.Snapshot:
+        # Leave out the profiler's own allocations
+        return tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, cProfile.__file__),
+            tracemalloc.Filter(False, __file__),
+        ])
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        record = {'stage': name, 'depth': len(self._stack), 'seconds': 0.0, 'peak_traced_kb': 0, 'top_allocations': []}
+        frame = {'record': record, 'profile': cProfile.Profile() if self.cprofile else None,
+                 'snapshot': self._snapshot() if self.tracemalloc_top else None}
+        self.stages.append(record)
+        if self._stack: self._pause(self._stack[-1])
+        self._stack.append(frame)
+        self._resume(frame)
+        try:
+            yield record
+        finally:
+            self._pause(frame)
+            self._stack.pop()
+            if frame['profile']:
+                os.makedirs(self.output_dir, exist_ok=True)
+                frame['profile'].dump_stats(os.path.join(self.output_dir, f'{name}.pstats'))
+            if frame['snapshot'] is not None:
+                diff = self._snapshot().compare_to(frame['snapshot'], 'lineno')
+                record['top_allocations'] = [
+                    f"{stat.traceback[0].filename}:{stat.traceback[0].lineno} {stat.size_diff / 1024:+.1f} KiB"
+                    for stat in diff[:self.tracemalloc_top]
+                ]
+            if self._stack: self._resume(self._stack[-1])
+
+    def wrap(self, obj: Any, method: str, name: Optional[str] = None):
+        """Run obj.method under stage `name` (default: the method name) from now on."""
+        original = getattr(obj, method)
+
+        @functools.wraps(original)
+        def wrapper(*args, **kwargs):
+            with self.stage(name or method):
+                return original(*args, **kwargs)
+        setattr(obj, method, wrapper)
+
+    def table(self) -> List[str]:
+        """Stage timing table, one line per stage in the order they were started."""
+        total = sum(r['seconds'] for r in self.stages) or 1.0
+        lines = [f"{'Stage':<16}{'Seconds':>10}{'Share':>8}" + (f"{'Peak KiB':>12}" if self.tracemalloc_top else "")]
+        for r in self.stages:
+            line = f"{'  ' * r['depth'] + r['stage']:<16}{r['seconds']:>10.3f}{r['seconds'] / total:>8.1%}"
+            if self.tracemalloc_top: line += f"{r['peak_traced_kb']:>12}"
+            lines.append(line)
+        lines.append(f"{'total':<16}{sum(r['seconds'] for r in self.stages):>10.3f}")
+        return lines
@@ -0,0 +1,44 @@
+from typing import Any, Dict, Tuple
+from ortools.sat.python import cp_model
+
+class LiteralAlgebra:
+    """AND/OR over CP-SAT literals encoded as clauses.
+
+    Derived literals are cached by their operands, so the same conjunction
+    (e.g. lesson x teacher x day) requested by several constraint families is
+    created only once.
+    """
+
+    def __init__(self, model: cp_model.CpModel):
+        self.model = model
+        self._cache: Dict[Tuple[str, Tuple[int, ...]], Any] = {}
+
+    @staticmethod
+    def _key(op: str, literals) -> Tuple[str, Tuple[int, ...]]:
+        return op, tuple(sorted(set(lit.Index() for lit in literals)))
+
+    def conjunction(self, *literals) -> Any:
+        """Literal equivalent to the AND of `literals`."""
+        if len(literals) == 1:
+            return literals[0]
+        key = self._key('and', literals)
+        if key not in self._cache:
+            result = self.model.NewBoolVar('and_' + '_'.join(map(str, key[1])))
+            for lit in literals:
+                self.model.AddImplication(result, lit)
+            self.model.AddBoolOr([lit.Not() for lit in literals] + [result])
+            self._cache[key] = result
+        return self._cache[key]
+
+    def disjunction(self, *literals) -> Any:
+        """Literal equivalent to the OR of `literals`."""
+        if len(literals) == 1:
+            return literals[0]
+        key = self._key('or', literals)
+        if key not in self._cache:
+            result = self.model.NewBoolVar('or_' + '_'.join(map(str, key[1])))
+            for lit in literals:
+                self.model.AddImplication(lit, result)
+            self.model.AddBoolOr(list(literals) + [result.Not()])
+            self._cache[key] = result
+        return self._cache[key]
@@ -0,0 +1,165 @@
+import logging
+import random
+import time
+from typing import List, Dict, Any, Set, Tuple
+from ortools.sat.python import cp_model
+from .model import ScheduleAssignment
+from .checkpoint import SolutionCheckpointer
+from .solver import ScheduleSolver
+
+logger = logging.getLogger(__name__)
+
+NEIGHBORHOODS = ('teacher_week', 'group_days', 'building_week')
+
+class LNSSolver:
+    """Large Neighborhood Search on top of ScheduleSolver.
+
+    The model is built once. The first solve gets initial_time_limit_seconds
+    and, if it finds nothing, the rest of the budget up to a first solution.
+    Each iteration then frees one neighborhood (a teacher's week, a few days
+    of a group, or one building's rooms for a week), fixes every other lesson
+    on a clone of the model, hints the current solution and re-solves for a
+    short budget.
+    Neighborhood kinds are drawn with adaptive weights that grow with recent
+    improvements.
+    """
+
+    def __init__(self, data: Dict[str, Any], config: Dict[str, Any]):
+        self.data = data
+        self.config = config
+        lns_cfg = config.get('lns', {})
+        self.time_limit = config.get('solver_time_limit_seconds', 60)
+        self.initial_time_limit = lns_cfg.get('initial_time_limit_seconds', self.time_limit / 4)
+        self.neighborhood_time_limit = lns_cfg.get('neighborhood_time_limit_seconds', 2)
+        self.group_days = lns_cfg.get('group_days', 3)
+        self.max_iterations = lns_cfg.get('max_iterations', 0)
+        self.decay = lns_cfg.get('weight_decay', 0.8)
+        self.rng = random.Random(lns_cfg.get('seed', 0))
+
+        self.base = ScheduleSolver(data, config)
+        self.valid_global_slots: List = []
+        # Without room variables there are no buildings to free
+        aggregate_rooms = config.get('model', {}).get('room_capacity') == 'aggregate'
+        self.weights = {name: 1.0 for name in NEIGHBORHOODS if not (aggregate_rooms and name == 'building_week')}
+        self.log: List[Dict[str, Any]] = []
+
+    def solve(self) -> List[ScheduleAssignment]:
+        started = time.time()
+        self.base.build_model()
+        self.valid_global_slots = self.base.valid_global_slots
+        maximize = self.base.model.Proto().objective.scaling_factor < 0
+
+        checkpointer = SolutionCheckpointer.from_config(self.base, self.config)
+        self.base.solver.parameters.max_time_in_seconds = min(self.initial_time_limit, self.time_limit)
+        status = self.base.solver.Solve(self.base.model, checkpointer)
+        remaining = self.time_limit - (time.time() - started)
+        if status == cp_model.UNKNOWN and remaining > 0:
+            # No incumbent yet: search for one with the rest of the budget,
+            # the iterations start once it exists
+            self.base.solver.parameters.max_time_in_seconds = remaining
+            self.base.solver.parameters.stop_after_first_solution = True
+            status = self.base.solver.Solve(self.base.model, checkpointer)
+            self.base.solver.parameters.stop_after_first_solution = False
+        stats = {
+            'status': self.base.solver.StatusName(status),
+            'objective_value': 0, 'solve_time': 0.0, 'warnings': self.base.hint_only_warnings('LNS'),
+            'lns_log': self.log
+        }
+        stats.update(self.base.instrumentation_stats(self.base.solver))
+        if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            stats['solve_time'] = time.time() - started
+            self.config['stats'] = stats
+            return []
+
+        best_solver = self.base.solver
+        best_values = self.base.lesson_values()
+        best_objective = self.base.solver.ObjectiveValue()
+        self._record(0, 'initial', len(best_values), stats['status'], best_objective, True, started)
+
+        iteration = 0
+        # Nothing to improve on a proven optimum or a pure feasibility model
+        searching = status == cp_model.FEASIBLE and self.base.model.HasObjective()
+        while searching and time.time() - started < self.time_limit:
+            if self.max_iterations and iteration >= self.max_iterations: break
+            iteration += 1
+            name = self._pick_neighborhood()
+            free = self._neighborhood(name, best_values)
+            if not free:
+                self._reward(name, False)
+                continue
+
+            sub_model = self.base.model.Clone()
+            self.base.fix_lessons({l: v for l, v in best_values.items() if l not in free}, sub_model)
+            # The clone carries the base model's (warm start) hints
+            sub_model.ClearHints()
+            self.base.add_hints(best_values, sub_model)
+            sub_solver = self.base.new_cp_solver(min(
+                self.neighborhood_time_limit, max(0.0, self.time_limit - (time.time() - started))))
+            sub_status = sub_solver.Solve(sub_model)
+
+            improved = False
+            objective = None
+            if sub_status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+                objective = sub_solver.ObjectiveValue()
+                improved = objective > best_objective if maximize else objective < best_objective
+                if improved:
+                    best_solver, best_objective = sub_solver, objective
+                    best_values = self.base.lesson_values(sub_solver)
+                    if checkpointer:
+                        # Neighborhood bounds are not global bounds
+                        checkpointer.record(sub_solver, objective, None)
+            self._reward(name, improved)
+            self._record(iteration, name, len(free), sub_solver.StatusName(sub_status), objective, improved, started)
+
+        stats['objective_value'] = best_objective
+        stats['solve_time'] = time.time() - started
+        stats['status'] = 'OPTIMAL' if status == cp_model.OPTIMAL else 'FEASIBLE'
+        stats['lns_iterations'] = iteration
+        stats['lns_weights'] = dict(self.weights)
+        if checkpointer:
+            checkpointer.flush()
+            stats['improvements'] = checkpointer.improvements
+        self.config['stats'] = stats
+        return self.base._extract_solution(best_solver)
+
+    def _record(self, iteration, name, size, status, objective, improved, started):
+        entry = {
+            'iteration': iteration, 'neighborhood': name, 'size': size, 'status': status,
+            'objective': objective, 'improved': improved, 'elapsed': round(time.time() - started, 3)
+        }
+        self.log.append(entry)
+        if improved:
+            logger.info(f"LNS iteration {iteration} ({name}, {size} lessons): objective {objective}")
+
+    def _pick_neighborhood(self) -> str:
+        names = list(self.weights)
+        return self.rng.choices(names, weights=[self.weights[n] for n in names])[0]
+
+    def _reward(self, name: str, improved: bool):
+        score = 1.0 if improved else 0.1
+        self.weights[name] = max(0.05, self.decay * self.weights[name] + (1 - self.decay) * score)
+
+    def _neighborhood(self, name: str, values: Dict[int, Tuple[int, int, int]]) -> Set[int]:
+        """Lesson indices freed by a random instance of neighborhood `name`."""
+        constraints = self.base.constraints
+        lessons = self.base.variables['lessons']
+        if name == 'teacher_week':
+            l_idx = self.rng.choice(list(values))
+            _, _, teacher = values[l_idx]
+            week = constraints.slot_to_week[values[l_idx][0]]
+            return {l for l, (start, _, t) in values.items()
+                    if t == teacher and constraints.slot_to_week[start] == week}
+        if name == 'group_days':
+            l_idx = self.rng.choice(list(values))
+            group = lessons[l_idx]['discipline'].group_name
+            first_day = constraints.slot_to_day[values[l_idx][0]]
+            days = range(first_day, first_day + self.group_days)
+            return {l for l, (start, _, _) in values.items()
+                    if lessons[l]['discipline'].group_name == group and constraints.slot_to_day[start] in days}
+        if name == 'building_week':
+            l_idx = self.rng.choice(list(values))
+            building = self.base.rooms[values[l_idx][1]].building
+            week = constraints.slot_to_week[values[l_idx][0]]
+            return {l for l, (start, room, _) in values.items()
+                    if self.base.rooms[room].building == building and constraints.slot_to_week[start] == week}
+        return set()
@@ -0,0 +1,155 @@
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import List, Dict, Any, Optional
+from ortools.sat.python import cp_model, cp_model_helper
+from .model import ScheduleAssignment
+from .checkpoint import SolutionCheckpointer
+from .solver import ScheduleSolver, apply_solver_parameters
+from .utils import sub_config
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MEMBERS = [
+    {'random_seed': 1},
+    {'random_seed': 2, 'search_branching': 'PORTFOLIO_WITH_QUICK_RESTART_SEARCH'},
+    {'random_seed': 3, 'search_branching': 'FIXED_SEARCH'},
+    {'random_seed': 4, 'cp_model_probing_level': 0},
+]
+
+# CpSolverResponse fields carried back from a member process
+RESPONSE_FIELDS = (
+    'objective_value', 'best_objective_bound', 'wall_time', 'user_time', 'deterministic_time',
+    'num_conflicts', 'num_branches', 'num_booleans', 'num_restarts', 'num_lp_iterations',
+)
+
+def _solve_member(data: Dict[str, Any], config: Dict[str, Any], settings: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the model in a worker process and solve it; returns the response as plain fields.
+
+    The model is rebuilt from the (pickled) input rather than shipped as a
+    proto: the ortools protos have no binary serialization in Python, and
+    text format is slow and large for full-size models.
+    """
+    schedule_solver = ScheduleSolver(data, config)
+    schedule_solver.build_model()
+    solver = cp_model.CpSolver()
+    apply_solver_parameters(solver.parameters, settings)
+    solver.Solve(schedule_solver.model)
+    response = solver.ResponseProto()
+    fields = {name: getattr(response, name) for name in RESPONSE_FIELDS}
+    fields.update(status=int(response.status), solution=list(response.solution),
+                  num_variables=len(schedule_solver.model.Proto().variables))
+    return fields
+
+def _response_from_fields(fields: Dict[str, Any]) -> Any:
+    response = cp_model_helper.CpSolverResponse()
+    response.status = cp_model_helper.CpSolverStatus(fields['status'])
+    for name in RESPONSE_FIELDS:
+        setattr(response, name, fields[name])
+    response.solution.extend(fields['solution'])
+    return response
+
+class ResponseValues:
+    """Value/BooleanValue over a CpSolverResponse, like a CpSolver after Solve()."""
+
+    def __init__(self, response: Any):
+        self.response = response
+
+    def Value(self, expression: Any) -> int:
+        return cp_model_helper.ResponseHelper.value(self.response, expression)
+
+    def BooleanValue(self, literal: Any) -> bool:
+        return cp_model_helper.ResponseHelper.boolean_value(self.response, literal)
+
+    def ObjectiveValue(self) -> float:
+        return self.response.objective_value
+
+    def BestObjectiveBound(self) -> float:
+        return self.response.best_objective_bound
+
+    def ResponseProto(self) -> Any:
+        return self.response
+
+class PortfolioSolver(ScheduleSolver):
+    """Solves one model with several differently-parameterized CP-SAT runs in parallel processes.
+
+    Each member of portfolio.members is merged over the `solver` block and
+    solves the same model, rebuilt in a ProcessPoolExecutor of
+    portfolio.processes workers. Unless solver.num_workers is set, the CPU cores
+    are split evenly between the processes. The best solution is kept.
+    """
+
+    def __init__(self, data: Dict[str, Any], config: Dict[str, Any]):
+        super().__init__(data, config)
+        portfolio_cfg = config.get('portfolio', {})
+        self.members: List[Dict[str, Any]] = portfolio_cfg.get('members') or DEFAULT_MEMBERS
+        self.processes = portfolio_cfg.get('processes') or len(self.members)
+
+    def member_settings(self) -> List[Dict[str, Any]]:
+        base = dict(self.config.get('solver', {}))
+        if not base.get('num_workers'):
+            base['num_workers'] = max(1, (os.cpu_count() or 1) // min(self.processes, len(self.members)))
+        if 'solver_time_limit_seconds' in self.config:
+            base['max_time_in_seconds'] = self.config['solver_time_limit_seconds']
+        return [dict(base, **member) for member in self.members]
+
+    def solve(self) -> List[ScheduleAssignment]:
+        started = time.time()
+        self.build_model()
+        # Reject bad parameters here rather than in a worker process
+        settings = self.member_settings()
+        for member in settings:
+            apply_solver_parameters(cp_model.CpSolver().parameters, member)
+        member_config = sub_config(self.config)
+        num_variables = len(self.model.Proto().variables)
+
+        results = []
+        with ProcessPoolExecutor(max_workers=self.processes) as pool:
+            futures = {pool.submit(_solve_member, self.data, member_config, member): k
+                       for k, member in enumerate(settings)}
+            for future in as_completed(futures):
+                fields = future.result()
+                if fields['num_variables'] != num_variables:
+                    raise RuntimeError(f"Portfolio member {futures[future] + 1} built a different model "
+                                       f"({fields['num_variables']} variables instead of {num_variables})")
+                results.append((futures[future], _response_from_fields(fields)))
+        results.sort(key=lambda result: result[0])
+
+        member_stats = [{
+            'member': k + 1,
+            'parameters': {n: v for n, v in settings[k].items() if n != 'max_time_in_seconds'},
+            'status': response.status.name,
+            'objective_value': response.objective_value,
+            'best_bound': response.best_objective_bound,
+            'wall_time': response.wall_time,
+        } for k, response in results]
+        best: Optional[ResponseValues] = None
+        best_status = results[0][1].status if results else cp_model.UNKNOWN
+        maximize = self.model.Proto().objective.scaling_factor < 0
+        solved = [(k, r) for k, r in results if r.status in (cp_model.OPTIMAL, cp_model.FEASIBLE)]
+        if solved:
+            sign = 1 if maximize else -1
+            k, response = max(solved, key=lambda result: (sign * result[1].objective_value,
+                                                          result[1].status == cp_model.OPTIMAL))
+            best, best_status = ResponseValues(response), response.status
+            logger.info(f"Portfolio: member {k + 1} of {len(results)} gave the best objective {response.objective_value}")
+
+        self.config['stats'] = {
+            'status': best_status.name,
+            'objective_value': best.ObjectiveValue() if best else 0,
+            'solve_time': time.time() - started,
+            'warnings': self.hint_only_warnings('portfolio'),
+            'portfolio': member_stats,
+        }
+        self.config['stats'].update(self.instrumentation_stats(best))
+        self.last_solver = best
+        if best is None:
+            return []
+        self.checkpointer = SolutionCheckpointer.from_config(self, self.config)
+        if self.checkpointer:
+            self.checkpointer.record(best, best.ObjectiveValue(), best.BestObjectiveBound())
+            self.checkpointer.flush()
+            self.config['stats']['improvements'] = self.checkpointer.improvements
+        self.config['stats']['objective_components'] = self.objective_breakdown(best)
+        return self._extract_solution(best)
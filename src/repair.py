@@ -0,0 +1,174 @@
+import dataclasses
+import logging
+import time
+from datetime import date, timedelta
+from typing import List, Dict, Any, Optional, Tuple
+from ortools.sat.python import cp_model
+from .model import Lesson, ScheduleAssignment, TeacherUnavailability
+from .solver import ScheduleSolver, lesson_key
+from .utils import sub_config, week_start
+
+logger = logging.getLogger(__name__)
+
+@dataclasses.dataclass(frozen=True)
+class DisruptionEvent:
+    kind: str  # teacher_unavailable, room_closed
+    teacher_id: Optional[int] = None
+    room_id: Optional[int] = None
+    start_date: Optional[date] = None  # None: open-ended
+    end_date: Optional[date] = None
+    reason: str = ""
+
+    def covers(self, day: date) -> bool:
+        return (not self.start_date or day >= self.start_date) and (not self.end_date or day <= self.end_date)
+
+class ScheduleRepairer:
+    """Re-places only the lessons of an existing schedule hit by a disruption.
+
+    Every other assignment stays as it is and enters the repair model as a
+    fixed booking, restricted to those sharing a group, candidate teacher or
+    candidate room with the affected lessons. Moved lessons are penalised by
+    their distance (in global slots) from the original start. The model first
+    covers only the affected weeks +- repair.window_weeks, then the whole
+    calendar if that is infeasible.
+    """
+
+    def __init__(self, data: Dict[str, Any], config: Dict[str, Any], assignments: List[ScheduleAssignment]):
+        self.data = data
+        self.config = config
+        self.assignments = assignments
+        repair_cfg = config.get('repair', {})
+        self.time_limit = repair_cfg.get('time_limit_seconds', 5)
+        self.displacement_weight = repair_cfg.get('displacement_weight', 10)
+        self.keep_soft_constraints = repair_cfg.get('soft_constraints', False)
+        self.window_weeks = repair_cfg.get('window_weeks', 1)
+        self.valid_global_slots = ScheduleSolver(data, config).build_global_slots()
+
+    def affected(self, event: DisruptionEvent) -> List[ScheduleAssignment]:
+        if event.kind == 'teacher_unavailable':
+            names = {t.full_name for t in self.data['teachers'] if t.teacher_id == event.teacher_id}
+            return [a for a in self.assignments if a.teacher_name in names and event.covers(a.assignment_date)]
+        if event.kind == 'room_closed':
+            names = {r.room_name for r in self.data['rooms'] if r.room_id == event.room_id}
+            return [a for a in self.assignments if a.room_name in names and event.covers(a.assignment_date)]
+        raise ValueError(f"Unknown disruption event: {event.kind}")
+
+    def _event_data(self, event: DisruptionEvent) -> Dict[str, Any]:
+        data = dict(self.data)
+        if event.kind == 'teacher_unavailable':
+            data['teacher_unavailability'] = list(self.data['teacher_unavailability']) + [
+                TeacherUnavailability(teacher_id=event.teacher_id, start_date=event.start_date or self.valid_global_slots[0][0],
+                                      end_date=event.end_date or self.valid_global_slots[-1][0], reason=event.reason)
+            ]
+        elif event.kind == 'room_closed':
+            data['room_closures'] = list(self.data.get('room_closures', [])) + [event]
+        return data
+
+    def repair(self, event: DisruptionEvent) -> List[ScheduleAssignment]:
+        started = time.time()
+        stats = {'status': 'UNKNOWN', 'objective_value': 0, 'solve_time': 0.0, 'warnings': []}
+        hit = self.affected(event)
+        stats['repair'] = {'event': event.kind, 'affected': len(hit), 'moved': 0, 'displacement': 0}
+        if not hit:
+            stats['status'] = 'OPTIMAL'
+            self.config['stats'] = stats
+            return list(self.assignments)
+
+        hit_ids = {a.lesson_id for a in hit}
+        kept = [a for a in self.assignments if a.lesson_id not in hit_ids]
+        data = self._event_data(event)
+        data.update({
+            'lessons': [l for l in self.data['lessons'] if lesson_key(l) in hit_ids],
+            'warm_start': None,
+        })
+
+        hit_weeks = {week_start(a.assignment_date) for a in hit}
+        window = {w + timedelta(weeks=k) for w in hit_weeks for k in range(-self.window_weeks, self.window_weeks + 1)}
+        calendars = [[e for e in data['calendar'] if week_start(e.date) in window], data['calendar']]
+        ordered = bool(self.config.get('model', {}).get('order_lessons_by_number'))
+        attempts = [(c, keep_order) for c in calendars for keep_order in ((True, False) if ordered else (True,))]
+        for calendar, keep_order in attempts:
+            solver, status = self._solve(dict(data, calendar=calendar), hit, kept, keep_order)
+            if status in (cp_model.OPTIMAL, cp_model.FEASIBLE): break
+
+        stats['status'] = solver.solver.StatusName(status)
+        stats['solve_time'] = time.time() - started
+        if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            stats['warnings'].append(f"Repair could not place {len(hit)} affected lessons.")
+            logger.warning(f"Repair ({event.kind}): no placement found for {len(hit)} affected lessons")
+            self.config['stats'] = stats
+            return []
+
+        if ordered and not keep_order:
+            stats['warnings'].append("Repair: lesson order could not be kept around the disruption.")
+        stats['objective_value'] = solver.solver.ObjectiveValue()
+        repaired = solver._extract_solution()
+        original = {a.lesson_id: a for a in hit}
+        stats['repair']['moved'] = sum(
+            (a.assignment_date, a.slot_number) != (original[a.lesson_id].assignment_date, original[a.lesson_id].slot_number)
+            for a in repaired
+        )
+        stats['repair']['displacement'] = int(sum(solver.solver.Value(d) for d in self._displacements))
+        self.config['stats'] = stats
+        logger.info(f"Repair ({event.kind}): {len(hit)} lessons affected, {stats['repair']['moved']} moved "
+                    f"in {stats['solve_time']:.2f}s")
+        return kept + repaired
+
+    def _solve(self, data: Dict[str, Any], hit: List[ScheduleAssignment], kept: List[ScheduleAssignment],
+               ordered: bool) -> Tuple[ScheduleSolver, Any]:
+        repair_config = sub_config(self.config, self.time_limit)
+        if not self.keep_soft_constraints:
+            repair_config['soft_constraints'] = {}
+        solver = ScheduleSolver(data, repair_config)
+        data['fixed_assignments'] = self._context(solver, kept)
+        solver.build_model()
+
+        self._displacements = []
+        original = {a.lesson_id: a for a in hit}
+        for l_idx, vars in solver.variables['lessons'].items():
+            resolved = solver._resolve_assignment(original[lesson_key(vars['lesson'])])
+            if resolved is None: continue
+            distance = solver.model.NewIntVar(0, solver.num_global_slots, f'displacement_{l_idx}')
+            solver.model.AddAbsEquality(distance, vars['start'] - resolved[0])
+            self._displacements.append(distance)
+        if ordered:
+            self._add_order_bounds(solver, kept)
+
+        terms = solver.constraints.objective_terms
+        solver.model.Maximize(sum(terms) - self.displacement_weight * sum(self._displacements))
+        return solver, solver.solver.Solve(solver.model)
+
+    def _context(self, solver: ScheduleSolver, kept: List[ScheduleAssignment]) -> List[ScheduleAssignment]:
+        """Kept assignments that can interact with the lessons being repaired."""
+        groups, teachers, rooms = set(), set(), set()
+        for lesson in solver.lessons:
+            discipline = solver.disciplines.get(lesson.discipline_id)
+            if not discipline: continue
+            groups.add(discipline.group_name)
+            teachers.update(solver.teachers[t].full_name for t in solver.compatible_teachers(lesson, discipline))
+            rooms.update(solver.rooms[r].room_name for r in solver.compatible_rooms(lesson, discipline))
+        return [a for a in kept if a.group_name in groups or a.teacher_name in teachers or a.room_name in rooms]
+
+    def _add_order_bounds(self, solver: ScheduleSolver, kept: List[ScheduleAssignment]):
+        """Keep repaired lessons between their kept neighbours in the thematic plan."""
+        if not solver.config.get('model', {}).get('order_lessons_by_number'): return
+        kept_by_id = {a.lesson_id: a for a in kept}
+        numbers = {}
+        for lesson in self.data['lessons']:
+            numbers.setdefault((lesson.discipline_id, lesson.lesson_type), []).append(lesson.lesson_number)
+
+        for vars in solver.variables['lessons'].values():
+            lesson: Lesson = vars['lesson']
+            plan = sorted(numbers[(lesson.discipline_id, lesson.lesson_type)])
+            earlier = [n for n in plan if n < lesson.lesson_number]
+            later = [n for n in plan if n > lesson.lesson_number]
+            for number, is_before in ((earlier[-1] if earlier else None, True), (later[0] if later else None, False)):
+                if number is None: continue
+                neighbour = kept_by_id.get(lesson_key(dataclasses.replace(lesson, lesson_number=number)))
+                resolved = solver._resolve_assignment(neighbour) if neighbour else None
+                if resolved is None: continue
+                start, duration, _, _ = resolved
+                if is_before:
+                    solver.model.Add(vars['start'] >= start + duration)
+                else:
+                    solver.model.Add(vars['end'] <= start)
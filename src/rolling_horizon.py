@@ -0,0 +1,123 @@
+import collections
+import logging
+import math
+import time
+from typing import List, Dict, Any, Optional, Tuple
+from .model import Lesson, ScheduleAssignment
+from .solver import ScheduleSolver, lesson_key
+from .utils import calendar_week_starts, sub_config, week_start
+
+logger = logging.getLogger(__name__)
+
+class RollingHorizonSolver:
+    """Solves the calendar in overlapping windows of N weeks.
+
+    Each window receives a share of the remaining demand of every
+    (discipline, lesson_type), proportional to the weeks it covers, with the
+    lowest lesson numbers first. Decisions in the window's leading weeks are
+    committed and become fixed assignments for later windows; lessons placed in
+    the overlap are returned to the remaining demand and re-planned.
+    """
+
+    def __init__(self, data: Dict[str, Any], config: Dict[str, Any]):
+        self.data = data
+        self.config = config
+        rh_cfg = config.get('rolling_horizon', {})
+        self.window_weeks = max(1, int(rh_cfg.get('window_weeks', 4)))
+        self.overlap_weeks = min(max(0, int(rh_cfg.get('overlap_weeks', 1))), self.window_weeks - 1)
+        self.time_limit = rh_cfg.get('time_limit_seconds', config.get('solver_time_limit_seconds'))
+        self.valid_global_slots = ScheduleSolver(data, config).build_global_slots()
+        self.week_starts = calendar_week_starts(data['calendar'])
+
+    def solve(self) -> List[ScheduleAssignment]:
+        # No objective_value: window objectives also count the overlap lessons
+        # that are re-planned, so their sum matches no returned schedule
+        stats = {'status': 'UNKNOWN', 'solve_time': 0.0, 'warnings': [], 'windows': []}
+        remaining = self._remaining_by_type(self.data['lessons'])
+        committed: List[ScheduleAssignment] = []
+        step = self.window_weeks - self.overlap_weeks
+        num_weeks = len(self.week_starts)
+
+        w0 = 0
+        while w0 < num_weeks and any(remaining.values()):
+            window = self.week_starts[w0:w0 + self.window_weeks]
+            is_last = w0 + self.window_weeks >= num_weeks
+            commit_weeks = set(window if is_last else window[:step])
+
+            quota = self._quota(remaining, len(window), num_weeks - w0, is_last)
+            deadline = None if self.time_limit is None else time.time() + self.time_limit
+            assignments, window_stats = self._solve_window(window, quota, committed, self.time_limit)
+            while (not assignments and not is_last and window_stats.get('status') == 'INFEASIBLE'
+                   and any(quota.values()) and (deadline is None or time.time() < deadline)):
+                # Proven too much demand for this window: halve it and carry the rest
+                # within the window's remaining time
+                quota = {key: lessons[:len(lessons) // 2] for key, lessons in quota.items()}
+                assignments, window_stats = self._solve_window(
+                    window, quota, committed, None if deadline is None else deadline - time.time())
+
+            kept = [a for a in assignments if week_start(a.assignment_date) in commit_weeks]
+            kept_ids = {a.lesson_id for a in kept}
+            for key in remaining:
+                remaining[key] = [l for l in remaining[key] if lesson_key(l) not in kept_ids]
+            committed.extend(kept)
+
+            stats['solve_time'] += window_stats.get('solve_time', 0)
+            stats['windows'].append({
+                'first_week': window[0].isoformat(), 'weeks': len(window),
+                'status': window_stats.get('status', 'UNKNOWN'),
+                'requested': sum(len(v) for v in quota.values()), 'committed': len(kept),
+                'objective_value': window_stats.get('objective_value'),
+                'solve_time': window_stats.get('solve_time', 0)
+            })
+            logger.info(f"Window {window[0]} (+{len(window)} weeks): committed {len(kept)} lessons, "
+                        f"status {window_stats.get('status')}")
+            w0 += step
+
+        unplaced = sum(len(v) for v in remaining.values())
+        if unplaced:
+            failed = [w['status'] for w in stats['windows'] if w['status'] not in ('OPTIMAL', 'FEASIBLE', 'EMPTY')]
+            stats['status'] = 'FEASIBLE' if committed else (failed[0] if failed else 'UNKNOWN')
+            stats['warnings'].append(f"Rolling horizon left {unplaced} lessons unscheduled"
+                                     + (f" (window statuses: {', '.join(failed)})." if failed else "."))
+        else:
+            statuses = {w['status'] for w in stats['windows']}
+            stats['status'] = 'OPTIMAL' if statuses == {'OPTIMAL'} else 'FEASIBLE'
+        self.config['stats'] = stats
+        return committed
+
+    @staticmethod
+    def _remaining_by_type(lessons: List[Lesson]) -> Dict[Tuple[int, str], List[Lesson]]:
+        remaining = collections.defaultdict(list)
+        for lesson in lessons:
+            remaining[(lesson.discipline_id, lesson.lesson_type)].append(lesson)
+        for key in remaining:
+            remaining[key].sort(key=lambda l: l.lesson_number)
+        return remaining
+
+    @staticmethod
+    def _quota(remaining, window_len: int, weeks_left: int, is_last: bool):
+        if is_last:
+            return {key: list(lessons) for key, lessons in remaining.items()}
+        return {
+            key: lessons[:math.ceil(len(lessons) * window_len / max(1, weeks_left))]
+            for key, lessons in remaining.items()
+        }
+
+    def _solve_window(self, window, quota, committed,
+                      time_limit: Optional[float]) -> Tuple[List[ScheduleAssignment], Dict[str, Any]]:
+        lessons = [l for key_lessons in quota.values() for l in key_lessons]
+        if not lessons:
+            return [], {'status': 'EMPTY'}
+        window_set = set(window)
+        window_data = dict(self.data)
+        window_data.update({
+            'calendar': [e for e in self.data['calendar'] if week_start(e.date) in window_set],
+            'lessons': lessons,
+            'fixed_assignments': [a for a in committed if week_start(a.assignment_date) in window_set],
+        })
+        window_config = sub_config(self.config, time_limit)
+        started = time.time()
+        assignments = ScheduleSolver(window_data, window_config).solve()
+        window_stats = window_config.get('stats', {})
+        window_stats.setdefault('solve_time', time.time() - started)
+        return assignments, window_stats
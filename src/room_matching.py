@@ -0,0 +1,150 @@
+import collections
+from typing import List, Dict, Any, Optional, Set, Tuple
+from ortools.sat.python import cp_model
+
+class RoomMatcher:
+    """Second stage of the room_capacity "aggregate" mode: rooms for already timed lessons.
+
+    The time model only guarantees that each room class has enough free rooms
+    at every slot. Here the slots of a day are walked in order: lessons
+    running on from the previous slot keep their room, and the ones starting
+    are matched to the remaining free rooms by augmenting paths. A day whose
+    matching fails, or every day when building transitions are penalised, is
+    instead solved by a tiny CP-SAT model that minimizes the teachers'
+    building changes between consecutive lessons.
+    """
+
+    def __init__(self, solver, config: Dict[str, Any]):
+        self.solver = solver
+        self.variables = solver.variables['lessons']
+        soft_cfg = config.get('soft_constraints', {}).get('minimize_building_transitions', {})
+        self.building_weight = soft_cfg.get('weight', 0) if soft_cfg.get('enabled') else 0
+        self.time_limit = config.get('room_matching', {}).get('time_limit_seconds', 1)
+        self.stats: Dict[str, Any] = {}
+
+        # Rooms taken by fixed bookings, per global slot
+        self.booked: Dict[int, Set[int]] = collections.defaultdict(set)
+        for booking in solver.constraints.data.get('fixed_bookings', []):
+            if booking['room'] is None: continue
+            for slot in range(booking['start'], booking['start'] + booking['duration']):
+                self.booked[slot].add(booking['room'])
+
+    def match(self, lesson_values: Dict[int, Tuple[int, Optional[int], int]]) -> Dict[int, Tuple[int, int, int]]:
+        """lesson_values with the room of every lesson filled in."""
+        by_day = collections.defaultdict(list)
+        for l_idx, (start, _, _) in lesson_values.items():
+            by_day[self.solver.valid_global_slots[start][0]].append(l_idx)
+
+        rooms: Dict[int, int] = {}
+        self.stats = {'days': len(by_day), 'matched_days': 0, 'cp_sat_days': 0, 'building_transitions': 0}
+        for day, lessons in sorted(by_day.items()):
+            day_rooms = None if self.building_weight else self._match_slots(lessons, lesson_values)
+            if day_rooms is not None:
+                self.stats['matched_days'] += 1
+            else:
+                day_rooms = self._solve_day(lessons, lesson_values)
+                self.stats['cp_sat_days'] += 1
+                if day_rooms is None:
+                    raise RuntimeError(f"Room matching failed on {day}: not enough suitable rooms")
+            rooms.update(day_rooms)
+            self.stats['building_transitions'] += self._transitions(lessons, lesson_values, day_rooms)
+
+        return {l_idx: (start, rooms[l_idx], teacher) for l_idx, (start, _, teacher) in lesson_values.items()}
+
+    def _span(self, l_idx: int, lesson_values: Dict[int, Tuple[int, Optional[int], int]]) -> range:
+        start = lesson_values[l_idx][0]
+        return range(start, start + self.variables[l_idx]['duration'])
+
+    def _match_slots(self, lessons: List[int], lesson_values) -> Optional[Dict[int, int]]:
+        rooms: Dict[int, int] = {}
+        starting = collections.defaultdict(list)
+        for l_idx in lessons:
+            starting[lesson_values[l_idx][0]].append(l_idx)
+        running: List[int] = []
+        for slot in sorted({s for l_idx in lessons for s in self._span(l_idx, lesson_values)}):
+            running = [l_idx for l_idx in running if slot in self._span(l_idx, lesson_values)]
+            taken = self.booked[slot] | {rooms[l_idx] for l_idx in running}
+            new = starting.get(slot, [])
+            matched = self._bipartite_matching(
+                {l_idx: [r for r in self.variables[l_idx]['compatible_rooms'] if r not in taken] for l_idx in new})
+            if matched is None:
+                return None
+            rooms.update(matched)
+            running += new
+        return rooms
+
+    @staticmethod
+    def _bipartite_matching(candidates: Dict[int, List[int]]) -> Optional[Dict[int, int]]:
+        """Maximum matching of lessons to rooms (Kuhn); None if some lesson stays unmatched."""
+        room_of: Dict[int, int] = {}
+        lesson_of: Dict[int, int] = {}
+
+        def augment(l_idx: int, seen: Set[int]) -> bool:
+            for r_idx in candidates[l_idx]:
+                if r_idx in seen: continue
+                seen.add(r_idx)
+                if r_idx not in lesson_of or augment(lesson_of[r_idx], seen):
+                    lesson_of[r_idx], room_of[l_idx] = l_idx, r_idx
+                    return True
+            return False
+
+        # Most constrained lessons first
+        for l_idx in sorted(candidates, key=lambda l: len(candidates[l])):
+            if not augment(l_idx, set()):
+                return None
+        return room_of
+
+    def _solve_day(self, lessons: List[int], lesson_values) -> Optional[Dict[int, int]]:
+        model = cp_model.CpModel()
+        literals: Dict[int, Dict[int, Any]] = {}
+        per_room_slot = collections.defaultdict(list)
+        for l_idx in lessons:
+            span = self._span(l_idx, lesson_values)
+            literals[l_idx] = {
+                r_idx: model.NewBoolVar(f'l{l_idx}_r{r_idx}')
+                for r_idx in self.variables[l_idx]['compatible_rooms']
+                if not any(r_idx in self.booked[slot] for slot in span)
+            }
+            if not literals[l_idx]:
+                return None
+            model.AddExactlyOne(literals[l_idx].values())
+            for r_idx, lit in literals[l_idx].items():
+                for slot in span:
+                    per_room_slot[(r_idx, slot)].append(lit)
+        for lits in per_room_slot.values():
+            if len(lits) > 1: model.AddAtMostOne(lits)
+
+        if self.building_weight:
+            building_ids = {b: i for i, b in enumerate(sorted({r.building for r in self.solver.rooms}))}
+
+            def building(l_idx: int):
+                return sum(building_ids[self.solver.rooms[r_idx].building] * lit
+                           for r_idx, lit in literals[l_idx].items())
+
+            changes = []
+            for l1, l2 in self._consecutive_pairs(lessons, lesson_values):
+                changed = model.NewBoolVar(f'l{l1}_l{l2}_building_change')
+                model.Add(building(l1) == building(l2)).OnlyEnforceIf(changed.Not())
+                changes.append(changed)
+            model.Minimize(sum(changes))
+
+        solver = self.solver.new_cp_solver(self.time_limit)
+        status = solver.Solve(model)
+        if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            return None
+        return {l_idx: next(r for r, lit in lits.items() if solver.BooleanValue(lit)) for l_idx, lits in literals.items()}
+
+    def _consecutive_pairs(self, lessons: List[int], lesson_values) -> List[Tuple[int, int]]:
+        """Successive lessons of the same teacher within the day."""
+        by_teacher = collections.defaultdict(list)
+        for l_idx in lessons:
+            by_teacher[lesson_values[l_idx][2]].append(l_idx)
+        pairs = []
+        for teacher_lessons in by_teacher.values():
+            teacher_lessons.sort(key=lambda l_idx: lesson_values[l_idx][0])
+            pairs += list(zip(teacher_lessons, teacher_lessons[1:]))
+        return pairs
+
+    def _transitions(self, lessons: List[int], lesson_values, rooms: Dict[int, int]) -> int:
+        return sum(self.solver.rooms[rooms[l1]].building != self.solver.rooms[rooms[l2]].building
+                   for l1, l2 in self._consecutive_pairs(lessons, lesson_values))
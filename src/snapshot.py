@@ -0,0 +1,80 @@
+import dataclasses
+import json
+import os
+from datetime import date, datetime, time
+from typing import List, Dict, Any
+from .model import ScheduleAssignment
+from .utils import lesson_key
+
+SNAPSHOT_FILE = 'schedule_snapshot.json'
+
+def _jsonable(value: Any) -> Any:
+    if isinstance(value, (date, time)):
+        return value.isoformat()
+    if isinstance(value, (list, tuple, set)):
+        return [_jsonable(v) for v in value]
+    return value
+
+def assignment_to_dict(a: ScheduleAssignment) -> Dict[str, Any]:
+    return {k: _jsonable(v) for k, v in dataclasses.asdict(a).items()}
+
+def assignment_from_dict(d: Dict[str, Any]) -> ScheduleAssignment:
+    values = dict(d)
+    values['assignment_date'] = date.fromisoformat(values['assignment_date'])
+    values['start_time'] = time.fromisoformat(values['start_time'])
+    values['end_time'] = time.fromisoformat(values['end_time'])
+    return ScheduleAssignment(**values)
+
+def input_fingerprint(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Per-lesson input records and calendar/unavailability lists to diff runs against."""
+    disciplines = {d.discipline_id: d for d in data['disciplines']}
+    lessons = {}
+    for lesson in data['lessons']:
+        discipline = disciplines.get(lesson.discipline_id)
+        record = {k: _jsonable(v) for k, v in dataclasses.asdict(lesson).items()}
+        if discipline:
+            record['discipline'] = {k: _jsonable(v) for k, v in dataclasses.asdict(discipline).items()}
+        lessons[lesson_key(lesson)] = record
+    return {
+        'lessons': lessons,
+        'working_days': sorted(e.date.isoformat() for e in data['calendar']
+                               if e.is_working_day and not e.is_holiday),
+        'teacher_unavailability': sorted(
+            json.dumps({k: _jsonable(v) for k, v in dataclasses.asdict(u).items()}, sort_keys=True)
+            for u in data['teacher_unavailability']
+        ),
+    }
+
+def diff_inputs(previous: Dict[str, Any], current: Dict[str, Any]) -> Dict[str, Any]:
+    """Lesson keys added/removed/changed between two fingerprints, plus calendar changes."""
+    prev_lessons, cur_lessons = previous.get('lessons', {}), current['lessons']
+    return {
+        'added': sorted(set(cur_lessons) - set(prev_lessons)),
+        'removed': sorted(set(prev_lessons) - set(cur_lessons)),
+        'changed': sorted(k for k in set(cur_lessons) & set(prev_lessons) if cur_lessons[k] != prev_lessons[k]),
+        'working_days_removed': sorted(set(previous.get('working_days', [])) - set(current['working_days'])),
+        'unavailability_added': len(set(current['teacher_unavailability'])
+                                    - set(previous.get('teacher_unavailability', []))),
+    }
+
+def save_snapshot(path: str, assignments: List[ScheduleAssignment], data: Dict[str, Any],
+                  config: Dict[str, Any]):
+    snapshot = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'stats': {k: config.get('stats', {}).get(k) for k in ('status', 'objective_value')},
+        'inputs': input_fingerprint(data),
+        'assignments': [assignment_to_dict(a) for a in assignments],
+    }
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(snapshot, f, ensure_ascii=False, indent=1)
+    os.replace(tmp_path, path)
+
+def load_snapshot(path: str) -> Dict[str, Any]:
+    """Read a snapshot file, or the snapshot inside an output directory."""
+    if os.path.isdir(path):
+        path = os.path.join(path, SNAPSHOT_FILE)
+    with open(path, 'r', encoding='utf-8') as f:
+        snapshot = json.load(f)
+    snapshot['assignments'] = [assignment_from_dict(d) for d in snapshot.get('assignments', [])]
+    return snapshot
@@ -1,4 +1,6 @@
 import collections
+import math
+import time
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional, Tuple
 from ortools.sat.python import cp_model
@@ -7,16 +9,30 @@ from .model import (
     Room, TimeSlot, CalendarEntry, ScheduleAssignment
 )
 from .constraints import ConstraintManager
+from .checkpoint import SolutionCheckpointer
+from .room_matching import RoomMatcher
+from .instrumentation import BuildRecorder, SearchTrajectory, attach_search_log, response_stats, trajectory_summary
+from .utils import lesson_key, sub_config
+
+def apply_solver_parameters(parameters: Any, settings: Dict[str, Any]):
+    """Set CP-SAT parameters from a config dict; enum values are given by name."""
+    for name, value in settings.items():
+        if not name[:1].islower() or not hasattr(parameters, name):
+            raise ValueError(f"Unknown CP-SAT parameter in solver config: {name}")
+        enum = type(getattr(parameters, name))
+        if isinstance(value, str) and hasattr(enum, '__members__'):
+            if value not in enum.__members__:
+                raise ValueError(f"Invalid value for CP-SAT parameter {name}: {value} "
+                                 f"(expected one of {', '.join(enum.__members__)})")
+            value = enum.__members__[value]
+        setattr(parameters, name, value)
 
 class ScheduleSolver:
     def __init__(self, data: Dict[str, Any], config: Dict[str, Any]):
         self.data = data
         self.config = config
         self.model = cp_model.CpModel()
-        self.solver = cp_model.CpSolver()
-        
-        if 'solver_time_limit_seconds' in config:
-            self.solver.parameters.max_time_in_seconds = config['solver_time_limit_seconds']
+        self.solver = self.new_cp_solver(config.get('solver_time_limit_seconds'))
         
         self.variables = {}
         self.working_dates: List[CalendarEntry] = []
@@ -28,6 +44,12 @@ class ScheduleSolver:
         
         self.room_to_idx: Dict[int, int] = {}
         self.teacher_to_idx: Dict[int, int] = {}
+        self.warm_fixed: Dict[int, Tuple[int, int, int]] = {}
+        self.warm_stats: Dict[str, Any] = {}
+        self.checkpointer: Optional[SolutionCheckpointer] = None
+        self.trajectory: Optional[SearchTrajectory] = None
+        self.last_solver: Optional[cp_model.CpSolver] = None
+        self._start_literals: Dict[Tuple[int, int], Any] = {}
         
         self._preprocess_data()
         
@@ -46,15 +68,108 @@ class ScheduleSolver:
         self.room_to_idx = {r.room_id: i for i, r in enumerate(self.rooms)}
         self.teacher_to_idx = {t.teacher_id: i for i, t in enumerate(self.teachers)}
 
-    def build_model(self):
+    def build_global_slots(self) -> List[Tuple[Any, TimeSlot]]:
         self.valid_global_slots = [] 
         for date_entry in self.working_dates:
             day_name = date_entry.date.strftime('%A')
             day_slots = sorted([s for s in self.all_slots if s.day_of_week == day_name], key=lambda s: s.slot_number)
             for slot in day_slots:
                 self.valid_global_slots.append((date_entry.date, slot))
-                
+        return self.valid_global_slots
+
+    def _resolve_assignment(self, a: ScheduleAssignment) -> Optional[Tuple[int, int, Optional[int], Optional[int]]]:
+        """(start, duration, room_idx, teacher_idx) of an assignment in this horizon, or None."""
+        if not hasattr(self, '_assignment_lookups'):
+            self._assignment_lookups = (
+                {(d, slot.slot_number): i for i, (d, slot) in enumerate(self.valid_global_slots)},
+                {r.room_name: i for i, r in enumerate(self.rooms)},
+                {t.full_name: i for i, t in enumerate(self.teachers)},
+            )
+        slot_index, room_by_name, teacher_by_name = self._assignment_lookups
+        start = slot_index.get((a.assignment_date, a.slot_number))
+        if start is None: return None
+        end = start + 1
+        while (end < self.num_global_slots and self.valid_global_slots[end][0] == a.assignment_date
+               and self.valid_global_slots[end][1].end_time <= a.end_time):
+            end += 1
+        return start, end - start, room_by_name.get(a.room_name), teacher_by_name.get(a.teacher_name)
+
+    def _map_fixed_assignments(self) -> List[Dict[str, Any]]:
+        """Resolve data['fixed_assignments'] to slot/resource indices of this horizon.
+
+        Fixed assignments are already scheduled lessons that are not re-solved
+        but still occupy their room, teacher, group and weekly load.
+        """
+        bookings = []
+        for a in self.data.get('fixed_assignments', []):
+            resolved = self._resolve_assignment(a)
+            if resolved is None: continue
+            start, duration, room_idx, teacher_idx = resolved
+            bookings.append({
+                'start': start, 'duration': duration, 'group': a.group_name,
+                'room': room_idx, 'teacher': teacher_idx
+            })
+        # Closed rooms are booked for every slot of the closure period
+        for closure in self.data.get('room_closures', []):
+            room_idx = self.room_to_idx.get(closure.room_id)
+            if room_idx is None: continue
+            closed = [
+                i for i, (date_obj, _) in enumerate(self.valid_global_slots)
+                if (not closure.start_date or date_obj >= closure.start_date)
+                and (not closure.end_date or date_obj <= closure.end_date)
+            ]
+            if closed:
+                bookings.append({'start': closed[0], 'duration': closed[-1] - closed[0] + 1,
+                                 'group': None, 'room': room_idx, 'teacher': None})
+        return bookings
+
+    def compatible_rooms(self, lesson: Lesson, discipline: Discipline) -> List[int]:
+        comp_rooms = [r for r in self.rooms if r.capacity >= discipline.group_size and r.room_type == lesson.required_room_type]
+        if not comp_rooms: comp_rooms = self.rooms 
+        return [self.room_to_idx[r.room_id] for r in comp_rooms]
+
+    def compatible_teachers(self, lesson: Lesson, discipline: Discipline) -> List[int]:
+        if lesson.lesson_type == 'lecture':
+            allowed = [discipline.lecturer_id]
+        elif lesson.lesson_type == 'practice':
+            allowed = discipline.practice_teacher_ids
+        elif lesson.lesson_type == 'lab':
+            allowed = discipline.lab_teacher_ids
+        else:
+            allowed = [discipline.lecturer_id]
+        
+        valid_t_indices = [self.teacher_to_idx[tid] for tid in allowed if tid in self.teacher_to_idx]
+        if not valid_t_indices: valid_t_indices = list(self.teacher_to_idx.values())
+        return valid_t_indices
+
+    def build_model(self):
+        self.build_global_slots()
         self.num_global_slots = len(self.valid_global_slots)
+        self.build_recorder = BuildRecorder(self.model)
+        with self.build_recorder.measure('lesson_variables', 'variables'):
+            self._create_lesson_variables()
+
+        self.constraints = ConstraintManager(self.model, self.variables, {
+            'num_global_slots': self.num_global_slots,
+            'valid_global_slots': self.valid_global_slots,
+            'teacher_to_idx': self.teacher_to_idx,
+            'room_to_idx': self.room_to_idx,
+            'teacher_unavailability': self.data['teacher_unavailability'],
+            'fixed_bookings': self._map_fixed_assignments(),
+            'teachers': self.teachers,
+            'rooms': self.rooms
+        }, self.config, self.build_recorder)
+        self.constraints.add_hard_constraints()
+        self.constraints.add_soft_constraints(self.config)
+        if self.data.get('warm_start'):
+            self._apply_warm_start()
+
+    def _create_lesson_variables(self):
+        # "literals": rooms/teachers are chosen by presence literals only,
+        # without room/teacher IntVars channeled to them.
+        use_literals = self.config.get('model', {}).get('resource_assignment', 'channeled') == 'literals'
+        # "aggregate": no room variables, rooms are matched by RoomMatcher
+        aggregate_rooms = self.config.get('model', {}).get('room_capacity') == 'aggregate'
         
         self.variables['lessons'] = {}
         for l_idx, lesson in enumerate(self.lessons):
@@ -66,70 +181,544 @@ class ScheduleSolver:
             
             start_var = self.model.NewIntVar(0, self.num_global_slots - duration_slots, f'start_{l_idx}')
             
-            # Compatible Rooms
-            comp_rooms = [r for r in self.rooms if r.capacity >= discipline.group_size and r.room_type == lesson.required_room_type]
-            if not comp_rooms: comp_rooms = self.rooms 
-            comp_room_indices = [self.room_to_idx[r.room_id] for r in comp_rooms]
-            room_var = self.model.NewIntVarFromDomain(cp_model.Domain.FromValues(comp_room_indices), f'room_{l_idx}')
-            
-            # Compatible Teachers
-            if lesson.lesson_type == 'lecture':
-                allowed = [discipline.lecturer_id]
-            elif lesson.lesson_type == 'practice':
-                allowed = discipline.practice_teacher_ids
-            elif lesson.lesson_type == 'lab':
-                allowed = discipline.lab_teacher_ids
-            else:
-                allowed = [discipline.lecturer_id]
-            
-            valid_t_indices = [self.teacher_to_idx[tid] for tid in allowed if tid in self.teacher_to_idx]
-            if not valid_t_indices: valid_t_indices = list(self.teacher_to_idx.values())
-            teacher_var = self.model.NewIntVarFromDomain(cp_model.Domain.FromValues(valid_t_indices), f'teacher_{l_idx}')
+            comp_room_indices = self.compatible_rooms(lesson, discipline)
+            valid_t_indices = self.compatible_teachers(lesson, discipline)
             
             end_var = self.model.NewIntVar(0, self.num_global_slots, f'end_{l_idx}')
             interval_var = self.model.NewIntervalVar(start_var, duration_slots, end_var, f'interval_{l_idx}')
             
-            self.variables['lessons'][l_idx] = {
-                'start': start_var, 'end': end_var, 'room': room_var, 'teacher': teacher_var,
+            lesson_vars = {
+                'start': start_var, 'end': end_var, 'room': None, 'teacher': None,
                 'interval': interval_var, 'duration': duration_slots,
                 'lesson': lesson, 'discipline': discipline,
                 'compatible_rooms': comp_room_indices, 'compatible_teachers': valid_t_indices
             }
+            if aggregate_rooms:
+                # Rooms are matched after solving; only room-class capacity is modelled
+                lesson_vars['room_bools'] = {}
+            if use_literals:
+                if not aggregate_rooms:
+                    lesson_vars['room_bools'] = {r_idx: self.model.NewBoolVar(f'l{l_idx}_r{r_idx}') for r_idx in comp_room_indices}
+                    self.model.AddExactlyOne(lesson_vars['room_bools'].values())
+                lesson_vars['teacher_bools'] = {t_idx: self.model.NewBoolVar(f'l{l_idx}_t{t_idx}') for t_idx in valid_t_indices}
+                self.model.AddExactlyOne(lesson_vars['teacher_bools'].values())
+            else:
+                if not aggregate_rooms:
+                    lesson_vars['room'] = self.model.NewIntVarFromDomain(cp_model.Domain.FromValues(comp_room_indices), f'room_{l_idx}')
+                lesson_vars['teacher'] = self.model.NewIntVarFromDomain(cp_model.Domain.FromValues(valid_t_indices), f'teacher_{l_idx}')
+            self.variables['lessons'][l_idx] = lesson_vars
 
-        self.constraints = ConstraintManager(self.model, self.variables, {
-            'num_global_slots': self.num_global_slots,
-            'valid_global_slots': self.valid_global_slots,
-            'teacher_to_idx': self.teacher_to_idx,
-            'room_to_idx': self.room_to_idx,
-            'teacher_unavailability': self.data['teacher_unavailability'],
-            'teachers': self.teachers,
-            'rooms': self.rooms
-        })
-        self.constraints.add_hard_constraints()
-        self.constraints.add_soft_constraints(self.config)
+    def new_cp_solver(self, time_limit: Optional[float] = None) -> cp_model.CpSolver:
+        """CpSolver with the parameters of the `solver` config block."""
+        solver = cp_model.CpSolver()
+        apply_solver_parameters(solver.parameters, self.config.get('solver', {}))
+        if time_limit is not None:
+            solver.parameters.max_time_in_seconds = time_limit
+        instrumentation_cfg = self.config.get('instrumentation', {})
+        if instrumentation_cfg.get('search_log') or instrumentation_cfg.get('trajectory', {}).get('enabled'):
+            attach_search_log(solver)
+        return solver
+
+    def search_callback(self, solver: cp_model.CpSolver) -> Optional[cp_model.CpSolverSolutionCallback]:
+        """Solution callback of a main solve: the checkpointer, wrapped in a SearchTrajectory when enabled."""
+        if not self.config.get('instrumentation', {}).get('trajectory', {}).get('enabled'):
+            return self.checkpointer
+        self.trajectory = SearchTrajectory(solver, self.checkpointer)
+        return self.trajectory
+
+    def instrumentation_stats(self, solver: Any) -> Dict[str, Any]:
+        """Model build passes and CP-SAT response counters, for config['stats']."""
+        stats = {'model': self.build_recorder.summary()}
+        if solver is not None:
+            stats['solver_response'] = response_stats(solver)
+        if self.trajectory is not None:
+            maximize = self.model.Proto().objective.scaling_factor < 0
+            within = self.config['instrumentation']['trajectory'].get('within_percent', [10, 5, 1])
+            stats['search_trajectory'] = self.trajectory.points(maximize)
+            stats['search_summary'] = trajectory_summary(stats['search_trajectory'], within)
+        return stats
 
     def solve(self) -> List[ScheduleAssignment]:
+        if self.config.get('phased', {}).get('enabled'):
+            return self._solve_phased()
+        if self.config.get('objective_mode') == 'lexicographic':
+            return self._solve_tiered()
         self.build_model()
-        status = self.solver.Solve(self.model)
+        warnings = []
+        self.checkpointer = SolutionCheckpointer.from_config(self, self.config)
+        solver, status, extra_time = self._solve_unaffected_fixed() if self.warm_fixed else (None, None, 0.0)
+        released = self.warm_stats.get('released')
+        if released:
+            warnings.append(f"Warm start: {len(released)} unaffected lessons could not keep their previous "
+                            f"assignment under the current constraints and were re-solved: {', '.join(released)}.")
+        if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            if self.warm_fixed:
+                if status == cp_model.INFEASIBLE:
+                    warnings.append("Warm start: keeping unaffected lessons fixed was infeasible; re-solved all lessons.")
+                else:
+                    warnings.append(f"Warm start: the solve with unaffected lessons fixed ended without a solution "
+                                    f"({solver.StatusName(status)}); re-solved all lessons.")
+                self.warm_stats['fallback'] = True
+            solver = self.solver
+            status = solver.Solve(self.model, self.search_callback(solver))
+        else:
+            extra_time -= solver.WallTime()
         
         self.config['stats'] = {
-            'status': self.solver.StatusName(status),
-            'objective_value': self.solver.ObjectiveValue() if status in (cp_model.OPTIMAL, cp_model.FEASIBLE) else 0,
-            'solve_time': self.solver.WallTime(),
-            'warnings': []
+            'status': solver.StatusName(status),
+            'objective_value': solver.ObjectiveValue() if status in (cp_model.OPTIMAL, cp_model.FEASIBLE) else 0,
+            'solve_time': solver.WallTime() + extra_time,
+            'warnings': warnings
         }
+        if self.warm_stats:
+            self.config['stats']['warm_start'] = self.warm_stats
+        self.config['stats'].update(self.instrumentation_stats(solver))
+        if self.checkpointer:
+            self.checkpointer.flush()
+            self.config['stats']['improvements'] = self.checkpointer.improvements
         
+        self.last_solver = solver
         if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
-            return self._extract_solution()
+            self.config['stats']['objective_components'] = self.objective_breakdown(solver)
+            return self._extract_solution(solver)
         return []
 
-    def _extract_solution(self) -> List[ScheduleAssignment]:
-        assignments = []
+    def _solve_phased(self) -> List[ScheduleAssignment]:
+        """Feasibility, then hinted full optimization, then optional lexicographic refinement.
+
+        Phase 1 solves a hard-constraints-only copy of the model. Phase 2 builds
+        the full weighted model hinted with that schedule. Phase 3 keeps the
+        phase 2 objective and refines the phased.refine_tiers families in order.
+        Each phase has its own time limit in the `phased` config block.
+        """
+        phased_cfg = self.config['phased']
+        started = time.time()
+        phases, warnings = [], []
+
+        hard_config = sub_config(self.config, phased_cfg.get('feasibility_time_limit_seconds', 10))
+        hard_config['soft_constraints'] = {}
+        hard = ScheduleSolver(self.data, hard_config)
+        hard.build_model()
+        hard_status = hard.solver.Solve(hard.model)
+        phases.append(self._phase_stats('feasibility', hard.solver, hard_status, hard.model))
+        hard_ok = hard_status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+
+        self.build_model()
+        warnings += self.hint_only_warnings('phased')
+        self.checkpointer = SolutionCheckpointer.from_config(self, self.config)
+        if hard_ok:
+            # Phase 1 already started from the warm start; its schedule replaces those hints
+            self.model.ClearHints()
+            self.add_hints(hard.lesson_values())
+        self.solver.parameters.max_time_in_seconds = phased_cfg.get(
+            'optimization_time_limit_seconds', self.solver.parameters.max_time_in_seconds)
+        status = self.solver.Solve(self.model, self.search_callback(self.solver))
+        phases.append(self._phase_stats('optimization', self.solver, status, self.model))
+        best = self.solver if status in (cp_model.OPTIMAL, cp_model.FEASIBLE) else None
+        best_status = phases[-1]['status']
+
+        tiers = phased_cfg.get('refine_tiers', [])
+        if best and tiers:
+            # Keep the phase 2 objective (within refine_tolerance) while refining
+            objective = sum(self.constraints.objective_terms)
+            value = best.ObjectiveValue()
+            self.model.Add(objective >= math.floor(value - abs(value) * phased_cfg.get('refine_tolerance', 0.0)))
+            components = self.constraints.objective_components
+            levels = [
+                ('+'.join(tier), sum(t for name in tier for t in components.get(name, [])), 0.0) for tier in tiers
+            ]
+            refined, refine_stats = self.optimize_lexicographically(
+                levels, phased_cfg.get('refinement_time_limit_seconds', 10), self.lesson_values(best))
+            phases.extend(dict(s, phase=f"refine:{s['phase']}") for s in refine_stats)
+            if refined:
+                best, best_status = refined, 'FEASIBLE'
+
+        if best is None and hard_ok:
+            warnings.append("Phased solve: optimization found no solution; returning the phase 1 feasible schedule.")
+            # Score the phase 1 schedule under the full objective
+            fixed, fixed_status = self._solve_fixed(hard.lesson_values(), phased_cfg.get('feasibility_time_limit_seconds', 10))
+            if fixed_status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+                best = fixed
+            best_status = 'FEASIBLE'
+        elif best is None:
+            failed = [p['status'] for p in phases if p['status'] in ('INFEASIBLE', 'MODEL_INVALID')]
+            best_status = failed[0] if failed else phases[-1]['status']
+
+        self.last_solver = best
+        self.config['stats'] = {
+            'status': best_status,
+            'objective_value': sum(best.Value(t) for t in self.constraints.objective_terms) if best else 0,
+            'solve_time': time.time() - started,
+            'warnings': warnings,
+            'phases': phases,
+        }
+        self.config['stats'].update(self.instrumentation_stats(best))
+        if self.checkpointer:
+            self.checkpointer.flush()
+            self.config['stats']['improvements'] = self.checkpointer.improvements
+        if best:
+            self.config['stats']['objective_components'] = self.objective_breakdown(best)
+            return self._extract_solution(best)
+        return hard._extract_solution() if hard_ok else []
+
+    @staticmethod
+    def _phase_stats(phase: str, solver: cp_model.CpSolver, status: Any, model: cp_model.CpModel) -> Dict[str, Any]:
+        solved = status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+        return {
+            'phase': phase, 'status': solver.StatusName(status),
+            'objective_value': solver.ObjectiveValue() if solved else None,
+            'best_bound': solver.BestObjectiveBound() if solved else None,
+            'solve_time': solver.WallTime(),
+            'variables': len(model.Proto().variables), 'constraints': len(model.Proto().constraints),
+        }
+
+    def objective_tiers(self) -> List[Tuple[str, Any, float]]:
+        """(name, expression, tolerance) per soft_constraints tier, highest priority first.
+
+        Families are grouped by their `tier` key (1 first); families without
+        one form a last tier. Within a tier the weighted terms are summed, and
+        the tier tolerance is the largest `tolerance` among its families.
+        """
+        soft_cfg = self.config.get('soft_constraints', {})
+        tiers = collections.defaultdict(list)
+        for name, terms in self.constraints.objective_components.items():
+            tiers[soft_cfg[name].get('tier', float('inf'))].append(name)
+        levels = []
+        for tier in sorted(tiers):
+            names = tiers[tier]
+            levels.append(('+'.join(names),
+                           sum(t for name in names for t in self.constraints.objective_components[name]),
+                           max(soft_cfg[name].get('tolerance', 0.0) for name in names)))
+        return levels
+
+    def _solve_tiered(self) -> List[ScheduleAssignment]:
+        """Optimize the soft_constraints tiers one after another on the same model."""
+        self.build_model()
+        self.checkpointer = SolutionCheckpointer.from_config(self, self.config)
+        started = time.time()
+        tiers = self.objective_tiers()
+        if tiers:
+            best, tier_stats = self.optimize_lexicographically(tiers, self.solver.parameters.max_time_in_seconds)
+        else:
+            status = self.solver.Solve(self.model, self.checkpointer)
+            tier_stats = [self._phase_stats('feasibility', self.solver, status, self.model)]
+            best = self.solver if status in (cp_model.OPTIMAL, cp_model.FEASIBLE) else None
+        solved = [s for s in tier_stats if s['status'] in ('OPTIMAL', 'FEASIBLE')]
+        warnings = self.hint_only_warnings('lexicographic')
+        unsolved = [s['phase'] for s in tier_stats if s['status'] not in ('OPTIMAL', 'FEASIBLE')]
+        if best and unsolved:
+            fallback = ('solved the remaining tiers together' if tier_stats[-1]['phase'] == 'weighted'
+                        else 'kept the result of the previous tier')
+            warnings.append(f"Lexicographic objective: tiers {', '.join(unsolved)} were not solved in time; {fallback}.")
+        self.config['stats'] = {
+            'status': solved[-1]['status'] if best else (tier_stats[0]['status'] if tier_stats else 'UNKNOWN'),
+            'objective_value': sum(best.Value(t) for t in self.constraints.objective_terms) if best else 0,
+            'solve_time': time.time() - started,
+            'warnings': warnings,
+            'tiers': tier_stats,
+        }
+        self.config['stats'].update(self.instrumentation_stats(best))
+        if self.checkpointer:
+            self.checkpointer.flush()
+            self.config['stats']['improvements'] = self.checkpointer.improvements
+        self.last_solver = best
+        if best:
+            self.config['stats']['objective_components'] = self.objective_breakdown(best)
+            return self._extract_solution(best)
+        return []
+
+    def optimize_lexicographically(self, levels: List[Tuple[str, Any, float]], time_limit: float,
+                                   hint: Optional[Dict[int, Tuple[int, int, int]]] = None):
+        """Maximize (name, expression, tolerance) levels in order on self.model.
+
+        After a level is solved its expression is kept within `tolerance`
+        (relative) of the value reached, and the solution hints the next
+        level. A level that finds no solution in its share of the time keeps
+        the previous level's solution and is held at its value there; if no
+        level has been solved yet, the remaining levels are solved together
+        (weighted) with the remaining time. Returns the solver of the best
+        solution (or None) and per-level stats; self.model keeps the level
+        constraints.
+        """
+        level_stats, best = [], None
+        levels = [level for level in levels if not isinstance(level[1], int)]
+        deadline = time.time() + time_limit
+        for i, (name, expr, tolerance) in enumerate(levels):
+            # Time left unused by earlier levels carries over to later ones
+            solver = self.new_cp_solver(max(deadline - time.time(), 0.0) / (len(levels) - i))
+            if hint:
+                self.model.ClearHints()
+                self.add_hints(hint)
+            self.model.Maximize(expr)
+            status = solver.Solve(self.model)
+            level_stats.append(self._phase_stats(name, solver, status, self.model))
+            if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+                value = solver.ObjectiveValue()
+                best, hint = solver, self.lesson_values(solver)
+                if self.checkpointer:
+                    self.checkpointer.record(solver, sum(solver.Value(t) for t in self.constraints.objective_terms), None)
+            elif status in (cp_model.INFEASIBLE, cp_model.MODEL_INVALID):
+                break
+            elif best is not None:
+                value = best.Value(expr)
+            else:
+                solver = self.new_cp_solver(max(deadline - time.time(), 0.0))
+                self.model.Maximize(sum(level[1] for level in levels[i:]))
+                status = solver.Solve(self.model)
+                level_stats.append(self._phase_stats('weighted', solver, status, self.model))
+                if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+                    best = solver
+                    if self.checkpointer:
+                        self.checkpointer.record(solver, sum(solver.Value(t) for t in self.constraints.objective_terms), None)
+                break
+            self.model.Add(expr >= math.floor(value - abs(value) * tolerance))
+        return best, level_stats
+
+    def solve_multiple(self, count: int) -> List[List[ScheduleAssignment]]:
+        """Up to `count` solutions, pairwise at least diversity.min_distance apart.
+
+        The model is built once. Each solution adds a Hamming-distance
+        constraint over the lessons' start and room literals and becomes the
+        hint of the next solve. config['stats'] describes the first solution;
+        config['stats']['solutions'] holds a summary of every solution.
+        """
+        diversity_cfg = self.config.get('diversity', {})
+        min_distance = max(1, diversity_cfg.get('min_distance', 1))
+        first = self.solve()
+        if not first:
+            return []
+        stats = self.config['stats']
+        solutions = [first]
+        values = [self.lesson_values(self.last_solver)]
+        summaries = [self._solution_summary(values, stats['status'], stats['objective_value'],
+                                            stats['solve_time'], stats['objective_components'])]
+
+        self.solver.parameters.max_time_in_seconds = diversity_cfg.get(
+            'time_limit_seconds', self.solver.parameters.max_time_in_seconds)
+        for k in range(2, count + 1):
+            self._add_min_distance(values[-1], min_distance)
+            self.model.ClearHints()
+            self.add_hints(values[-1])
+            status = self.solver.Solve(self.model)
+            if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+                stats['warnings'].append(
+                    f"Only {len(solutions)} of {count} solutions found at distance >= {min_distance} "
+                    f"(solve {k}: {self.solver.StatusName(status)})."
+                )
+                break
+            values.append(self.lesson_values())
+            solutions.append(self._extract_solution())
+            summaries.append(self._solution_summary(values, self.solver.StatusName(status), self.solver.ObjectiveValue(),
+                                                    self.solver.WallTime(), self.objective_breakdown()))
+        stats['solutions'] = summaries
+        return solutions
+
+    def objective_breakdown(self, values: Any = None) -> Dict[str, float]:
+        """Value of each soft-constraint family's objective terms in a solution."""
+        values = self.solver if values is None else values
+        return {
+            name: sum(values.Value(term) for term in terms)
+            for name, terms in self.constraints.objective_components.items()
+        }
+
+    def _start_literal(self, l_idx: int, start: int) -> Any:
+        key = (l_idx, start)
+        if key not in self._start_literals:
+            start_var = self.variables['lessons'][l_idx]['start']
+            literal = self.model.NewBoolVar(f'l{l_idx}_starts_{start}')
+            self.model.Add(start_var == start).OnlyEnforceIf(literal)
+            self.model.Add(start_var != start).OnlyEnforceIf(literal.Not())
+            self._start_literals[key] = literal
+        return self._start_literals[key]
+
+    def _add_min_distance(self, values: Dict[int, Tuple[int, int, int]], min_distance: int):
+        """At least `min_distance` of the start/room choices in `values` must change."""
+        same = []
+        for l_idx, (start, room_idx, _) in values.items():
+            same.append(self._start_literal(l_idx, start))
+            if room_idx in self.variables['lessons'][l_idx]['room_bools']:
+                same.append(self.variables['lessons'][l_idx]['room_bools'][room_idx])
+        self.model.Add(sum(same) <= len(same) - min_distance)
+
+    @staticmethod
+    def _hamming(a: Dict[int, Tuple[int, int, int]], b: Dict[int, Tuple[int, int, int]]) -> int:
+        return sum((a[l][0] != b[l][0]) + (a[l][1] != b[l][1]) for l in a)
+
+    def _solution_summary(self, values: List[Dict[int, Tuple[int, int, int]]], status: str, objective: float,
+                          solve_time: float, components: Dict[str, float]) -> Dict[str, Any]:
+        current = values[-1]
+        return {
+            'solution': len(values), 'status': status, 'objective_value': objective, 'solve_time': solve_time,
+            'distance_to_first': self._hamming(current, values[0]),
+            'min_distance_to_previous': min((self._hamming(current, v) for v in values[:-1]), default=0),
+            **components
+        }
+
+    def _apply_warm_start(self):
+        """Hint lessons to their previous assignment (data['warm_start']).
+
+        data['warm_start'] holds the previous 'assignments' and the keys of
+        lessons whose inputs 'changed'. A previous assignment that no longer
+        resolves to a valid slot, room or teacher marks the lesson as affected;
+        with warm_start.keep_unaffected the other lessons are fixed by solve()
+        as far as the current constraints allow.
+        """
+        warm = self.data['warm_start']
+        warm_cfg = self.config.get('warm_start', {})
+        previous = {a.lesson_id: a for a in warm.get('assignments', [])}
+        changed = set(warm.get('changed', ()))
+        blocked = self.constraints._teacher_blocked_ranges()
+        slot_to_day = self.constraints.slot_to_day
+
+        values, affected = {}, set()
         for l_idx, vars in self.variables['lessons'].items():
-            start_val = self.solver.Value(vars['start'])
+            key = lesson_key(vars['lesson'])
+            a = previous.get(key)
+            resolved = self._resolve_assignment(a) if a else None
+            if resolved is None:
+                affected.add(l_idx)
+                continue
+            start, duration, room_idx, teacher_idx = resolved
+            end = start + vars['duration'] - 1
+            valid = (
+                duration == vars['duration'] and end < self.num_global_slots
+                and slot_to_day[start] == slot_to_day[end]
+                and room_idx in vars['compatible_rooms'] and teacher_idx in vars['compatible_teachers']
+                and not any(lo <= end and start <= hi for lo, hi in blocked.get(teacher_idx, []))
+            )
+            if not valid:
+                affected.add(l_idx)
+                continue
+            values[l_idx] = (start, room_idx, teacher_idx)
+            if key in changed:
+                affected.add(l_idx)
+
+        self.add_hints(values)
+        if warm_cfg.get('keep_unaffected', False):
+            self.warm_fixed = {l_idx: v for l_idx, v in values.items() if l_idx not in affected}
+        self.warm_stats = {
+            'hinted': len(values), 'affected': len(affected),
+            'fixed': len(self.warm_fixed), 'released': [], 'fallback': False
+        }
+
+    def hint_only_warnings(self, mode: str) -> List[str]:
+        """Warning for warm_start.keep_unaffected in a solve mode that only hints the previous schedule."""
+        if not self.warm_fixed:
+            return []
+        return [f"Warm start: keep_unaffected is only supported by the monolithic weighted solve; the {mode} solve "
+                f"hints the {len(self.warm_fixed)} unaffected lessons without fixing them."]
+
+    def _solve_unaffected_fixed(self) -> Tuple[cp_model.CpSolver, Any, float]:
+        """Solve a clone of the model with unaffected lessons fixed to their previous assignment.
+
+        If fixing all of them is infeasible under the current constraints,
+        the lessons that cannot keep their assignment are released (they keep
+        their hints) and listed in warm_stats['released']. Returns the last
+        solver, its status and the wall time of all solves.
+        """
+        deadline = time.time() + self.config.get('warm_start', {}).get(
+            'time_limit_seconds', self.solver.parameters.max_time_in_seconds)
+        solver, status = self._solve_fixed(self.warm_fixed, max(deadline - time.time(), 0.0))
+        wall_time = solver.WallTime()
+        if status == cp_model.INFEASIBLE:
+            # Half of the remaining time picks the lessons to release
+            selector, kept = self._keepable_lessons(self.warm_fixed, max(deadline - time.time(), 0.0) / 2)
+            wall_time += selector.WallTime()
+            if kept is not None:
+                self.warm_stats['released'] = [lesson_key(self.variables['lessons'][l_idx]['lesson'])
+                                               for l_idx in self.warm_fixed if l_idx not in kept]
+                self.warm_stats['fixed'] = len(kept)
+                self.warm_fixed = kept
+                solver, status = self._solve_fixed(kept, max(deadline - time.time(), 0.0))
+                wall_time += solver.WallTime()
+        return solver, status, wall_time
+
+    def _solve_fixed(self, values: Dict[int, Tuple[int, int, int]], time_limit: float) -> Tuple[cp_model.CpSolver, Any]:
+        fixed_model = self.model.Clone()
+        self.fix_lessons(values, fixed_model)
+        solver = self.new_cp_solver(time_limit)
+        return solver, solver.Solve(fixed_model, self.search_callback(solver))
+
+    def _keepable_lessons(self, values: Dict[int, Tuple[int, int, int]],
+                          time_limit: float) -> Tuple[cp_model.CpSolver, Optional[Dict[int, Tuple[int, int, int]]]]:
+        """The most lessons of `values` that can stay fixed together (None if none found in time).
+
+        A feasibility clone of the model fixes each lesson only under its own
+        keep literal and maximizes the number of kept lessons.
+        """
+        model = self.model.Clone()
+        model.ClearObjective()
+        keep = {}
+        for l_idx, value in values.items():
+            literal = model.NewBoolVar(f'l{l_idx}_keep')
+            for var, val in self._value_pairs(l_idx, value):
+                model.Add(var == val).OnlyEnforceIf(literal)
+            model.AddHint(literal, 1)
+            keep[l_idx] = literal
+        model.Maximize(sum(keep.values()))
+        solver = self.new_cp_solver(time_limit)
+        if solver.Solve(model) not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            return solver, None
+        return solver, {l_idx: values[l_idx] for l_idx, literal in keep.items() if solver.BooleanValue(literal)}
+
+    def _value_pairs(self, l_idx: int, value: Tuple[int, int, int]) -> List[Tuple[Any, int]]:
+        start, room_idx, teacher_idx = value
+        vars = self.variables['lessons'][l_idx]
+        pairs = [(vars['start'], start)]
+        for kind, chosen in (('room', room_idx), ('teacher', teacher_idx)):
+            if vars[kind] is not None:
+                pairs.append((vars[kind], chosen))
+            for idx, presence in vars[f'{kind}_bools'].items():
+                pairs.append((presence, int(idx == chosen)))
+        return pairs
+
+    def add_hints(self, values: Dict[int, Tuple[int, int, int]], model: Optional[cp_model.CpModel] = None):
+        """Hint lessons to (start, room_idx, teacher_idx); `model` may be a clone of self.model."""
+        model = model or self.model
+        for l_idx, value in values.items():
+            if l_idx not in self.variables['lessons']: continue
+            for var, val in self._value_pairs(l_idx, value):
+                model.AddHint(var, val)
+
+    def fix_lessons(self, values: Dict[int, Tuple[int, int, int]], model: Optional[cp_model.CpModel] = None):
+        """Fix lessons to (start, room_idx, teacher_idx); `model` may be a clone of self.model."""
+        model = model or self.model
+        for l_idx, value in values.items():
+            if l_idx not in self.variables['lessons']: continue
+            for var, val in self._value_pairs(l_idx, value):
+                model.Add(var == val)
+
+    def lesson_values(self, values: Any = None) -> Dict[int, Tuple[int, int, int]]:
+        """(start, room_idx, teacher_idx) per lesson from a solver or solution callback."""
+        values = self.solver if values is None else values
+        return {
+            l_idx: (values.Value(vars['start']),
+                    self._chosen_resource(vars, 'room', values),
+                    self._chosen_resource(vars, 'teacher', values))
+            for l_idx, vars in self.variables['lessons'].items()
+        }
+
+    def _extract_solution(self, values: Any = None) -> List[ScheduleAssignment]:
+        """Build assignments from `values` (defaults to this solver's last solve).
+
+        Anything exposing Value/BooleanValue over this model's variables works,
+        e.g. a CpSolver that solved a clone of self.model.
+        """
+        return self.assignments_from_values(self.lesson_values(values))
+
+    def assignments_from_values(self, lesson_values: Dict[int, Tuple[int, int, int]]) -> List[ScheduleAssignment]:
+        """Build assignments from (start, room_idx, teacher_idx) per lesson.
+
+        Rooms left as None (room_capacity "aggregate") are matched first.
+        """
+        if any(room_idx is None for _, room_idx, _ in lesson_values.values()):
+            matcher = RoomMatcher(self, self.config)
+            lesson_values = matcher.match(lesson_values)
+            self.config.setdefault('stats', {})['room_matching'] = matcher.stats
+        assignments = []
+        for l_idx, (start_val, room_idx, teacher_idx) in lesson_values.items():
+            vars = self.variables['lessons'][l_idx]
             duration = vars['duration']
-            room_idx = self.solver.Value(vars['room'])
-            teacher_idx = self.solver.Value(vars['teacher'])
             
             date_obj, start_slot_obj = self.valid_global_slots[start_val]
             _, end_slot_obj = self.valid_global_slots[start_val + duration - 1]
@@ -153,6 +742,17 @@ class ScheduleSolver:
                 teacher_name=teacher.full_name,
                 room_name=room.room_name,
                 building=room.building,
-                lesson_id=f"{discipline.discipline_id}_{lesson.lesson_type}_{lesson.lesson_number}"
+                lesson_id=lesson_key(lesson)
             ))
         return assignments
+
+    def _chosen_resource(self, vars: Dict[str, Any], kind: str, values: Any = None) -> Optional[int]:
+        values = self.solver if values is None else values
+        if vars[kind] is None and not vars[f'{kind}_bools']:
+            return None  # room_capacity "aggregate": rooms are matched later
+        if vars[kind] is not None:
+            return values.Value(vars[kind])
+        for idx, presence in vars[f'{kind}_bools'].items():
+            if values.BooleanValue(presence):
+                return idx
+        raise ValueError(f"No {kind} selected for lesson {vars['lesson']}")
@@ -0,0 +1,177 @@
+import collections
+import dataclasses
+import logging
+import math
+from datetime import date, timedelta
+from typing import List, Dict, Any, Tuple
+from .model import CalendarEntry, Lesson, ScheduleAssignment, TeacherUnavailability
+from .solver import ScheduleSolver, lesson_key
+from .utils import calendar_week_starts, sub_config, week_start, working_days
+
+logger = logging.getLogger(__name__)
+
+class TemplateSolver:
+    """Solves a one- or two-week timetable pattern and replicates it over the semester.
+
+    The pattern is solved on a synthetic calendar with per-week demand derived
+    from the discipline hours. Expanded occurrences that fall on holidays or
+    teacher unavailability are dropped, and the lessons left without an
+    occurrence are placed by a small repair solve around the expanded schedule.
+    """
+
+    def __init__(self, data: Dict[str, Any], config: Dict[str, Any]):
+        self.data = data
+        self.config = config
+        template_cfg = config.get('template', {})
+        self.pattern_weeks = max(1, int(template_cfg.get('weeks', 1)))
+        self.time_limit = template_cfg.get('time_limit_seconds', config.get('solver_time_limit_seconds'))
+        self.valid_global_slots = ScheduleSolver(data, config).build_global_slots()
+
+        self.working_days = working_days(data['calendar'])
+        self.week_starts: List[date] = calendar_week_starts(data['calendar'])
+
+    def solve(self) -> List[ScheduleAssignment]:
+        # The pattern's objective is not the semester's: occurrences are
+        # dropped and repaired after expansion
+        stats = {'status': 'UNKNOWN', 'pattern_objective_value': 0, 'solve_time': 0.0, 'warnings': []}
+
+        pattern_config = sub_config(self.config, self.time_limit)
+        pattern_solver = ScheduleSolver(self._pattern_data(), pattern_config)
+        pattern = pattern_solver.solve()
+        stats['solve_time'] += pattern_config['stats']['solve_time']
+        stats['pattern_objective_value'] = pattern_config['stats']['objective_value']
+        stats['status'] = pattern_config['stats']['status']
+        if not pattern:
+            stats['warnings'].append("Weekly template could not be solved.")
+            self.config['stats'] = stats
+            return []
+        logger.info(f"Template solved: {len(pattern)} weekly occurrences over {self.pattern_weeks} week(s)")
+
+        placed, leftovers, broken_weeks = self._expand(pattern)
+        logger.info(f"Template expanded to {len(placed)} lessons; {len(leftovers)} left for repair "
+                    f"in {len(broken_weeks)} broken week(s)")
+
+        if leftovers:
+            repaired, repair_stats = self._repair(leftovers, placed, broken_weeks)
+            stats['solve_time'] += repair_stats.get('solve_time', 0)
+            if len(repaired) < len(leftovers):
+                stats['status'] = repair_stats.get('status', 'UNKNOWN')
+                stats['warnings'].append(
+                    f"Repair solve placed {len(repaired)} of {len(leftovers)} lessons not covered by the template."
+                )
+            placed.extend(repaired)
+
+        stats['template_weeks'] = self.pattern_weeks
+        stats['repaired_lessons'] = len(leftovers)
+        self.config['stats'] = stats
+        return placed
+
+    def _plan_by_type(self) -> Dict[Tuple[int, str], List[Lesson]]:
+        plan = collections.defaultdict(list)
+        for lesson in self.data['lessons']:
+            plan[(lesson.discipline_id, lesson.lesson_type)].append(lesson)
+        for lessons in plan.values():
+            lessons.sort(key=lambda l: l.lesson_number)
+        return plan
+
+    def _pattern_data(self) -> Dict[str, Any]:
+        """Synthetic input for the pattern: P regular weeks and per-week demand."""
+        working_weekdays = {d.weekday() for d in self.working_days}
+        first_monday = self.week_starts[0] if self.week_starts else date.today()
+        calendar = []
+        for offset in range(7 * self.pattern_weeks):
+            day = first_monday + timedelta(days=offset)
+            is_working = day.weekday() in working_weekdays
+            calendar.append(CalendarEntry(date=day, is_holiday=False, is_working_day=is_working,
+                                          description="template"))
+
+        hours_by_type = {'lecture': 'lecture_hours', 'practice': 'practice_hours', 'lab': 'lab_hours'}
+        disciplines = {d.discipline_id: d for d in self.data['disciplines']}
+        num_weeks = max(1, len(self.week_starts))
+        lessons = []
+        for (disc_id, lesson_type), plan_lessons in self._plan_by_type().items():
+            discipline = disciplines.get(disc_id)
+            if not discipline: continue
+            sample = plan_lessons[0]
+            hours = getattr(discipline, hours_by_type.get(lesson_type, ''), 0) or 0
+            # Academic hours are 45 minutes; only lessons present in the
+            # thematic plan can be expanded, so the plan caps the demand.
+            total = len(plan_lessons)
+            if hours:
+                total = min(total, math.ceil(hours * 45 / sample.duration_minutes))
+            demand = math.ceil(total * self.pattern_weeks / num_weeks)
+            for number in range(1, demand + 1):
+                lessons.append(dataclasses.replace(sample, lesson_number=number))
+
+        # Only recurring weekday exclusions shape the pattern; dated periods are
+        # handled when the pattern is expanded.
+        unavailability = [
+            TeacherUnavailability(teacher_id=u.teacher_id, start_date=None, end_date=None,
+                                  reason=u.reason, unavailable_days=u.unavailable_days)
+            for u in self.data['teacher_unavailability']
+            if u.unavailable_days and not (u.start_date and u.end_date)
+        ]
+
+        pattern_data = dict(self.data)
+        pattern_data.update({'calendar': calendar, 'lessons': lessons,
+                             'teacher_unavailability': unavailability, 'fixed_assignments': [],
+                             'warm_start': None})
+        return pattern_data
+
+    def _teacher_available(self, teacher_name: str, day: date) -> bool:
+        teacher_ids = {t.teacher_id for t in self.data['teachers'] if t.full_name == teacher_name}
+        for unav in self.data['teacher_unavailability']:
+            if unav.teacher_id not in teacher_ids: continue
+            if unav.start_date and unav.end_date and unav.start_date <= day <= unav.end_date:
+                return False
+            if day.strftime('%A') in unav.unavailable_days:
+                return False
+        return True
+
+    def _expand(self, pattern: List[ScheduleAssignment]):
+        """Map pattern occurrences onto calendar weeks and actual plan lessons."""
+        first_monday = self.week_starts[0]
+        occurrences = collections.defaultdict(list)
+        broken_weeks = set()
+        for a in pattern:
+            offset = (a.assignment_date - first_monday).days
+            pattern_week, weekday = divmod(offset, 7)
+            disc_id, lesson_type, _ = a.lesson_id.split('_', 2)
+            for k, monday in enumerate(self.week_starts):
+                if k % self.pattern_weeks != pattern_week: continue
+                day = monday + timedelta(days=weekday)
+                if day not in self.working_days or not self._teacher_available(a.teacher_name, day):
+                    broken_weeks.add(monday)
+                    continue
+                occurrences[(int(disc_id), lesson_type)].append((day, a))
+
+        placed, leftovers = [], []
+        for key, plan_lessons in self._plan_by_type().items():
+            slots = sorted(occurrences.get(key, []), key=lambda x: (x[0], x[1].start_time))
+            for lesson, (day, a) in zip(plan_lessons, slots):
+                placed.append(dataclasses.replace(
+                    a, assignment_date=day, week_number=day.isocalendar()[1],
+                    topic=lesson.topic, lesson_id=lesson_key(lesson)
+                ))
+            leftovers.extend(plan_lessons[len(slots):])
+        return placed, leftovers, broken_weeks
+
+    def _repair(self, leftovers: List[Lesson], placed: List[ScheduleAssignment],
+                broken_weeks) -> Tuple[List[ScheduleAssignment], Dict[str, Any]]:
+        """Place lessons the template did not cover, first within the broken weeks."""
+        calendars = [self.data['calendar']]
+        if broken_weeks:
+            restricted = [
+                entry for entry in self.data['calendar']
+                if week_start(entry.date) in broken_weeks
+            ]
+            calendars.insert(0, restricted)
+
+        repair_config = sub_config(self.config, self.config.get('template', {}).get('repair_time_limit_seconds', self.time_limit))
+        for calendar in calendars:
+            repair_data = dict(self.data)
+            repair_data.update({'calendar': calendar, 'lessons': leftovers, 'fixed_assignments': placed})
+            repaired = ScheduleSolver(repair_data, repair_config).solve()
+            if repaired:
+                return repaired, repair_config['stats']
+        return [], repair_config.get('stats', {})
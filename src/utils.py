@@ -0,0 +1,33 @@
+import copy
+from datetime import date, timedelta
+from typing import List, Dict, Any, Optional, Set
+from .model import CalendarEntry, Lesson
+
+def lesson_key(lesson: Lesson) -> str:
+    """Stable identifier of a thematic-plan lesson (ScheduleAssignment.lesson_id)."""
+    return f"{lesson.discipline_id}_{lesson.lesson_type}_{lesson.lesson_number}"
+
+def working_days(calendar: List[CalendarEntry]) -> Set[date]:
+    return {entry.date for entry in calendar if entry.is_working_day and not entry.is_holiday}
+
+def week_start(day: date) -> date:
+    """Monday of the ISO week containing `day`."""
+    return day - timedelta(days=day.weekday())
+
+def calendar_week_starts(calendar: List[CalendarEntry]) -> List[date]:
+    """Mondays of every week between the first and last working day."""
+    days = sorted(working_days(calendar))
+    weeks = []
+    if days:
+        monday = week_start(days[0])
+        while monday <= days[-1]:
+            weeks.append(monday)
+            monday += timedelta(days=7)
+    return weeks
+
+def sub_config(config: Dict[str, Any], time_limit: Optional[float] = None) -> Dict[str, Any]:
+    """Copy of `config` for a nested solve, without the parent's stats and checkpointing."""
+    result = copy.deepcopy({k: v for k, v in config.items() if k not in ('stats', 'checkpoint')})
+    if time_limit is not None:
+        result['solver_time_limit_seconds'] = time_limit
+    return result
@@ -0,0 +1,102 @@
+import os
+import shutil
+from datetime import date, time
+import pytest
+from src.data_loader import DataLoader
+from src.model import Teacher, TeacherUnavailability, Discipline, Lesson, Room, TimeSlot, CalendarEntry
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures', 'loader')
+
+# Empty cells and non-numeric text in numeric columns become 0, floats are
+# truncated, invalid unavailability dates become None and list cells are
+# split on ';' with blanks dropped (an invalid ID empties the whole list).
+EXPECTED = {
+    'teachers': [
+        Teacher(1, 'Иванов', 'Иван', 'Иванович', 'Профессор', 18, 25),
+        Teacher(2, 'Петрова', 'Мария', 'Сергеевна', 'Доцент', 0, -1),
+        Teacher(3, 'Сидоров', 'Пётр', 'Павлович', 'Ассистент', 0, 0),
+        Teacher(4, 'Козлова', 'Анна', 'Игоревна', 'Доцент', 20, 7),
+    ],
+    'teacher_unavailability': [
+        TeacherUnavailability(1, date(2026, 3, 10), date(2026, 3, 24), 'Отпуск', []),
+        TeacherUnavailability(2, None, None, 'Методический день', ['Monday']),
+        TeacherUnavailability(3, None, date(2026, 3, 5), 'Командировка', ['Tuesday', 'Friday']),
+        TeacherUnavailability(4, date(2026, 3, 10), None, 'Болезнь', ['Wednesday']),
+    ],
+    'disciplines': [
+        Discipline(101, 'Высшая математика', 'ИВТ-21', 25, 3, 36, 36, 0, 1, [2], []),
+        Discipline(102, 'Программирование', 'ИВТ-21', 25, 3, 36, 18, 36, 2, [2, 3], [3]),
+        Discipline(103, 'Физика', 'ИВТ-22', 0, 3, 36, 18, 0, 4, [], []),
+    ],
+    'lessons': [
+        Lesson(101, 'lecture', 1, 'Введение', 90, 'lecture_hall', 25),
+        Lesson(101, 'lecture', 2, 'Пределы', 90, 'lecture_hall', 0),
+        Lesson(102, 'lab', 3, 'Массивы', 90, 'computer_lab', 0),
+    ],
+    'rooms': [
+        Room(1, 'Ауд. 301', 'Главный корпус', 'lecture_hall', 60, ['Проектор', 'Доска']),
+        Room(2, 'Ауд. 205', 'Главный корпус', 'classroom', 30, []),
+        Room(3, 'Лаб. 101', 'Корпус Б', 'computer_lab', 0, ['Компьютеры', 'Проектор']),
+    ],
+    'timeslots': [
+        TimeSlot(1, 'Monday', time(8, 30), time(10, 0), 90, 1),
+        TimeSlot(2, 'Monday', time(10, 10), time(11, 40), 90, 2),
+        TimeSlot(3, 'Tuesday', time(8, 30), time(10, 0), 90, 1),
+    ],
+    'calendar': [
+        CalendarEntry(date(2026, 3, 1), False, False, 'Sunday'),
+        CalendarEntry(date(2026, 3, 2), False, True, 'Monday'),
+        CalendarEntry(date(2026, 3, 8), True, False, 'Праздник'),
+    ],
+}
+
+@pytest.fixture
+def input_dir(tmp_path):
+    """A writable copy of the fixture CSVs."""
+    shutil.copytree(FIXTURES, tmp_path, dirs_exist_ok=True)
+    return tmp_path
+
+def rewrite(path, old, new):
+    text = path.read_text(encoding='utf-8')
+    assert old in text
+    path.write_text(text.replace(old, new), encoding='utf-8')
+
+def test_load_all():
+    data = DataLoader(FIXTURES).load_all()
+    assert data == EXPECTED
+    assert all(type(v) is int for t in data['teachers'] for v in (t.teacher_id, t.max_hours_per_week, t.seniority))
+
+def test_list_fields_are_not_shared():
+    # Disciplines 101 and 103 both have an empty lab_teacher_ids cell
+    disciplines = DataLoader(FIXTURES).load_disciplines()
+    disciplines[0].lab_teacher_ids.append(5)
+    assert disciplines[2].lab_teacher_ids == []
+
+def test_optional_columns_and_files(input_dir):
+    (input_dir / 'rooms.csv').write_text(
+        'room_id,room_name,building,room_type,capacity\n1,Ауд. 301,Главный корпус,lecture_hall,60\n', encoding='utf-8')
+    os.remove(input_dir / 'teacher_unavailability.csv')
+    loader = DataLoader(str(input_dir))
+    assert loader.load_rooms() == [Room(1, 'Ауд. 301', 'Главный корпус', 'lecture_hall', 60, [])]
+    assert loader.load_teacher_unavailability() == []
+
+def test_header_only_file(input_dir):
+    (input_dir / 'teachers.csv').write_text(
+        'teacher_id,last_name,first_name,middle_name,position,max_hours_per_week,seniority\n', encoding='utf-8')
+    assert DataLoader(str(input_dir)).load_teachers() == []
+
+@pytest.mark.parametrize('file_name, old, new, load, error', [
+    ('timeslots.csv', '8:30,10:00', '8h30,10:00', 'load_timeslots', ValueError),
+    ('calendar.csv', '2026-03-08', '2026-02-30', 'load_calendar', ValueError),
+    ('thematic_plans.csv', ',min_capacity\n', ',capacity\n', 'load_thematic_plans', KeyError),
+    ('disciplines.csv', 'lecturer_id,', 'lecturer,', 'load_disciplines', KeyError),
+])
+def test_invalid_input_raises(input_dir, file_name, old, new, load, error):
+    rewrite(input_dir / file_name, old, new)
+    with pytest.raises(error):
+        getattr(DataLoader(str(input_dir)), load)()
+
+def test_missing_required_file(input_dir):
+    os.remove(input_dir / 'rooms.csv')
+    with pytest.raises(FileNotFoundError):
+        DataLoader(str(input_dir)).load_all()
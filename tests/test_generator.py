@@ -0,0 +1,26 @@
+import pytest
+from src.data_loader import DataLoader
+from src.generator import InstanceSpec, write_instance
+from src.solver import ScheduleSolver
+from src.validator import Validator
+
+@pytest.mark.parametrize('weeks', [1, 2])
+@pytest.mark.parametrize('seed', range(5))
+def test_tiny_instances_are_feasible(tmp_path, weeks, seed):
+    # The benchmark's "tiny" size; on one week a long unavailability range
+    # once blocked the only lecturer of a discipline for the whole semester
+    write_instance(InstanceSpec(groups=3, teachers=6, rooms=4, weeks=weeks, seed=seed), str(tmp_path))
+    data = DataLoader(str(tmp_path)).load_all()
+    assert Validator(data).validate()[0]
+    config = {'solver_time_limit_seconds': 10, 'solver': {'random_seed': 0}, 'soft_constraints': {}}
+    assignments = ScheduleSolver(data, config).solve()
+
+    assert config['stats']['status'] in ('OPTIMAL', 'FEASIBLE')
+    assert len(assignments) == len(data['lessons'])
+
+def test_unavailability_ranges_fit_the_horizon(tmp_path):
+    write_instance(InstanceSpec(teachers=40, weeks=1, unavailability_density=1.0), str(tmp_path))
+    data = DataLoader(str(tmp_path)).load_all()
+    ranges = [u for u in data['teacher_unavailability'] if u.start_date]
+    assert ranges
+    assert all((u.end_date - u.start_date).days <= 2 for u in ranges)
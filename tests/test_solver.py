@@ -0,0 +1,368 @@
+import collections
+import dataclasses
+import pytest
+from src.checkpoint import CHECKPOINT_FILE
+from src.components import ComponentSolver
+from src.data_loader import DataLoader
+from src.generator import InstanceSpec, write_instance
+from src.lns import LNSSolver
+from src.model import TeacherUnavailability
+from src.portfolio import PortfolioSolver
+from src.repair import DisruptionEvent, ScheduleRepairer
+from src.rolling_horizon import RollingHorizonSolver
+from src.snapshot import load_snapshot
+from src.solver import ScheduleSolver
+from src.template import TemplateSolver
+from src.utils import lesson_key
+
+# Two groups with two disciplines each over one week: 11 lessons
+SMALL = dict(groups=2, teachers=4, rooms=3, disciplines_per_group=2, weeks=1, seed=1)
+
+def load_instance(tmp_path, **spec):
+    write_instance(InstanceSpec(**spec), str(tmp_path))
+    return DataLoader(str(tmp_path)).load_all()
+
+def solver_config(model=None, soft=None, time_limit=10):
+    return {'solver_time_limit_seconds': time_limit, 'solver': {'random_seed': 0},
+            'model': model or {}, 'soft_constraints': soft or {}}
+
+def assert_complete_schedule(assignments, data):
+    """Every lesson placed once, on a working day, without group, teacher or room conflicts."""
+    assert sorted(a.lesson_id for a in assignments) == sorted(lesson_key(l) for l in data['lessons'])
+    working = {e.date for e in data['calendar'] if e.is_working_day and not e.is_holiday}
+    teachers = {t.full_name: t.teacher_id for t in data['teachers']}
+    for a in assignments:
+        assert a.assignment_date in working
+        for u in data['teacher_unavailability']:
+            if u.teacher_id != teachers[a.teacher_name]: continue
+            assert a.day_of_week not in u.unavailable_days
+            assert not (u.start_date and u.end_date and u.start_date <= a.assignment_date <= u.end_date)
+    for entity in ('group_name', 'teacher_name', 'room_name'):
+        booked = collections.Counter((getattr(a, entity), a.assignment_date, a.slot_number) for a in assignments)
+        assert max(booked.values()) == 1, entity
+
+def with_disjoint_copy(data):
+    """`data` plus a copy of its groups, teachers and rooms that shares none of them."""
+    extra = {
+        'teachers': [dataclasses.replace(t, teacher_id=t.teacher_id + 100, last_name=f'{t.last_name}Б')
+                     for t in data['teachers']],
+        'rooms': [dataclasses.replace(r, room_id=r.room_id + 100, room_name=f'{r.room_name}Б', room_type=f'{r.room_type}_b')
+                  for r in data['rooms']],
+        'disciplines': [dataclasses.replace(
+            d, discipline_id=d.discipline_id + 100, group_name=f'{d.group_name}Б', lecturer_id=d.lecturer_id + 100,
+            practice_teacher_ids=[t + 100 for t in d.practice_teacher_ids],
+            lab_teacher_ids=[t + 100 for t in d.lab_teacher_ids])
+            for d in data['disciplines']],
+        'lessons': [dataclasses.replace(l, discipline_id=l.discipline_id + 100, required_room_type=f'{l.required_room_type}_b')
+                    for l in data['lessons']],
+    }
+    return dict(data, **{key: data[key] + values for key, values in extra.items()})
+
+def placements(assignments):
+    """(lesson, date, slot, room, teacher) of every assignment, sorted."""
+    return sorted((a.lesson_id, a.assignment_date, a.slot_number, a.room_name, a.teacher_name) for a in assignments)
+
+def schedule_gaps(assignments, entity):
+    """Free slots between the first and last lesson of each entity's day."""
+    slots = collections.defaultdict(list)
+    for a in assignments:
+        slots[(getattr(a, entity), a.assignment_date)].append(a.slot_number)
+    return sum(max(s) - min(s) + 1 - len(s) for s in slots.values())
+
+@pytest.mark.parametrize('day_integrity', ['bools', 'element'])
+def test_gaps_are_feasible_over_several_days(tmp_path, day_integrity):
+    # First/last slot bounds once used a day-length big-M on global slot
+    # indices, which made every instance longer than one day infeasible.
+    data = load_instance(tmp_path, **SMALL)
+    config = solver_config({'day_integrity': day_integrity}, {
+        'minimize_student_gaps': {'enabled': True, 'weight': 1},
+        'minimize_teacher_gaps': {'enabled': True, 'weight': 1},
+    })
+    assignments = ScheduleSolver(data, config).solve()
+
+    assert config['stats']['status'] == 'OPTIMAL'
+    assert len(assignments) == len(data['lessons'])
+    assert len({a.assignment_date for a in assignments}) > 1
+    components = config['stats']['objective_components']
+    assert -components['minimize_student_gaps'] == schedule_gaps(assignments, 'group_name')
+    assert -components['minimize_teacher_gaps'] == schedule_gaps(assignments, 'teacher_name')
+
+def consecutive_pairs(assignments):
+    """Pairs of one group's lessons of a discipline in adjacent slots of a day."""
+    slots = collections.defaultdict(set)
+    for a in assignments:
+        slots[(a.group_name, a.discipline_name, a.assignment_date)].add(a.slot_number)
+    return sum(s + 1 in day_slots for day_slots in slots.values() for s in day_slots)
+
+@pytest.mark.parametrize('spec, best', [
+    # Four lessons of one discipline in two-slot days: two pairs, none across
+    # the end of a day even though the next day's first slot follows it
+    (dict(groups=1, teachers=2, rooms=2, disciplines_per_group=1, weeks=1, lessons_per_week=2, slots_per_day=2,
+          unavailability_density=0, room_type_mix={'lecture_hall': 0.5, 'classroom': 0.5}), 2),
+    (dict(groups=2, teachers=4, rooms=3, disciplines_per_group=2, weeks=1, seed=3), None),
+])
+def test_consecutive_lessons_reward(tmp_path, spec, best):
+    # The successor encoding must reward the same pairs as the old per-day
+    # pairwise one: each adjacent same-day pair of a (group, discipline) once.
+    data = load_instance(tmp_path, **spec)
+    config = solver_config(soft={
+        'group_consecutive_lessons': {'enabled': True, 'weight': 7},
+        'avoid_late_slots': {'enabled': True, 'weight': 1},
+    })
+    assignments = ScheduleSolver(data, config).solve()
+
+    assert config['stats']['status'] == 'OPTIMAL'
+    assert len(assignments) == len(data['lessons'])
+    pairs = consecutive_pairs(assignments)
+    assert config['stats']['objective_components']['group_consecutive_lessons'] == 7 * pairs
+    if best is not None:
+        assert pairs == best
+
+@pytest.mark.parametrize('building_transitions', [False, True])
+def test_room_matching_respects_capacity_and_type(tmp_path, building_transitions):
+    # Rooms: a lecture hall, three classrooms and a computer lab. The first
+    # classroom is shrunk so only the two smaller groups fit in it.
+    data = load_instance(tmp_path, groups=4, teachers=6, rooms=5, disciplines_per_group=2, weeks=1, seed=2)
+    data['rooms'][1] = dataclasses.replace(data['rooms'][1], capacity=22)
+    config = solver_config({'room_capacity': 'aggregate'}, {
+        'minimize_building_transitions': {'enabled': building_transitions, 'weight': 1},
+    })
+    assignments = ScheduleSolver(data, config).solve()
+
+    assert config['stats']['status'] == 'OPTIMAL'
+    assert config['stats']['room_matching']['days'] > 0
+    assert len(assignments) == len(data['lessons'])
+    rooms = {r.room_name: r for r in data['rooms']}
+    lessons = {(l.discipline_id, l.lesson_type, l.lesson_number): l for l in data['lessons']}
+    used = collections.Counter()
+    for a in assignments:
+        discipline_id, lesson_type, lesson_number = a.lesson_id.split('_')
+        lesson = lessons[(int(discipline_id), lesson_type, int(lesson_number))]
+        room = rooms[a.room_name]
+        assert room.room_type == lesson.required_room_type
+        assert room.capacity >= lesson.min_capacity
+        assert room.building == a.building
+        used[(a.room_name, a.assignment_date, a.slot_number)] += 1
+    assert max(used.values()) == 1
+    assert any(rooms[a.room_name].capacity == 22 for a in assignments)
+
+def test_lns_searches_past_the_initial_time_limit(tmp_path):
+    # An initial solve that ends without a solution must not end the search
+    data = load_instance(tmp_path, **SMALL)
+    config = solver_config(soft={'avoid_late_slots': {'enabled': True, 'weight': 1}})
+    config['lns'] = {'initial_time_limit_seconds': 0, 'max_iterations': 3}
+    assignments = LNSSolver(data, config).solve()
+
+    assert config['stats']['status'] in ('OPTIMAL', 'FEASIBLE')
+    assert_complete_schedule(assignments, data)
+
+def test_lns_neighbourhoods_accept_warm_start_hints(tmp_path):
+    # The warm start hints the base model; neighbourhood clones must not hint twice
+    data = load_instance(tmp_path, **SMALL)
+    soft = {'avoid_late_slots': {'enabled': True, 'weight': 1}}
+    data['warm_start'] = {'assignments': ScheduleSolver(data, solver_config(soft=soft)).solve(), 'changed': []}
+    config = solver_config(soft=soft)
+    config['lns'] = {'initial_time_limit_seconds': 0, 'max_iterations': 5}
+    config['warm_start'] = {'keep_unaffected': True}
+    assignments = LNSSolver(data, config).solve()
+
+    log = config['stats']['lns_log']
+    assert len(log) > 1
+    assert all(entry['status'] in ('OPTIMAL', 'FEASIBLE') for entry in log)
+    assert any('keep_unaffected' in w for w in config['stats']['warnings'])
+    assert_complete_schedule(assignments, data)
+
+def test_warm_start_fixing_timeout_is_not_reported_as_infeasible(tmp_path):
+    data = load_instance(tmp_path, **SMALL)
+    data['warm_start'] = {'assignments': ScheduleSolver(data, solver_config()).solve(), 'changed': []}
+    config = solver_config()
+    config['warm_start'] = {'keep_unaffected': True, 'time_limit_seconds': 0}
+    assignments = ScheduleSolver(data, config).solve()
+
+    assert config['stats']['warm_start']['fallback']
+    assert [w for w in config['stats']['warnings'] if 'UNKNOWN' in w and 'infeasible' not in w]
+    assert_complete_schedule(assignments, data)
+
+def test_phased_solve_with_warm_start(tmp_path):
+    # Phase 2 replaces the warm-start hints with the phase 1 schedule
+    data = load_instance(tmp_path, **SMALL)
+    soft = {'minimize_student_gaps': {'enabled': True, 'weight': 1}, 'avoid_late_slots': {'enabled': True, 'weight': 1}}
+    reference = solver_config(soft=soft)
+    data['warm_start'] = {'assignments': ScheduleSolver(data, reference).solve(), 'changed': []}
+    config = solver_config(soft=soft)
+    config['phased'] = {'enabled': True, 'feasibility_time_limit_seconds': 5, 'optimization_time_limit_seconds': 10}
+    assignments = ScheduleSolver(data, config).solve()
+
+    assert [p['status'] for p in config['stats']['phases']] == ['OPTIMAL', 'OPTIMAL']
+    assert config['stats']['status'] == 'OPTIMAL'
+    assert config['stats']['objective_value'] == reference['stats']['objective_value'] != 0
+    assert_complete_schedule(assignments, data)
+
+def test_phased_refinement_holds_the_optimized_objective(tmp_path):
+    # Workload balance alone would give up consecutive lessons; with
+    # refine_tolerance 0 the refinement keeps the phase 2 objective
+    data = load_instance(tmp_path, **SMALL)
+    config = solver_config(soft={'balance_workload': {'enabled': True, 'weight': 1},
+                                 'group_consecutive_lessons': {'enabled': True, 'weight': 20}})
+    config['phased'] = {'enabled': True, 'refine_tiers': [['balance_workload']], 'refine_tolerance': 0.0}
+    assignments = ScheduleSolver(data, config).solve()
+
+    phases = config['stats']['phases']
+    assert [p['phase'] for p in phases] == ['feasibility', 'optimization', 'refine:balance_workload']
+    assert phases[1]['status'] == 'OPTIMAL'
+    assert config['stats']['objective_value'] == phases[1]['objective_value']
+    assert_complete_schedule(assignments, data)
+
+def test_phased_solve_reports_an_unoptimized_schedule_as_feasible(tmp_path):
+    data = load_instance(tmp_path, **SMALL)
+    config = solver_config(soft={'avoid_late_slots': {'enabled': True, 'weight': 1}})
+    config['phased'] = {'enabled': True, 'optimization_time_limit_seconds': 0}
+    assignments = ScheduleSolver(data, config).solve()
+
+    assert config['stats']['phases'][1]['status'] == 'UNKNOWN'
+    assert config['stats']['status'] == 'FEASIBLE'
+    assert config['stats']['objective_value'] == config['stats']['objective_components']['avoid_late_slots'] < 0
+    assert_complete_schedule(assignments, data)
+
+def test_template_covers_every_lesson(tmp_path):
+    # Pattern occurrences on the week 2 holidays are dropped and repaired
+    data = load_instance(tmp_path, **dict(SMALL, weeks=3))
+    data['calendar'] = [dataclasses.replace(e, is_holiday=True) if 7 <= i < 10 else e
+                        for i, e in enumerate(data['calendar'])]
+    config = solver_config(soft={'avoid_late_slots': {'enabled': True, 'weight': 1}})
+    assignments = TemplateSolver(data, config).solve()
+
+    assert config['stats']['status'] in ('OPTIMAL', 'FEASIBLE')
+    assert config['stats']['repaired_lessons'] > 0
+    assert 'objective_value' not in config['stats']
+    assert_complete_schedule(assignments, data)
+
+def test_rolling_horizon_covers_every_lesson(tmp_path):
+    # Two-week windows with one week of overlap: lessons committed by the
+    # first window are fixed bookings of the second
+    data = load_instance(tmp_path, **dict(SMALL, weeks=3))
+    config = solver_config(soft={'avoid_late_slots': {'enabled': True, 'weight': 1}})
+    config['rolling_horizon'] = {'window_weeks': 2, 'overlap_weeks': 1, 'time_limit_seconds': 2}
+    assignments = RollingHorizonSolver(data, config).solve()
+
+    assert config['stats']['status'] in ('OPTIMAL', 'FEASIBLE')
+    assert len(config['stats']['windows']) == 2
+    assert_complete_schedule(assignments, data)
+
+def test_unchanged_warm_start_keeps_the_schedule(tmp_path):
+    data = load_instance(tmp_path, **SMALL)
+    soft = {'minimize_student_gaps': {'enabled': True, 'weight': 1}, 'avoid_late_slots': {'enabled': True, 'weight': 1}}
+    previous = ScheduleSolver(data, solver_config(soft=soft)).solve()
+    data['warm_start'] = {'assignments': previous, 'changed': []}
+    config = solver_config(soft=soft)
+    config['warm_start'] = {'keep_unaffected': True}
+    assignments = ScheduleSolver(data, config).solve()
+
+    assert config['stats']['warm_start']['fixed'] == len(data['lessons'])
+    assert not config['stats']['warm_start']['fallback']
+    assert placements(assignments) == placements(previous)
+
+def test_repair_keeps_unaffected_lessons_in_place(tmp_path):
+    data = load_instance(tmp_path, **SMALL)
+    previous = ScheduleSolver(data, solver_config(soft={'avoid_late_slots': {'enabled': True, 'weight': 1}})).solve()
+    # The teacher of the first lesson falls ill on that day
+    sick = previous[0]
+    teacher_id = next(t.teacher_id for t in data['teachers'] if t.full_name == sick.teacher_name)
+    event = DisruptionEvent('teacher_unavailable', teacher_id=teacher_id,
+                            start_date=sick.assignment_date, end_date=sick.assignment_date)
+    config = solver_config()
+    assignments = ScheduleRepairer(data, config, previous).repair(event)
+
+    affected = {a.lesson_id for a in previous
+                if a.teacher_name == sick.teacher_name and a.assignment_date == sick.assignment_date}
+    assert config['stats']['repair']['affected'] == len(affected) > 0
+    assert ([p for p in placements(assignments) if p[0] not in affected]
+            == [p for p in placements(previous) if p[0] not in affected])
+    disrupted = dict(data, teacher_unavailability=data['teacher_unavailability'] + [
+        TeacherUnavailability(teacher_id, sick.assignment_date, sick.assignment_date, 'Болезнь')])
+    assert_complete_schedule(assignments, disrupted)
+
+def test_checkpoint_holds_the_final_schedule(tmp_path):
+    data = load_instance(tmp_path / 'input', **SMALL)
+    config = solver_config(soft={'minimize_student_gaps': {'enabled': True, 'weight': 1},
+                                 'avoid_late_slots': {'enabled': True, 'weight': 1}})
+    config.update(output_directory=str(tmp_path / 'output'), checkpoint={'enabled': True})
+    assignments = ScheduleSolver(data, config).solve()
+
+    checkpoint = load_snapshot(str(tmp_path / 'output' / CHECKPOINT_FILE))
+    improvements = config['stats']['improvements']
+    assert improvements and checkpoint['improvements'] == improvements
+    assert checkpoint['stats']['objective_value'] == improvements[-1]['objective'] == config['stats']['objective_value']
+    assert placements(checkpoint['assignments']) == placements(assignments)
+
+@pytest.mark.parametrize('resource_assignment', ['channeled', 'literals'])
+def test_multiple_solutions_are_apart(tmp_path, resource_assignment):
+    data = load_instance(tmp_path, **SMALL)
+    config = solver_config({'resource_assignment': resource_assignment}, {'avoid_late_slots': {'enabled': True, 'weight': 1}})
+    config['diversity'] = {'min_distance': 4, 'time_limit_seconds': 2}
+    solutions = ScheduleSolver(data, config).solve_multiple(3)
+
+    assert len(solutions) == 3
+    # Distance: lessons moved to another slot plus lessons moved to another room
+    places = [{a.lesson_id: ((a.assignment_date, a.slot_number), a.room_name) for a in s} for s in solutions]
+    for k, solution in enumerate(solutions):
+        assert_complete_schedule(solution, data)
+        for other in places[:k]:
+            assert sum((places[k][l][0] != p[0]) + (places[k][l][1] != p[1]) for l, p in other.items()) >= 4
+
+def test_lexicographic_solve_holds_the_first_tier(tmp_path):
+    # The weighted solve trades workload balance for consecutive lessons;
+    # with balance as tier 1 it must stay at its own optimum
+    data = load_instance(tmp_path, **SMALL)
+    soft = {'balance_workload': {'enabled': True, 'weight': 1, 'tier': 1},
+            'group_consecutive_lessons': {'enabled': True, 'weight': 20, 'tier': 2}}
+    weighted = solver_config(soft=soft)
+    ScheduleSolver(data, weighted).solve()
+    first_tier = solver_config(soft={'balance_workload': soft['balance_workload']})
+    ScheduleSolver(data, first_tier).solve()
+    config = dict(solver_config(soft=soft), objective_mode='lexicographic')
+    assignments = ScheduleSolver(data, config).solve()
+
+    assert [t['phase'] for t in config['stats']['tiers']] == ['balance_workload', 'group_consecutive_lessons']
+    assert config['stats']['status'] == first_tier['stats']['status'] == 'OPTIMAL'
+    balance = config['stats']['objective_components']['balance_workload']
+    assert balance == first_tier['stats']['objective_value'] > weighted['stats']['objective_components']['balance_workload']
+    assert config['stats']['objective_components']['group_consecutive_lessons'] > 0
+    assert_complete_schedule(assignments, data)
+
+def test_portfolio_covers_every_lesson(tmp_path):
+    data = load_instance(tmp_path, **SMALL)
+    config = solver_config(soft={'avoid_late_slots': {'enabled': True, 'weight': 1}})
+    config['portfolio'] = {'processes': 2, 'members': [
+        {'random_seed': 1}, {'random_seed': 2, 'search_branching': 'FIXED_SEARCH'}]}
+    assignments = PortfolioSolver(data, config).solve()
+
+    assert [m['status'] for m in config['stats']['portfolio']] == ['OPTIMAL', 'OPTIMAL']
+    assert config['stats']['status'] == 'OPTIMAL'
+    assert_complete_schedule(assignments, data)
+
+def test_components_cover_every_lesson(tmp_path):
+    data = with_disjoint_copy(load_instance(tmp_path, **SMALL))
+    config = solver_config(soft={'avoid_late_slots': {'enabled': True, 'weight': 1}})
+    config['components'] = {'processes': 2}
+    solver = ComponentSolver(data, config)
+    assert [len(c) for c in solver.components] == [11, 11]
+    assignments = solver.solve()
+
+    assert config['stats']['status'] == 'OPTIMAL'
+    assert all(c['solved'] for c in config['stats']['components'])
+    assert_complete_schedule(assignments, data)
+
+def test_redundant_constraints_keep_the_optimum(tmp_path):
+    data = load_instance(tmp_path, **SMALL)
+    soft = {'minimize_student_gaps': {'enabled': True, 'weight': 1}, 'avoid_late_slots': {'enabled': True, 'weight': 1}}
+    plain = solver_config(soft=soft)
+    ScheduleSolver(data, plain).solve()
+    config = solver_config({'redundant_constraints': {'room_classes': True, 'group_daily_slots': True, 'teacher_load': True}}, soft)
+    assignments = ScheduleSolver(data, config).solve()
+
+    assert config['stats']['status'] == plain['stats']['status'] == 'OPTIMAL'
+    assert config['stats']['objective_value'] == plain['stats']['objective_value']
+    passes = {p['name'] for p in config['stats']['model']['passes']}
+    assert {'redundant_group_daily_slots', 'redundant_teacher_load'} <= passes
+    assert_complete_schedule(assignments, data)